@@ -0,0 +1,537 @@
+# Benchmark parse_reports
+# See README.md for complete documentation
+
+# Import needed libraries
+import argparse
+import collections
+import csv
+import datetime
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import parse_reports
+
+# resource is needed only to measure peak memory use and is not
+# available on Windows
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# User variables
+# --------------
+# Number of child rows written to each synthetic filing
+CORPUSROWS = 2000
+
+# Seed used to generate the synthetic filings. Runs with the same seed
+# and number of rows parse identical corpora.
+CORPUSSEED = 1
+
+# File each run's results are appended to as a JSON line
+RESULTSFILE = 'benchmark_results.jsonl'
+
+# Share of the child rows in each filing written as each row type.
+# Every row type found in a filing's version is written at least once,
+# and the remaining rows are split among the types using these weights.
+# Types not listed here share a weight of 1.
+ROWWEIGHTS = {'SA': 60, 'SB': 30}
+
+# Share of the child rows written without their last two columns
+SHORTROWS = 0.05
+
+# Report types written to the corpus. F1 filings house only F1S and
+# TEXT rows.
+CORPUSRPTTYPES = ['F1', 'F3', 'F3L', 'F3P', 'F3X']
+
+# Value written to the first column of each type of child row
+rowprefixes = {'SA': 'SA11AI',
+               'SB': 'SB21B',
+               'SC': 'SC/10',
+               'SC1': 'SC1/10',
+               'SC2': 'SC2/10',
+               'SD': 'SD10',
+               'SE': 'SE',
+               'SF': 'SF',
+               'H1': 'H1',
+               'H2': 'H2',
+               'H3': 'H3',
+               'H4': 'H4',
+               'H5': 'H5',
+               'H6': 'H6',
+               'SI': 'SI',
+               'SL': 'SL',
+               'TEXT': 'TEXT',
+               'F1S': 'F1S'}
+
+# Text written to text columns. The comma forces the comma-delimited
+# filings to quote the column, and the filings are written in Latin-1,
+# so the N with a tilde is a stray non-ASCII byte like those some vendor
+# software emits.
+textvalues = ['ACME CORP', 'SMITH', 'JOHN', '123 MAIN ST', 'SPRINGFIELD', "O'BRIEN", 'RETIRED', 'ACME, INC.',
+              'MU\xd1OZ']
+
+
+def build_corpus_value(formtype, field, rownbr, rng):
+    # Returns a value for one column of a synthetic row. Values match
+    # the column's type in outputtypes, and text is cut to any maximum
+    # length listed in childfieldchecks so the filings parse cleanly.
+    fieldtype = fieldtypes.get(field)
+    if field == 'LineNbr':
+        return '11AI'
+    elif fieldtype == 'date' or field.endswith('Dt'):
+        return '2012%02d%02d' % (rng.randint(1, 12), rng.randint(1, 28))
+    elif fieldtype == 'currency' or '_P' in field or '_T' in field or 'Amt' in field:
+        # Report header amounts are named for the period (_P) or
+        # year-to-date (_T) column they're found in
+        return '%d.%02d' % (rng.randint(1, 5000), rng.randint(0, 99))
+    elif fieldtype == 'tinyint' or field.endswith('Dist'):
+        return '%02d' % rng.randint(1, 12)
+    elif fieldtype == 'bit':
+        return rng.choice(['X', ''])
+    elif field == 'TransID':
+        return 'T' + str(rownbr)
+    elif field.endswith('FullName'):
+        return rng.choice(['DOE^JOHN^Q^MR^JR', 'SMITH^JANE', 'ROE^RICHARD^^DR'])
+    elif field.endswith('CommID'):
+        return 'C%08d' % rng.randint(0, 99999999)
+    elif field.endswith('CandID'):
+        return 'H2VA%05d' % rng.randint(0, 99999)
+    elif field.endswith('StAbbr') or field.endswith('St') or field.endswith('State'):
+        return 'VA'
+    elif field.endswith('Zip'):
+        return '22101'
+    elif field.endswith('Ofc'):
+        return 'H'
+    elif field == 'EntTp':
+        return 'IND'
+    val = rng.choice(textvalues)
+    check = parse_reports.childfieldchecks.get(formtype, {}).get(field)
+    if check is not None and check[0] == 'maxlen':
+        val = val[:check[1]]
+    return val
+
+
+def build_corpus_row(formtype, fields, rownbr, rng):
+    # Returns the values of a synthetic row. When a version houses full
+    # name fields, the matching name fields are left blank so the full
+    # names can be split.
+    row = [build_corpus_value(formtype, field, rownbr, rng) for field in fields]
+    for fullname in [x for x in fields if x.endswith('FullName')]:
+        prefix = fullname[:-8]
+        for x in range(len(fields)):
+            if fields[x] in (prefix + 'LName', prefix + 'FName', prefix + 'MName', prefix + 'Pfx', prefix + 'Sfx'):
+                row[x] = ''
+    return row
+
+
+def build_file_header(version, delim):
+    # Returns the lines of a file header. Versions 1 and 2 use the
+    # multiple line header enclosed by "/* Header" and "/* End Header".
+    if version in ('1', '2'):
+        return ['/* Header',
+                'FEC_Ver_# = ' + version + '.00',
+                'Soft_Name = FECBENCH',
+                'Soft_Ver# = 1.0',
+                'Control_# = BENCH',
+                'NameDelim = ^',
+                'Date_Fmat = CCYYMMDD',
+                '/* End Header']
+    values = {'RecType': 'HDR', 'EFType': 'FEC', 'Ver': version, 'SftNm': 'FECBENCH', 'SftVer': '1.0',
+              'RptNbr': '0', 'NmDelim': '^'}
+    return [join_corpus_row([values.get(x, '') for x in get_version_fields('Hdr', version)], delim)]
+
+
+def compare_tokenizer(filingsdir, repeats=3):
+    # Times splitting the lines of each filing in filingsdir into fields
+    # with LineTokenizer against split_line, which cleans up and splits
+    # lines the way parse_reports did before LineTokenizer, and checks
+    # that both return the same lines and fields. Filings with a line
+    # the csv module can't read are skipped, since parse_reports can't
+    # parse them either. Returns a dictionary keyed by delimiter housing
+    # the number of filings and lines, the best of repeats times for
+    # each way of splitting lines, the speedup and the number of lines
+    # that differ.
+    filings = []
+    skipped = 0
+    for fecfile in sorted(glob.glob(os.path.join(filingsdir, '*.fec'))):
+        with parse_reports.open_report(fecfile) as datafile:
+            filehdr, rpthdr, lines = parse_reports.read_report_headers(datafile)
+            lines = [line for linenbr, line in lines]
+        delim = parse_reports.SRCDELIMITER if parse_reports.SRCDELIMITER in rpthdr else ','
+        try:
+            expected = [split_line(line, delim) for line in lines]
+        except csv.Error:
+            skipped += 1
+            continue
+        filings.append((delim, lines, expected))
+
+    results = collections.OrderedDict()
+    for delim in (parse_reports.SRCDELIMITER, ','):
+        name = 'comma' if delim == ',' else 'ASCII-28'
+        selected = [x for x in filings if x[0] == delim]
+        if len(selected) == 0:
+            continue
+        oldtimes = []
+        newtimes = []
+        for x in range(repeats):
+            start = time.perf_counter()
+            for delim, lines, expected in selected:
+                for line in lines:
+                    split_line(line, delim)
+            oldtimes.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            for delim, lines, expected in selected:
+                tokenizer = parse_reports.LineTokenizer(delim)
+                for line in lines:
+                    tokenizer.tokenize(line)
+            newtimes.append(time.perf_counter() - start)
+        mismatches = 0
+        for delim, lines, expected in selected:
+            tokenizer = parse_reports.LineTokenizer(delim)
+            mismatches += sum(1 for x in range(len(lines)) if tokenizer.tokenize(lines[x]) != expected[x])
+        results[name] = {'filings': len(selected),
+                         'lines': sum(len(x[1]) for x in selected),
+                         'parse_data_row': round(min(oldtimes), 4),
+                         'tokenizer': round(min(newtimes), 4),
+                         'speedup': round(min(oldtimes) / max(min(newtimes), 0.000001), 2),
+                         'mismatches': mismatches}
+    if skipped > 0:
+        print('Skipped ' + str(skipped) + ' filings the csv module could not read')
+    return results
+
+
+def generate_corpus(corpusdir, rows=CORPUSROWS, seed=CORPUSSEED):
+    # Writes a synthetic filing to corpusdir for each report type and
+    # header version listed in filehdrs, once delimited by ASCII-28 and
+    # once by commas. F1 filings in versions with no F1S or TEXT rows
+    # house only their headers. Returns a dictionary describing the
+    # corpus.
+    rng = random.Random(seed)
+    if not os.path.isdir(corpusdir):
+        os.makedirs(corpusdir)
+    corpus = {'files': 0, 'bytes': 0, 'rows': 0, 'rowtypes': collections.Counter()}
+    imageid = 100000
+    for rpttype in CORPUSRPTTYPES:
+        for version in get_versions(rpttype):
+            if rpttype == 'F1':
+                rowtypes = [x for x in ('F1S', 'TEXT') if get_version_fields(x, version) is not None]
+            else:
+                rowtypes = [x for x in rowprefixes if x != 'F1S' and get_version_fields(x, version) is not None]
+            weights = [ROWWEIGHTS.get(x, 1) for x in rowtypes]
+            versionfields = dict((x, get_version_fields(x, version)) for x in rowtypes)
+            for delim in (parse_reports.SRCDELIMITER, ','):
+                imageid += 1
+                lines = build_file_header(version, delim)
+                rpthdr = build_corpus_row(rpttype, get_version_fields(rpttype, version), 0, rng)
+                rpthdr[0] = rpttype + 'N'
+                lines.append(join_corpus_row(rpthdr, delim))
+                formtypes = []
+                if len(rowtypes) > 0:
+                    formtypes = rowtypes + rng.choices(rowtypes, weights, k=max(rows - len(rowtypes), 0))
+                for rownbr in range(len(formtypes)):
+                    formtype = formtypes[rownbr]
+                    row = build_corpus_row(formtype, versionfields[formtype], rownbr + 1, rng)
+                    row[0] = rowprefixes[formtype]
+                    if rng.random() < SHORTROWS:
+                        row = row[:-2]
+                    lines.append(join_corpus_row(row, delim))
+                    corpus['rowtypes'][formtype] += 1
+                fecfile = os.path.join(corpusdir, str(imageid) + '.fec')
+                with open(fecfile, 'w', encoding='latin-1', newline='') as output:
+                    output.write('\n'.join(lines) + '\n')
+                corpus['files'] += 1
+                corpus['bytes'] += os.path.getsize(fecfile)
+                corpus['rows'] += len(formtypes)
+    corpus['rowtypes'] = dict(corpus['rowtypes'])
+    return corpus
+
+
+def get_git_commit():
+    # Returns the commit the benchmarked module was run from, or None
+    # if it can't be determined.
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=moduledir,
+                                       stderr=subprocess.DEVNULL).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_peak_rss():
+    # Returns the peak resident set size, in megabytes, of the largest
+    # child process run so far, or None if it can't be measured.
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS.
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == 'darwin':
+        peak = peak / 1024.0
+    return round(peak / 1024.0, 1)
+
+
+def get_version_fields(formtype, version):
+    # Returns the columns listed in filehdrs for a form type and
+    # version, or None if the form type doesn't exist in that version.
+    # When a version appears in more than one version list, the last
+    # list wins, as it does in the header map.
+    fields = None
+    for hdr in parse_reports.filehdrs:
+        if hdr[0] == formtype:
+            for subhdr in hdr[1]:
+                if version in subhdr[0]:
+                    fields = subhdr[1]
+    return fields
+
+
+def get_versions(formtype):
+    # Returns the versions listed in filehdrs for a form type
+    versions = []
+    for hdr in parse_reports.filehdrs:
+        if hdr[0] == formtype:
+            for subhdr in hdr[1]:
+                versions += [x for x in subhdr[0] if x not in versions]
+    return versions
+
+
+def join_corpus_row(row, delim):
+    # Comma-delimited values housing a comma are enclosed in quotation
+    # marks.
+    if delim == ',':
+        row = ['"' + x + '"' if ',' in x else x for x in row]
+    return delim.join(row)
+
+
+def load_previous_result(resultsfile, result):
+    # Returns the most recent result in resultsfile benchmarked with the
+    # same corpus and parse_reports arguments, or None.
+    previous = None
+    if not os.path.exists(resultsfile):
+        return None
+    with open(resultsfile, 'r') as results:
+        for line in results:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('settings') == result['settings']:
+                previous = entry
+    return previous
+
+
+def print_result(result, previous=None):
+    # Prints a summary of a result. When a previous result is supplied,
+    # the change in throughput is shown as well.
+    print('Commit: ' + str(result['commit']))
+    print('Corpus: ' + str(result['corpus']['files']) + ' filings, ' + str(result['corpus']['rows']) +
+          ' rows, ' + str(round(result['corpus']['bytes'] / 1048576.0, 1)) + ' MB')
+    print('')
+    print('%-10s %10s %12s' % ('Stage', 'Seconds', 'Rows/sec'))
+    for stage in result['stages']:
+        seconds = result['stages'][stage]
+        rate = result['corpus']['rows'] / seconds if seconds > 0 else 0
+        print('%-10s %10.3f %12.0f' % (stage, seconds, rate))
+    print('')
+    print('Rows/sec: %.0f' % result['rowspersec'])
+    print('MB/sec: %.2f' % result['mbpersec'])
+    print('Peak RSS (MB): ' + str(result['peakrss']))
+    if previous is not None:
+        change = (result['rowspersec'] - previous['rowspersec']) / previous['rowspersec'] * 100
+        print('Change in rows/sec since commit ' + str(previous['commit']) + ' (' + previous['timestamp'] +
+              '): %+.1f%%' % change)
+
+
+def run_parse_reports(corpusdir, workdir, parseargs):
+    # Runs parse_reports end to end in a separate process against a
+    # copy of the corpus. The modules are copied into workdir along with a
+    # usersettings module pointing every directory to workdir, so the
+    # run doesn't touch the directories in the real user settings.
+    # Returns the number of seconds the run took.
+    settings = collections.OrderedDict([('ARCPROCDIR', 'arcproc'), ('ARCSVDIR', 'arcsv'), ('MASTERDIR', 'master'),
+                                        ('RPTERRDIR', 'err'), ('RPTHOLDDIR', 'hold'), ('RPTOUTDIR', 'out'),
+                                        ('RPTPROCDIR', 'proc'), ('RPTRVWDIR', 'rvw'), ('RPTSVDIR', 'imp')])
+    for name in settings:
+        settings[name] = os.path.join(workdir, settings[name]) + os.sep
+        os.makedirs(settings[name])
+    with open(os.path.join(workdir, 'usersettings.py'), 'w') as output:
+        output.write("DBCONNSTR = ''\n")
+        for name in settings:
+            output.write(name + ' = ' + repr(settings[name]) + '\n')
+    for module in ('parse_reports.py', 'download_reports.py', 'lookup_tables.py'):
+        shutil.copy(os.path.join(moduledir, module), workdir)
+    for fecfile in glob.glob(os.path.join(corpusdir, '*.fec')):
+        shutil.copy(fecfile, settings['RPTSVDIR'])
+
+    start = time.perf_counter()
+    subprocess.check_call([sys.executable, 'parse_reports.py'] + parseargs, cwd=workdir,
+                          stdout=subprocess.DEVNULL)
+    seconds = time.perf_counter() - start
+    if len(glob.glob(os.path.join(settings['RPTSVDIR'], '*.fec'))) > 0:
+        raise RuntimeError('parse_reports did not parse every filing in ' + settings['RPTSVDIR'])
+    return seconds
+
+
+def save_result(resultsfile, result):
+    with open(resultsfile, 'a') as results:
+        results.write(json.dumps(result, sort_keys=True) + '\n')
+
+
+def split_line(line, delim):
+    # Cleans up and splits a line the way parse_reports did before
+    # LineTokenizer, one step at a time, with parse_data_row building a
+    # new csv reader for each comma-delimited line. Returns None for
+    # blank lines.
+    if line.strip() == '':
+        return None
+    if parse_reports.OUTPUTDELIMITER == '\t':
+        line = line.expandtabs(1).replace('\r', ' ').strip()
+    while '  ' in line:
+        line = line.replace('  ', ' ')
+    return line, parse_reports.parse_data_row(line, delim)
+
+
+def time_stages(corpusdir, workdir):
+    # Times each stage of parsing the corpus in this process using the
+    # functions parse_reports uses: reading the filings, parsing their
+    # headers, splitting rows into columns, looking up the handler for
+    # each row, cleaning the rows and writing the data files. Returns a
+    # dictionary housing the number of seconds spent in each stage.
+    stages = collections.OrderedDict((x, 0.0) for x in ('read', 'headers', 'split', 'classify', 'clean', 'write'))
+    outputfiles = parse_reports.build_output_file_list('bench', '')
+    for key in outputfiles:
+        outputfiles[key] = os.path.join(workdir, os.path.basename(outputfiles[key]))
+    writer = parse_reports.OutputWriter(outputfiles)
+    for fecfile in sorted(glob.glob(os.path.join(corpusdir, '*.fec'))):
+        imageid = os.path.basename(fecfile).replace('.fec', '')
+
+        start = time.perf_counter()
+        with parse_reports.open_report(fecfile) as datafile:
+            filehdr, rpthdr, lines = parse_reports.read_report_headers(datafile)
+            lines = [line for linenbr, line in lines][1:]
+        stages['read'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        delim, fullrpttype, rpttype, hdrver, hdrverkey, filehdrdata, rpthdrdata = \
+            parse_reports.parse_report_headers(imageid, filehdr, rpthdr)
+        stages['headers'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        tokenizer = parse_reports.LineTokenizer(delim)
+        rows = [tokens[1] for tokens in map(tokenizer.tokenize, lines) if tokens is not None]
+        stages['split'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        handlers = [parse_reports.get_row_handler(row[0], hdrverkey) for row in rows]
+        stages['classify'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        cleaned = []
+        for linenbr in range(len(rows)):
+            handler = handlers[linenbr]
+            cleaned.append((handler.key, handler.clean(rows[linenbr], imageid, linenbr + 2, filehdrdata['NmDelim'],
+                                                       filehdrdata['DtFmt'], fullrpttype)))
+        stages['clean'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        writer.begin()
+        for key, row in cleaned:
+            writer.write_row(key, row)
+        writer.commit()
+        stages['write'] += time.perf_counter() - start
+    writer.close()
+    return stages
+
+
+##############################################
+
+# Directory housing this module and the module benchmarked
+moduledir = os.path.dirname(os.path.abspath(__file__))
+
+# Data type of each child row column
+fieldtypes = {}
+for fieldtype in parse_reports.outputtypes:
+    for field in parse_reports.outputtypes[fieldtype]:
+        fieldtypes[field] = fieldtype
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark parse_reports against a synthetic corpus of filings.')
+    parser.add_argument('--rows', type=int, default=CORPUSROWS,
+                        help='child rows written to each synthetic filing (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=CORPUSSEED,
+                        help='seed used to generate the synthetic filings (default: %(default)s)')
+    parser.add_argument('--generate', metavar='DIR',
+                        help='write the synthetic corpus to DIR and exit without benchmarking')
+    parser.add_argument('--results', default=RESULTSFILE,
+                        help='file each result is appended to (default: %(default)s)')
+    parser.add_argument('--tokenizer', nargs='?', const='', metavar='DIR',
+                        help='compare LineTokenizer with parse_data_row on the filings in DIR (default: the '
+                             'synthetic corpus) and exit')
+    parser.add_argument('--keep', action='store_true',
+                        help='keep the corpus and the files written by the benchmark')
+    parser.add_argument('parseargs', nargs=argparse.REMAINDER,
+                        help='arguments passed to parse_reports, such as --workers 4 (place after --)')
+    args = parser.parse_args()
+    parseargs = [x for x in args.parseargs if x != '--']
+
+    if args.generate is not None:
+        corpus = generate_corpus(args.generate, args.rows, args.seed)
+        print('Wrote ' + str(corpus['files']) + ' filings housing ' + str(corpus['rows']) + ' rows to ' +
+              args.generate)
+        sys.exit()
+
+    if args.tokenizer is not None:
+        filingsdir = args.tokenizer
+        if filingsdir == '':
+            filingsdir = tempfile.mkdtemp(prefix='fecbench_')
+            generate_corpus(filingsdir, args.rows, args.seed)
+        try:
+            results = compare_tokenizer(filingsdir)
+        finally:
+            if args.tokenizer == '':
+                shutil.rmtree(filingsdir)
+        print('%-10s %8s %10s %16s %14s %8s %11s' % ('Delimiter', 'Filings', 'Lines', 'parse_data_row', 'LineTokenizer',
+                                                    'Speedup', 'Mismatches'))
+        for name in results:
+            x = results[name]
+            print('%-10s %8d %10d %16.3f %14.3f %7.2fx %11d' % (name, x['filings'], x['lines'], x['parse_data_row'],
+                                                                x['tokenizer'], x['speedup'], x['mismatches']))
+        sys.exit()
+
+    benchdir = tempfile.mkdtemp(prefix='fecbench_')
+    try:
+        stages = collections.OrderedDict()
+        corpusdir = os.path.join(benchdir, 'corpus')
+        start = time.perf_counter()
+        corpus = generate_corpus(corpusdir, args.rows, args.seed)
+        stages['generate'] = time.perf_counter() - start
+
+        # Time parse_reports end to end, then time each stage
+        stages['parse'] = run_parse_reports(corpusdir, os.path.join(benchdir, 'run'), parseargs)
+        stagedir = os.path.join(benchdir, 'stages')
+        os.makedirs(stagedir)
+        stages.update(time_stages(corpusdir, stagedir))
+
+        result = {'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                  'commit': get_git_commit(),
+                  'python': platform.python_version(),
+                  'platform': platform.platform(),
+                  'settings': {'rows': args.rows, 'seed': args.seed, 'parseargs': parseargs},
+                  'corpus': corpus,
+                  'stages': dict((x, round(stages[x], 4)) for x in stages),
+                  'rowspersec': round(corpus['rows'] / stages['parse'], 1),
+                  'mbpersec': round(corpus['bytes'] / 1048576.0 / stages['parse'], 3),
+                  'peakrss': get_peak_rss()}
+        previous = load_previous_result(args.results, result)
+        save_result(args.results, result)
+        print_result(result, previous)
+    finally:
+        if args.keep:
+            print('Benchmark files kept in ' + benchdir)
+        else:
+            shutil.rmtree(benchdir)
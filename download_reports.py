@@ -4,16 +4,20 @@
 # See README.md for complete documentation
 
 # Import needed libraries
+import concurrent.futures
 import ftplib
 import glob
+import http.client
 import multiprocessing
 import os
 import pickle
 import re
+import sqlite3
+import threading
+import time
 import urllib.request, urllib.parse, urllib.error
 import urllib.request, urllib.error, urllib.parse
 import zipfile
-from scrappa import *
 
 # Try to import user settings or set them explicitly
 try:
@@ -24,19 +28,586 @@ try:
     RPTHOLDDIR = usersettings.RPTHOLDDIR
     RPTPROCDIR = usersettings.RPTPROCDIR
     RPTSVDIR = usersettings.RPTSVDIR
+    # Older usersettings files don't specify SYNCDBFILE
+    SYNCDBFILE = getattr(usersettings, 'SYNCDBFILE', '')
 except:
     ARCPROCDIR = 'C:\\data\\FEC\\Archives\\Processed\\'
     ARCSVDIR = 'C:\\data\\FEC\\Archives\\Import\\'
     RPTHOLDDIR = 'C:\\data\\FEC\\Reports\\Hold\\'
     RPTPROCDIR = 'C:\\data\\FEC\\Reports\\Processed\\'
     RPTSVDIR = 'C:\\data\\FEC\\Reports\\Import\\'
+    SYNCDBFILE = 'C:\\data\\FEC\\Reports\\syncstate.db'
+
+# When SYNCDBFILE isn't specified, the sync state database is saved in
+# the parent of RPTSVDIR, so it doesn't depend on the working directory
+if not SYNCDBFILE:
+    SYNCDBFILE = os.path.join(os.path.dirname(os.path.dirname(RPTSVDIR)),
+                              'syncstate.db')
 
 # Other user variables
 ARCFTP = 'ftp://ftp.fec.gov/FEC/electronic/'
 NUMPROC = 1  # Multiprocessing processes to run simultaneously
-RPTFTP = 'ftp.fec.gov'
 RPTURL = 'http://docquery.fec.gov/dcdev/posted/'  # Old URL: http://query.nictusa.com/dcdev/posted/
 RSSURL = 'http://efilingapps.fec.gov/rss/generate?preDefinedFilingType=ALL'  # Old URL: http://fecapps.nictusa.com/rss/generate?preDefinedFilingType=ALL
+EXTRACTARCHIVES = False  # Set to True to extract archives to RPTSVDIR rather than leave them for parse_reports to stream
+
+# Download engine settings
+CHUNKSIZE = 65536  # Bytes to read from a connection at a time
+MAXRETRIES = 5  # Attempts to make for each file before giving up
+NUMTRANSFERS = 8  # Downloads to run simultaneously
+PROGRESSINTERVAL = 10  # Seconds between progress messages
+RETRYDELAY = 2  # Seconds to wait before the first retry; doubles after each retry
+TIMEOUT = 60  # Seconds to wait on a stalled connection
+USERAGENT = 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.153 Safari/537.36 SE 2.X MetaSr 1.0'
+
+# Report directories tracked by the sync state store, in the order they
+# are searched when a report is not where the store expects it
+syncdirs = [('import', RPTSVDIR), ('processed', RPTPROCDIR),
+            ('hold', RPTHOLDDIR)]
+
+
+class DownloadEngine(object):
+    """
+    Downloads files over HTTP, HTTPS and FTP using a pool of threads.
+
+    Each thread keeps one open connection per host and reuses it for
+    every file it fetches from that host.  Files are written to a
+    .part file and renamed only after the number of bytes received
+    matches the length reported by the server, so a partial download
+    never is mistaken for a complete one.  Failed transfers are retried
+    up to maxretries times, waiting retrydelay seconds before the first
+    retry and doubling the wait after each one.  Each retry resumes
+    from the end of the .part file.
+
+    The engine counts files, bytes and retries as it goes and prints a
+    progress message every PROGRESSINTERVAL seconds.
+    """
+    def __init__(self, numtransfers=NUMTRANSFERS, maxretries=MAXRETRIES,
+                 retrydelay=RETRYDELAY, timeout=TIMEOUT):
+        self.numtransfers = max(1, numtransfers)
+        self.maxretries = max(1, maxretries)
+        self.retrydelay = retrydelay
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = []
+        self.validators = {}
+        self.reset_counters()
+
+    def close(self):
+        """
+        Closes every connection opened by the engine's threads.
+        """
+        with self.lock:
+            connections = self.connections
+            self.connections = []
+        for conn in connections:
+            self.close_connection(conn)
+
+    def close_connection(self, conn):
+        """
+        Closes a single HTTP or FTP connection, ignoring any errors.
+        """
+        try:
+            if isinstance(conn, ftplib.FTP):
+                conn.quit()
+            else:
+                conn.close()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def download(self, url, dest):
+        """
+        Downloads url and saves it as dest, retrying with backoff when a
+        transfer fails.  Returns True when the file was saved.
+        """
+        delay = self.retrydelay
+        for attempt in range(self.maxretries):
+            if attempt > 0:
+                with self.lock:
+                    self.retries += 1
+                time.sleep(delay)
+                delay *= 2
+            try:
+                nbytes = self.fetch(url, dest)
+            except (OSError, EOFError, ftplib.Error,
+                    http.client.HTTPException) as e:
+                error = e
+                # Don't retry requests the server has refused outright
+                if (isinstance(e, urllib.error.HTTPError)
+                        and 400 <= e.code < 500 and e.code not in (408, 429)):
+                    break
+                continue
+            with self.lock:
+                self.files += 1
+                self.bytes += nbytes
+            return True
+
+        with self.lock:
+            self.failed += 1
+        print(url + ' could not be downloaded. (' + str(error) + ')')
+        return False
+
+    def drop_connection(self, key):
+        """
+        Closes and forgets the current thread's connection to a host so
+        the next request opens a fresh one.
+        """
+        conns = getattr(self.local, 'conns', {})
+        conn = conns.pop(key, None)
+        if conn is not None:
+            with self.lock:
+                if conn in self.connections:
+                    self.connections.remove(conn)
+            self.close_connection(conn)
+
+    def fetch(self, url, dest):
+        """
+        Makes a single attempt to download url to dest and returns the
+        number of bytes in the file.  Raises an exception when the
+        transfer fails or the file is not the expected length.
+
+        When a .part file is left over from an earlier attempt, the
+        download resumes where it stopped.  A failed transfer keeps its
+        .part file so that the next attempt can resume it.
+        """
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        temp = dest + '.part'
+        try:
+            with open(temp, 'ab') as f:
+                if parts.scheme == 'ftp':
+                    srclen = self.fetch_ftp(key, parts.path, f)
+                else:
+                    srclen = self.fetch_http(url, f)
+                destlen = f.tell()
+        except Exception as e:
+            self.drop_connection(key)
+            if (isinstance(e, urllib.error.HTTPError) and 400 <= e.code < 500
+                    and os.path.exists(temp)):
+                os.remove(temp)
+            raise
+
+        if srclen is not None and srclen != destlen:
+            # Keep a short file so the next attempt can resume it
+            if destlen > srclen:
+                os.remove(temp)
+            raise IOError('Expected ' + str(srclen) + ' bytes but received '
+                          + str(destlen) + '.')
+        os.replace(temp, dest)
+        return destlen
+
+    def fetch_ftp(self, key, path, f):
+        """
+        Retrieves path over the current thread's FTP connection to a
+        host and appends it to the open file f, starting at the end of
+        the file.  Returns the size of the file reported by the server.
+        """
+        ftp = self.get_connection(key)
+        ftp.voidcmd('TYPE I')
+        try:
+            srclen = ftp.size(path)
+        except ftplib.error_perm:
+            srclen = None
+        offset = f.tell()
+        if offset > 0 and srclen is not None and offset <= srclen:
+            try:
+                ftp.retrbinary('RETR ' + path, f.write, blocksize=CHUNKSIZE,
+                               rest=offset)
+                return srclen
+            except ftplib.error_perm:
+                # The server does not support REST, so start over
+                pass
+        f.seek(0)
+        f.truncate()
+        ftp.retrbinary('RETR ' + path, f.write, blocksize=CHUNKSIZE)
+        return srclen
+
+    def fetch_http(self, url, f):
+        """
+        Retrieves url over the current thread's HTTP connection to a
+        host and appends the body to the open file f.  When f already
+        holds part of the file, only the remaining bytes are requested.
+        Returns the full length of the file or None when the server
+        does not send one.
+
+        The ETag and Last-Modified headers sent by the server are saved
+        in the validators dictionary.
+        """
+        offset = f.tell()
+        headers = {}
+        if offset > 0:
+            headers['Range'] = 'bytes=' + str(offset) + '-'
+        key, response = self.open_http(url, 'GET', headers)
+
+        if response.status == 416 and offset > 0:
+            # The part file is no shorter than the source, so start over
+            response.read()
+            f.seek(0)
+            f.truncate()
+            return self.fetch_http(url, f)
+        if response.status == 206 and offset > 0:
+            srclen = parse_content_range(response.getheader('Content-Range'))
+        elif response.status == 200:
+            f.seek(0)
+            f.truncate()
+            srclen = response.getheader('Content-Length')
+            srclen = int(srclen) if srclen is not None else None
+        else:
+            response.read()
+            raise urllib.error.HTTPError(url, response.status,
+                                         response.reason, response.msg, None)
+
+        while True:
+            chunk = response.read(CHUNKSIZE)
+            if not chunk:
+                break
+            f.write(chunk)
+        if response.will_close:
+            self.drop_connection(key)
+        with self.lock:
+            self.validators[url] = (response.getheader('ETag'),
+                                    response.getheader('Last-Modified'))
+        return srclen
+
+    def get_connection(self, key):
+        """
+        Returns the current thread's open connection to the host
+        identified by key, which is a (scheme, host, port) tuple,
+        opening a new connection if needed.
+        """
+        if not hasattr(self.local, 'conns'):
+            self.local.conns = {}
+        conn = self.local.conns.get(key)
+        if conn is not None:
+            return conn
+
+        scheme, host, port = key
+        if scheme == 'ftp':
+            conn = ftplib.FTP(timeout=self.timeout)
+            conn.connect(host, port or ftplib.FTP_PORT)
+            conn.login()
+        elif scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port,
+                                               timeout=self.timeout)
+        elif scheme == 'http':
+            conn = http.client.HTTPConnection(host, port,
+                                              timeout=self.timeout)
+        else:
+            raise ValueError('Unsupported URL scheme: ' + str(scheme))
+
+        self.local.conns[key] = conn
+        with self.lock:
+            self.connections.append(conn)
+        return conn
+
+    def head(self, url, etag=None, lastmodified=None):
+        """
+        Sends a lightweight metadata request for url and returns a
+        (status, length, etag, lastmodified) tuple.
+
+        When etag or lastmodified is passed, the request is conditional
+        and a status of 304 means the file has not changed.  Servers
+        that don't accept HEAD requests are sent a GET request for the
+        first byte of the file instead.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if lastmodified:
+            headers['If-Modified-Since'] = lastmodified
+        key, response = self.open_http(url, 'HEAD', headers)
+        response.read()
+        status = response.status
+        length = response.getheader('Content-Length')
+        length = int(length) if length is not None else None
+
+        if status in (405, 501):
+            headers['Range'] = 'bytes=0-0'
+            key, response = self.open_http(url, 'GET', headers)
+            response.read()
+            status = response.status
+            if status == 206:
+                status = 200
+                length = parse_content_range(
+                    response.getheader('Content-Range'))
+        if response.will_close:
+            self.drop_connection(key)
+
+        return (status, length, response.getheader('ETag'),
+                response.getheader('Last-Modified'))
+
+    def map(self, func, items):
+        """
+        Calls func(item, self) for each item using numtransfers threads
+        and returns a list of (item, result) tuples in the order the
+        calls finish.  When a call raises an exception, the exception
+        is returned as its result.
+        """
+        results = []
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.numtransfers) as executor:
+            futures = dict((executor.submit(func, item, self), item)
+                           for item in items)
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results.append((futures[future], future.result()))
+                except Exception as e:
+                    results.append((futures[future], e))
+        self.close()
+
+        return results
+
+    def open_http(self, url, method='GET', headers=None, redirects=5):
+        """
+        Sends a request over the current thread's HTTP connection to the
+        host in url, following up to five redirects.  Returns a (key,
+        response) tuple, where key identifies the connection used.
+        """
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        reqheaders = {'User-Agent': USERAGENT}
+        reqheaders.update(headers or {})
+        try:
+            conn = self.get_connection(key)
+            conn.request(method, path, headers=reqheaders)
+            response = conn.getresponse()
+        except Exception:
+            self.drop_connection(key)
+            raise
+
+        if response.status in (301, 302, 303, 307, 308) and redirects > 0:
+            response.read()
+            location = urllib.parse.urljoin(url,
+                                            response.getheader('Location'))
+            return self.open_http(location, method, headers, redirects - 1)
+
+        return key, response
+
+    def print_progress(self, done, total):
+        """
+        Prints the number of files processed and the throughput so far.
+        """
+        elapsed = max(time.time() - self.starttime, 0.001)
+        with self.lock:
+            files, failed = self.files, self.failed
+            nbytes, retries = self.bytes, self.retries
+        print('{0} of {1} file(s) processed: {2} downloaded, {3} failed, '
+              '{4} retried; {5:.1f} MB at {6:.2f} MB/s'.format(
+                  done, total, files, failed, retries, nbytes / 1048576.0,
+                  nbytes / 1048576.0 / elapsed))
+
+    def reset_counters(self):
+        """
+        Resets the progress and throughput counters.
+        """
+        self.bytes = 0
+        self.failed = 0
+        self.files = 0
+        self.retries = 0
+        self.starttime = time.time()
+
+    def run(self, func, items):
+        """
+        Calls func(item, self) for each item using numtransfers threads
+        and returns a list of items that could not be downloaded.
+        Progress is printed every PROGRESSINTERVAL seconds and once all
+        items have been processed.
+        """
+        self.reset_counters()
+        failures = []
+        lastprint = time.time()
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.numtransfers) as executor:
+            futures = dict((executor.submit(func, item, self), item)
+                           for item in items)
+            done = 0
+            for future in concurrent.futures.as_completed(futures):
+                done += 1
+                try:
+                    if not future.result():
+                        failures.append(futures[future])
+                except Exception as e:
+                    print(str(futures[future]) + ' could not be '
+                          'downloaded. (' + str(e) + ')')
+                    failures.append(futures[future])
+                if time.time() - lastprint >= PROGRESSINTERVAL:
+                    self.print_progress(done, len(futures))
+                    lastprint = time.time()
+        self.close()
+        self.print_progress(len(futures), len(futures))
+
+        return failures
+
+
+class SyncState(object):
+    """
+    Tracks every downloaded report in an SQLite database so that a run
+    does not have to walk RPTSVDIR, RPTPROCDIR and RPTHOLDDIR to learn
+    which reports it already has.
+
+    Each report is stored with its ImageID, its length in bytes, the
+    directory it was last seen in (import, processed or hold) and the
+    ETag and Last-Modified headers sent with it, if any.  Lookups
+    use the table's primary key, and every change is made in a
+    transaction so the store always matches the files on disk.
+
+    parse_reports records the location of each report it moves.  When
+    a report is not where the store expects it anyway, locate checks
+    the other directories and records the new location.
+    """
+    def __init__(self, dbfile=SYNCDBFILE):
+        self.conn = sqlite3.connect(dbfile, timeout=60)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS Reports ('
+                              'ImageID TEXT PRIMARY KEY, '
+                              'Bytes INTEGER NOT NULL, '
+                              'Location TEXT NOT NULL, '
+                              'ETag TEXT, '
+                              'LastModified TEXT) WITHOUT ROWID')
+            # Add the validator columns to stores built before they
+            # were tracked
+            columns = [row[1] for row in
+                       self.conn.execute('PRAGMA table_info(Reports)')]
+            for column in ('ETag', 'LastModified'):
+                if column not in columns:
+                    self.conn.execute('ALTER TABLE Reports ADD COLUMN '
+                                      + column + ' TEXT')
+
+    def __contains__(self, imageid):
+        return self.get(imageid) is not None
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM Reports').fetchone()[0]
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.conn.close()
+
+    def get(self, imageid):
+        """
+        Returns a (bytes, location, etag, lastmodified) tuple for a
+        report or None when the report has not been downloaded.
+        """
+        return self.conn.execute('SELECT Bytes, Location, ETag, '
+                                 'LastModified FROM Reports '
+                                 'WHERE ImageID = ?', (imageid,)).fetchone()
+
+    def locate(self, imageid):
+        """
+        Returns the full path of a downloaded report, checking the
+        other report directories and updating the store when the file
+        has been moved.  Returns None when the file no longer exists.
+        """
+        row = self.get(imageid)
+        if row is None:
+            return None
+        dirs = dict(syncdirs)
+        filename = imageid + '.fec'
+        if os.path.isfile(dirs.get(row[1], '') + filename):
+            return dirs[row[1]] + filename
+        for location, dir in syncdirs:
+            if os.path.isfile(dir + filename):
+                with self.conn:
+                    self.conn.execute('UPDATE Reports SET Location = ? '
+                                      'WHERE ImageID = ?',
+                                      (location, imageid))
+                return dir + filename
+        return None
+
+    def rebuild(self):
+        """
+        Replaces the contents of the store with the reports found in
+        RPTSVDIR, RPTPROCDIR and RPTHOLDDIR.  This walks all three
+        directories, so it should be needed only once.
+        """
+        reports = {}
+        for location, dir in reversed(syncdirs):
+            for datafile in glob.glob(os.path.join(dir, '*.fec')):
+                imageid = os.path.basename(datafile)[:-4]
+                reports[imageid] = (imageid, os.path.getsize(datafile),
+                                    location)
+        with self.conn:
+            self.conn.execute('DELETE FROM Reports')
+            self.conn.executemany('INSERT INTO Reports (ImageID, Bytes, '
+                                  'Location) VALUES (?, ?, ?)',
+                                  list(reports.values()))
+
+    def record(self, reports, location='import'):
+        """
+        Adds or updates a list of (imageid, bytes, etag, lastmodified)
+        tuples in a single transaction.
+        """
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO Reports '
+                                  '(ImageID, Bytes, ETag, LastModified, '
+                                  'Location) VALUES (?, ?, ?, ?, ?)',
+                                  [tuple(report) + (location,)
+                                   for report in reports])
+
+    def remove(self, imageid):
+        """
+        Deletes a downloaded report from the file system and the store
+        in a single transaction.
+        """
+        path = self.locate(imageid)
+        with self.conn:
+            self.conn.execute('DELETE FROM Reports WHERE ImageID = ?',
+                              (imageid,))
+            if path is not None:
+                os.remove(path)
+
+    def resume(self, imageid):
+        """
+        Moves a truncated report to a .part file in RPTSVDIR and deletes
+        it from the store in a single transaction, so the next download
+        of the report resumes where the saved file ends.
+        """
+        path = self.locate(imageid)
+        with self.conn:
+            self.conn.execute('DELETE FROM Reports WHERE ImageID = ?',
+                              (imageid,))
+            if path is not None:
+                os.replace(path, RPTSVDIR + imageid + '.fec.part')
+
+    def set_location(self, imageid, nbytes, location):
+        """
+        Records that a report nbytes long has been moved to location,
+        keeping any ETag and Last-Modified values already recorded.
+        When location is None, the report is deleted from the store but
+        its file is left alone.
+        """
+        with self.conn:
+            if location is None:
+                self.conn.execute('DELETE FROM Reports WHERE ImageID = ?',
+                                  (imageid,))
+            else:
+                self.conn.execute('INSERT INTO Reports (ImageID, Bytes, '
+                                  'Location) VALUES (?, ?, ?) '
+                                  'ON CONFLICT(ImageID) DO UPDATE SET '
+                                  'Location = excluded.Location',
+                                  (imageid, nbytes, location))
+
+    def set_validators(self, reports):
+        """
+        Saves the ETag and Last-Modified headers for a list of
+        (imageid, etag, lastmodified) tuples in a single transaction.
+        """
+        with self.conn:
+            self.conn.executemany('UPDATE Reports SET ETag = ?, '
+                                  'LastModified = ? WHERE ImageID = ?',
+                                  [(etag, lastmodified, imageid)
+                                   for imageid, etag, lastmodified
+                                   in reports])
 
 
 def build_archive_download_list(zipinfo={'mostrecent': '', 'badfiles':
@@ -48,9 +619,11 @@ def build_archive_download_list(zipinfo={'mostrecent': '', 'badfiles':
     oldarchives is a list of previously downloaded archives generated by
     the build_prior_archive_list function.
     """
-    ftp = ftplib.FTP(RPTFTP)
+    parts = urllib.parse.urlsplit(ARCFTP)
+    ftp = ftplib.FTP(timeout=TIMEOUT)
+    ftp.connect(parts.hostname, parts.port or ftplib.FTP_PORT)
     ftp.login()
-    ftp.cwd('/FEC/electronic')
+    ftp.cwd(parts.path)
     files = []
     try:
         files = ftp.nlst()
@@ -96,6 +669,9 @@ def build_prior_report_list():
     """
     Returns a list of reports housed in the directories specified by
     RPTHOLDDIR, RPTPROCDIR and RPTSVDIR.
+
+    NOTE: This function has been superseded by the SyncState class,
+    which tracks downloaded reports without walking these directories.
     """
     dirs = [RPTHOLDDIR, RPTPROCDIR, RPTSVDIR]
     reports = []
@@ -126,60 +702,37 @@ def consume_rss():
     return matches
 
 
-def download_archive(archive):
+def download_archive(archive, engine):
     """
-    Downloads a single archive file and saves it in the directory
-    specified by the ARCSVDIR variable.  After downloading an archive,
-    this subroutine compares the length of the downloaded file with the
-    length of the source file and will try to download a file up to
-    five times when the lengths don't match.
+    Downloads a single archive file using a DownloadEngine and saves it
+    in the directory specified by the ARCSVDIR variable.  The engine
+    compares the length of the downloaded file with the length of the
+    source file and retries the download when the lengths don't match.
     """
-    src = ARCFTP + archive
-    dest = ARCSVDIR + archive
-    y = 0
-    # Add a header to the request
-    try:
-        request = urllib.request.Request(src, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.153 Safari/537.36 SE 2.X MetaSr 1.0'})
-        srclen = float(urllib.request.urlopen(request).info().get('Content-Length'))
-    except:
-        y = 5
-    while y < 5:
-        try:
-            # I have added a header
-            urllib.request.URLopener.version = 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.153 Safari/537.36 SE 2.X MetaSr 1.0'
-            urllib.request.urlretrieve(src, dest)
+    return engine.download(ARCFTP + archive, ARCSVDIR + archive)
 
-            destlen = os.path.getsize(dest)
 
-            # Repeat download up to five times if files not same size
-            if srclen != destlen:
-                os.remove(dest)
-                y += 1
-                continue
-            else:
-                y = 6
-        except:
-            y += 1
-    if y == 5:
-        print((src + ' could not be downloaded.'))
+def download_report(download, engine):
+    """
+    Downloads a single electronic report using a DownloadEngine and
+    saves it in the directory specified by the RPTSVDIR variable.  The
+    engine compares the length of the downloaded file with the length
+    of the source file and retries the download when the lengths don't
+    match.
+    """
+    return engine.download(RPTURL + download + '.fec',
+                           RPTSVDIR + download + '.fec')
 
 
-@crawler
-def download_report(download, cr):
+def parse_content_range(contentrange):
     """
-    Downloads a single electronic report and saves it in the directory
-    specified by the RPTSVDIR variable.  After downloading a report,
-    this subroutine compares the length of the downloaded file with the
-    length of the source file and will try to download a file up to
-    five times when the lengths don't match.
+    Returns the full length of a file from a Content-Range header such
+    as 'bytes 0-0/12345' or None when the length is not known.
     """
-    # Construct file url and get length of file
-    url = RPTURL + download + '.fec'
-    filename = RPTSVDIR + download + '.fec'
-    with cr.download_manager(url) as path:
-        os.rename(path, filename)
-        print(filename)
+    try:
+        return int(contentrange.rsplit('/', 1)[1])
+    except (AttributeError, IndexError, ValueError):
+        return None
 
 
 def pickle_archives(archives, oldarchives):
@@ -212,23 +765,22 @@ def pickle_archives(archives, oldarchives):
 def unzip_archive(archive, overwrite=0):
     """
     Extracts any files housed in a specific archive that have not been
-    downloaded previously.
+    downloaded previously and returns a list of (imageid, bytes, etag,
+    lastmodified) tuples for the files extracted so they can be
+    recorded in the sync state store.
 
     Set the overwrite parameter to 1 if existing files should be
     overwritten.  The default value is 0.
     """
-    destdirs = [RPTSVDIR, RPTPROCDIR, RPTHOLDDIR]
+    extracted = []
+    syncstate = SyncState()
     try:
         zip = zipfile.ZipFile(ARCSVDIR + archive)
-        for subfile in zip.namelist():
-            x = 1
-            if overwrite != 1:
-                for dir in destdirs:
-                    if x == 1:
-                        if os.path.exists(dir + subfile):
-                            x = 0
-            if x == 1:
-                zip.extract(subfile, destdirs[0])
+        for member in zip.infolist():
+            imageid = member.filename.replace('.fec', '')
+            if overwrite == 1 or imageid not in syncstate:
+                zip.extract(member, RPTSVDIR)
+                extracted.append((imageid, member.file_size, None, None))
 
         zip.close()
 
@@ -242,43 +794,76 @@ def unzip_archive(archive, overwrite=0):
                                                 'downloaded again later.\n'))
         os.remove(ARCSVDIR + archive)
 
+    syncstate.close()
+    return extracted
+
 
-def verify_reports(rpts, downloaded):
+def verify_report(report, engine):
+    """
+    Sends a conditional metadata request for a single report that
+    already has been downloaded.  report is an (imageid, etag,
+    lastmodified) tuple.  Returns the (status, length, etag,
+    lastmodified) tuple returned by the engine's head method.
+    """
+    imageid, etag, lastmodified = report
+    return engine.head(RPTURL + imageid + '.fec', etag, lastmodified)
+
+
+def verify_reports(rpts, syncstate, engine):
     """
     Returns a list of indidividual reports to be downloaded.
 
     Specifically, this function compares a list of available reports
     that have been submitted to the FEC during the past seven days
-    (rpts) with a list of previously downloaded reports (downloaded).
-
-    For reports that already have been downloaded, the function verifies
-    the length of the downloaded file matches the length of the file
-    posted on the FEC website.  When the lengths do not match, the saved
-    file is deleted and retained in the download list.
+    (rpts) with the reports recorded in the sync state store
+    (syncstate).
+
+    For reports that already have been downloaded, the function uses
+    the engine to send concurrent conditional metadata requests.
+    Reports the server says have not changed since the ETag or
+    Last-Modified value recorded in the store are skipped.  Otherwise,
+    the length recorded for the downloaded file is compared with the
+    length of the file posted on the FEC website.  When the saved file
+    is shorter and no validators were recorded, it is kept as a .part
+    file so the download can resume.  Any other mismatch deletes the
+    saved file.  Either way, the report is retained in the download
+    list.
     """
     downloads = []
+    saved = {}
     for rpt in rpts:
-        childdirs = [RPTSVDIR, RPTPROCDIR, RPTHOLDDIR]
-        if rpt not in downloaded:
+        row = syncstate.get(rpt)
+        if row is None:
             downloads.append(rpt)
         else:
-            # Add a header to the request.
-            try:
-                request = urllib.request.Request(RPTURL + rpt + '.fec', headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.153 Safari/537.36 SE 2.X MetaSr 1.0'})
-                srclen = float(urllib.request.urlopen(request).info().get('Content-Length'))
-            except urllib.error.HTTPError:
-                print((RPTURL + rpt + '.fec could not be downloaded.'))
-                continue
+            saved[rpt] = row
+
+    validators = []
+    results = engine.map(verify_report, [(rpt, row[2], row[3])
+                                         for rpt, row in saved.items()])
+    for (rpt, etag, lastmodified), result in results:
+        if isinstance(result, Exception):
+            print((RPTURL + rpt + '.fec could not be verified. ('
+                   + str(result) + ')'))
+            continue
+        status, srclen, newetag, newlastmodified = result
+        if status == 304:
+            continue
+        if status != 200:
+            print((RPTURL + rpt + '.fec could not be verified. (HTTP '
+                   + str(status) + ')'))
+            continue
 
-            for child in childdirs:
-                try:
-                    destlen = os.path.getsize(child + rpt + '.fec')
-                    if srclen != destlen:
-                        downloads.append(rpt)
-                        os.remove(child + rpt + '.fec')
-                except:
-                    pass
+        destlen = saved[rpt][0]
+        if srclen is None or srclen == destlen:
+            validators.append((rpt, newetag, newlastmodified))
+        elif srclen > destlen and etag is None and lastmodified is None:
+            downloads.append(rpt)
+            syncstate.resume(rpt)
+        else:
+            downloads.append(rpt)
+            syncstate.remove(rpt)
+    syncstate.set_validators(validators)
 
     return downloads
 
@@ -304,6 +889,15 @@ if __name__ == '__main__':
     # zipinfo['mostrecent'] = '20121231.zip' # YYYYMMDD.zip
     # zipinfo['badfiles'] = [] # You probably want to leave this blank
 
+    # Open the sync state store, building it from the report
+    # directories the first time the module runs
+    syncstate = SyncState()
+    if len(syncstate) == 0:
+        print('Building the sync state store from previously '
+              'downloaded reports...')
+        syncstate.rebuild()
+        print(('Done! ' + str(len(syncstate)) + ' reports found.\n'))
+
     # Build a list of previously downloaded archives
     print('Building a list of previously downloaded archive files...')
     oldarchives = build_prior_archive_list()
@@ -319,23 +913,28 @@ if __name__ == '__main__':
         print('Done!\n')
         print(('Downloading ' + str(len(archives))
               + ' new archive(s)...'))
-        pool = multiprocessing.Pool(processes=NUMPROC)
-        for archive in archives:
-            pool.apply_async(download_archive(archive))
-        pool.close()
-        pool.join()
+        engine = DownloadEngine()
+        engine.run(download_archive, archives)
         print('Done!\n')
 
-        # Open each archive and extract new reports
-        print('Extracting files from archives...')
-        pool = multiprocessing.Pool(processes=NUMPROC)
-        for archive in archives:
-            # Make sure archive was downloaded
-            if os.path.isfile(ARCSVDIR + archive):
-                pool.apply_async(unzip_archive(archive, 0))
-        pool.close()
-        pool.join()
-        print('Done!\n')
+        # Open each archive and extract new reports. Unless
+        # EXTRACTARCHIVES is set, the archives are left in ARCSVDIR and
+        # parse_reports streams the reports directly from them.
+        if EXTRACTARCHIVES:
+            print('Extracting files from archives...')
+            pool = multiprocessing.Pool(processes=NUMPROC)
+            results = []
+            for archive in archives:
+                # Make sure archive was downloaded
+                if os.path.isfile(ARCSVDIR + archive):
+                    results.append(pool.apply_async(unzip_archive,
+                                                    (archive, 0)))
+            pool.close()
+            # Record the extracted reports as each archive finishes
+            for result in results:
+                syncstate.record(result.get())
+            pool.join()
+            print('Done!\n')
 
         # Rebuild list of downloaded archives
         print('Rebuilding list of downloaded archives...')
@@ -347,11 +946,6 @@ if __name__ == '__main__':
         zipinfo = pickle_archives(archives, oldarchives)
         print('Done!\n')
 
-    # Build list of previously downloaded reports
-    print('Building a list of previously downloaded reports...')
-    downloaded = build_prior_report_list()
-    print('Done!\n')
-
     # Consume FEC's RSS feed to get list of files posted in the past
     # seven days
     print('Consuming FEC RSS feed to find new reports...')
@@ -362,16 +956,18 @@ if __name__ == '__main__':
     # downloaded.  If it has, verify the downloaded file is the correct
     # length.
     print('Compiling list of reports to download...')
-    newrpts = verify_reports(rpts, downloaded)
+    engine = DownloadEngine()
+    newrpts = verify_reports(rpts, syncstate, engine)
     print(('Done! ' + str(len(newrpts)) + ' reports flagged for '
                                          'download.\n'))
 
     # Download each of these reports
     print('Downloading new reports...')
-    pool = multiprocessing.Pool(processes=NUMPROC)
-    for rpt in newrpts:
-        pool.apply_async(download_report(rpt))
-    pool.close()
-    pool.join()
+    failures = set(engine.run(download_report, newrpts))
+    syncstate.record([(rpt, os.path.getsize(RPTSVDIR + rpt + '.fec'))
+                      + engine.validators.get(RPTURL + rpt + '.fec',
+                                              (None, None))
+                      for rpt in newrpts if rpt not in failures])
+    syncstate.close()
     print('Done!\n')
     print('Process completed.')
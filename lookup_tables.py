@@ -0,0 +1,123 @@
+# Resolve codes to the surrogate keys of the lookup tables
+# Shared by parse_reports and update_master_files
+# See README.md for complete documentation
+
+# Import needed libraries
+import collections
+import sqlite3
+
+# Lookup tables resolved by LookupCache, used by the SQLite header store
+# in parse_reports and the SQLite staging tables in update_master_files
+lkptables = {'lkpAffRel': 'USATID INTEGER PRIMARY KEY, AffRelCd TEXT NOT NULL UNIQUE, AffRelDesc TEXT',
+             'lkpCandidates': 'USATID INTEGER PRIMARY KEY, FECCandID TEXT NOT NULL UNIQUE, PeopleID INTEGER',
+             'lkpCommittees': 'USATID INTEGER PRIMARY KEY, FECCommID TEXT NOT NULL UNIQUE, CleanCommName TEXT',
+             'lkpElec': 'USATID INTEGER PRIMARY KEY, ElecCd TEXT NOT NULL UNIQUE',
+             'lkpExpCat': 'USATID INTEGER PRIMARY KEY, ExpCatCd TEXT NOT NULL UNIQUE, ExpCatDesc TEXT',
+             'lkpEntTp': 'USATID INTEGER PRIMARY KEY, EntTp TEXT NOT NULL UNIQUE, EntTpDesc TEXT',
+             'lkpF1CommTp': 'F1CommTpCd TEXT PRIMARY KEY, F1CommTpDesc TEXT',
+             'lkpFormTp': 'USATID INTEGER PRIMARY KEY, FormTp TEXT NOT NULL UNIQUE',
+             'lkpLnNbr': 'USATID INTEGER PRIMARY KEY, LnNbr TEXT NOT NULL UNIQUE',
+             'lkpPACTp': 'PACTpCd TEXT PRIMARY KEY, PACTp TEXT NOT NULL',
+             'lkpParties': 'USATID INTEGER PRIMARY KEY, FECCode TEXT NOT NULL UNIQUE, Party TEXT NOT NULL, '
+                           'Short TEXT NOT NULL',
+             'lkpPartyTp': 'USATID INTEGER PRIMARY KEY, PartyTpCd TEXT NOT NULL UNIQUE, PartyTpDesc TEXT',
+             'lkpRptPrd': 'USATID INTEGER PRIMARY KEY, RptPrdCd TEXT NOT NULL UNIQUE, RptPrdDesc TEXT, '
+                          'RptPrdNotes TEXT',
+             'lkpTransPurp': 'USATID INTEGER PRIMARY KEY, TransPurpCd TEXT NOT NULL UNIQUE, TransPurp TEXT, '
+                             'ContPurpID INTEGER, ExpPurpID INTEGER',
+             'lkpTransTp': 'USATID INTEGER PRIMARY KEY, TransTp TEXT NOT NULL UNIQUE, TransDesc TEXT'}
+
+
+class LookupCache(object):
+    # Resolves codes to the surrogate keys of the lookup tables in
+    # memory, replacing the look up, insert missing, look up again
+    # pattern of the usp_Add* and usp_Scrub* stored procedures. Each
+    # table is read once, the first time one of its codes is requested.
+    # New codes are assigned the next USATID in memory and are inserted
+    # in bulk when flush is called, which must happen before the
+    # connection is committed. Call rollback after rolling back the
+    # connection so codes that were never committed are forgotten.
+    # Missing values are looked up as empty
+    # strings. Lookup tables without a USATID column are referenced by
+    # the value itself.
+    #
+    # conn is an SQLite or pyodbc connection. When identityinsert is
+    # True, new codes are inserted with IDENTITY_INSERT turned on, as
+    # SQL Server requires. SQLite databases can be shared by worker
+    # processes: a table is reread while the database is locked before
+    # a new code is assigned, so each process assigns the next USATID
+    # not used by the others.
+
+    def __init__(self, conn, identityinsert=False):
+        self.conn = conn
+        self.identityinsert = identityinsert
+        self.ids = {}
+        self.maxids = {}
+        self.pending = collections.defaultdict(list)
+
+    def flush(self):
+        for table, columns in sorted(self.pending):
+            rows = self.pending[(table, columns)]
+            sql = ('INSERT INTO ' + table + ' (' + ', '.join(columns) + ') VALUES (' +
+                   ', '.join(['?'] * len(columns)) + ')')
+            if self.identityinsert and columns[0] == 'USATID':
+                self.conn.execute('SET IDENTITY_INSERT ' + table + ' ON')
+            self.conn.cursor().executemany(sql, rows)
+            if self.identityinsert and columns[0] == 'USATID':
+                self.conn.execute('SET IDENTITY_INSERT ' + table + ' OFF')
+        self.pending.clear()
+
+    def get_id(self, table, column, val, defaults=None):
+        # Returns the USATID of val in table, where column houses the
+        # codes, assigning the next USATID if val is new. defaults houses
+        # the values of any other required columns of new codes.
+        if val is None:
+            val = ''
+        if table not in self.ids:
+            self.ids[table] = {}
+            self.maxids[table] = 0
+            self.load(table, column)
+        ids = self.ids[table]
+        if val not in ids:
+            # Another process may have added the code since the table
+            # was read
+            if isinstance(self.conn, sqlite3.Connection) and not self.conn.in_transaction:
+                self.conn.execute('BEGIN IMMEDIATE')
+            self.load(table, column)
+        if val not in ids:
+            if defaults is None:
+                defaults = {}
+            columns = [column] + sorted(defaults)
+            values = [val] + [defaults[x] for x in sorted(defaults)]
+            if 'USATID' in lkptables[table]:
+                self.maxids[table] += 1
+                ids[val] = self.maxids[table]
+                columns.insert(0, 'USATID')
+                values.insert(0, ids[val])
+            else:
+                ids[val] = val
+            self.pending[(table, tuple(columns))].append(tuple(values))
+        return ids[val]
+
+    def rollback(self):
+        # Every table is read again the next time one of its codes is
+        # requested
+        self.ids = {}
+        self.maxids = {}
+        self.pending.clear()
+
+    def load(self, table, column):
+        # Reads the codes added to table since it was last read
+        ids = self.ids[table]
+        if 'USATID' in lkptables[table]:
+            rows = self.conn.execute('SELECT ' + column + ', USATID FROM ' + table + ' WHERE USATID > ?',
+                                     (self.maxids[table],)).fetchall()
+            for code, usatid in rows:
+                # SQL Server pads char codes with spaces
+                if self.identityinsert:
+                    code = code.rstrip(' ')
+                ids[code] = usatid
+                self.maxids[table] = max(self.maxids[table], usatid)
+        else:
+            for row in self.conn.execute('SELECT ' + column + ' FROM ' + table).fetchall():
+                ids[row[0]] = row[0]
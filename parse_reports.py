@@ -4,13 +4,39 @@
 # See README.md for complete documentation
 
 # Import needed libraries
+import argparse
+import collections
 import csv
 import datetime
+import decimal
+import functools
 import glob
-import linecache
+import heapq
+import io
+import itertools
+import json
+import mmap
+import multiprocessing
+import multiprocessing.util
+import operator
 import os
+import pickle
 import shutil
+import sqlite3
+import sys
 import time
+import traceback
+import zipfile
+
+from download_reports import SyncState
+from lookup_tables import LookupCache, lkptables
+
+# pyarrow is needed only to write Parquet data files
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 """
   Currently supported forms and versions:
@@ -44,6 +70,8 @@ import time
 try:
     import usersettings
 
+    ARCPROCDIR = usersettings.ARCPROCDIR
+    ARCSVDIR = usersettings.ARCSVDIR
     DBCONNSTR = usersettings.DBCONNSTR
     RPTERRDIR = usersettings.RPTERRDIR
     RPTHOLDDIR = usersettings.RPTHOLDDIR
@@ -52,6 +80,8 @@ try:
     RPTRVWDIR = usersettings.RPTRVWDIR
     RPTSVDIR = usersettings.RPTSVDIR
 except:
+    ARCPROCDIR = 'C:\\data\\FEC\\Archives\\Processed\\'
+    ARCSVDIR = 'C:\\data\\FEC\\Archives\\Import\\'
     DBCONNSTR = ''
     RPTERRDIR = 'C:\\data\\FEC\\Reports\\ErrorLogs\\'
     RPTHOLDDIR = 'C:\\data\\FEC\\Reports\\Hold\\'
@@ -77,8 +107,79 @@ SRCDELIMITER = chr(28)
 # Set the delimiter to be used for output data files
 OUTPUTDELIMITER = '\t'
 
-# Create counter variable to stop file iteration when reaches filelimit
-filectr = 0
+# Encoding used to read electronic reports. Filings should be ASCII,
+# but some vendor software emits stray Latin-1 characters. Latin-1
+# maps every byte to a character, so those filings are parsed rather
+# than stopping the run.
+SRCENCODING = 'latin-1'
+
+# Format of the entries written to the error logs in RPTERRDIR: 'text'
+# for the tab-delimited .log files or 'json' for JSON lines (.jsonl)
+ERRORLOGFORMAT = 'text'
+
+# Number of error log entries held in memory before they are written
+# to the error logs
+ERRORLOGBUFFER = 10000
+
+# Number of distinct date strings whose parsed values are cached
+DATECACHESIZE = 65536
+
+# Number of distinct row type codes (the first field of each child row)
+# and header versions whose row handlers are cached
+ROWTYPECACHESIZE = 4096
+
+# Number of processes used to parse reports. Each process parses whole
+# reports or, for reports larger than CHUNKSIZE, chunks of reports. This
+# value can be overridden with the --workers argument.
+NUMPROC = 1
+
+# When reports are parsed by more than one process, reports larger than
+# this many bytes are split into chunks of about this size whose rows
+# are parsed by different processes, so one very large report doesn't
+# keep a single process busy while the rest sit idle. Set to 0 to parse
+# every report in a single process.
+CHUNKSIZE = 67108864
+
+# Number of bytes buffered in memory for each output data file before
+# rows are written to disk
+OUTPUTBUFFER = 1048576
+
+# Format of the data files: 'text' for delimited text files,
+# 'parquet' for typed, columnar Parquet files (requires pyarrow) or
+# 'sqlite' to load child rows into the SchA through SchText and Form1S
+# tables of the SQLite database specified by HDRDBFILE (requires the
+# sqlite header store). This value can be overridden with the --format
+# argument.
+OUTPUTFORMAT = 'text'
+
+# Number of rows written to each row group in Parquet data files
+ROWGROUPSIZE = 100000
+
+# Pickle housing the index of parsed reports used by --skip-superseded
+# to find reports that have been replaced by a later amendment
+RPTINDEXFILE = RPTPROCDIR + 'rptindex.p'
+
+# Where report headers are loaded: 'sqlserver' to leave header loading
+# to the usp_AddRptHdr_* stored procedures in SQL Server or 'sqlite' to
+# load them into the SQLite database specified by HDRDBFILE. This value
+# can be overridden with the --header-store argument.
+HDRSTORE = 'sqlserver'
+
+# SQLite database housing report headers and lookup tables
+HDRDBFILE = RPTOUTDIR + 'RptHdrs.db'
+
+# Number of child rows held in memory before they are inserted into
+# SQLite when the data files format is 'sqlite'. Rows are inserted in
+# the transaction of the filing they belong to, which is committed
+# along with the filing's header.
+CHILDBATCHSIZE = 10000
+
+# Number of slowest reports listed in the run summary written when
+# reports are parsed with the --profile argument
+PROFILETOPN = 20
+
+# Current year, used to determine the century of two-digit years
+CURRYEAR = datetime.datetime.now().year
 
 # Build header variables
 # Note that H3 header versions 1 and 2 have been disabled. I have found
@@ -1174,24 +1275,257 @@ outputhdrs = {
            'BegCOH_T', 'Rcpts_T', 'Subtotal_T', 'Disb_T', 'EndCOH_T'],
     'TEXT': ['LineNbr', 'CommID', 'TransID', 'BkRefTransID', 'BkRefSchdNm', 'FullText']}
 
-
-def add_entry_to_error_log(logfile, logtext):
-    with open(logfile, 'a') as output:
-        output.write(logtext.strip() + '\n')
-
-
-def build_data_row(data, headers, imageid, rpttype):
-    output = [str(imageid)]
-    if rpttype != None:
-        output.append(rpttype)
-    for header in headers:
-        if data[header] == None:
-            output.append('')
-        elif data[header] == '':
-            output.append('')
-        else:
-            output.append(data[header])
-    return output
+# Full name fields used in older electronic filings until the FEC
+# decided to split names across multiple fields. The module attempts to
+# parse these names into the split fields and does not write the full
+# name fields to the output data files.
+fullnamehdrs = {'SA': ['ContFullName', 'DonorCandFullName'],
+                'SB': ['PayeeFullName', 'BenCandFullName'],
+                'SC': ['LenderFullName', 'LenderCandFullName'],
+                'SC1': ['LendRepFullName', 'TrsFullName'],
+                'SC2': ['GuarFullName'],
+                'SE': ['PayeeFullName', 'SupOppCandFullName', 'CompFullName'],
+                'SF': ['PayeeFullName', 'PayeeCandFullName'],
+                'H4': ['PayeeFullName'],
+                'H6': ['PayeeFullName'],
+                'F1S': ['AgtFullName']}
+
+# Filename prefixes for the data file generated for each child row type
+outputprefixes = {'SA': 'SchedA',
+                  'SB': 'SchedB',
+                  'SC': 'SchedC',
+                  'SC1': 'SchedC1',
+                  'SC2': 'SchedC2',
+                  'SD': 'SchedD',
+                  'SE': 'SchedE',
+                  'SF': 'SchedF',
+                  'H1': 'SchedH1',
+                  'H2': 'SchedH2',
+                  'H3': 'SchedH3',
+                  'H4': 'SchedH4',
+                  'H5': 'SchedH5',
+                  'H6': 'SchedH6',
+                  'SI': 'SchedI',
+                  'SL': 'SchedL',
+                  'TEXT': 'Text',
+                  'F1S': 'F1S'}
+
+# Data types of child row columns. Each column is converted to its type
+# when the row is cleaned and written as that type in Parquet and SQLite
+# data files. Columns not listed here are cleaned and written as text.
+outputtypes = {'date': ['ContDt', 'CovgFmDt', 'CovgToDt', 'DepAcctAuthDt', 'DepAcctEstDt', 'DissmntnDt', 'DueDt',
+                        'ExpDt', 'IncurredDt', 'LendRepSignDt', 'OrigLoanDt', 'RcptDt', 'SignDt', 'TrsSignDt'],
+               'currency': ['BalClose_P', 'BegBlnc_P', 'BegCOH', 'BegCOH2', 'BegCOH_P', 'BegCOH_T', 'CollateralVal',
+                            'ContAgg', 'ContAmt', 'CrdtAmtThisDraw', 'DirStLocCandSup', 'DirStLocCandSup2', 'Disb',
+                            'Disb2', 'Disb_P', 'Disb_T', 'EndCOH', 'EndCOH2', 'EndCOH_P', 'EndCOH_T', 'EventAgg',
+                            'ExpAgg', 'ExpAmt', 'FedAmt', 'FedPct', 'FutIncEstVal', 'GOTVAmt', 'GenCampAmt', 'GuarAmt',
+                            'IncurAmt_P', 'IndRcptsItem_P', 'IndRcptsItem_T', 'IndRcptsTot_P', 'IndRcptsTot_T',
+                            'IndRcptsUnitem_P', 'IndRcptsUnitem_T', 'LevinAmt', 'LoanAmt', 'LoanBlnc', 'NonFedAmt',
+                            'NonFedPct', 'OthDisb', 'OthDisb2', 'OthDisb_P', 'OthDisb_T', 'OthRcpts_P', 'OthRcpts_T',
+                            'PymtAmt_P', 'PymtToDt', 'Rcpts', 'Rcpts2', 'Rcpts_P', 'Rcpts_T', 'SemiAnnRefBundAmt',
+                            'Subtotal', 'Subtotal2', 'Subtotal_P', 'Subtotal_T', 'TotAmt', 'TotAmtTrans', 'TotBlnc',
+                            'TotDisb', 'TotDisb2', 'TotDisb_P', 'TotDisb_T', 'TotExpAmt', 'TotRcpts', 'TotRcpts2',
+                            'TotRcpts_P', 'TotRcpts_T', 'TransAmt', 'TransGOTV_P', 'TransGOTV_T', 'TransGenCamp_P',
+                            'TransGenCamp_T', 'TransToFed', 'TransToFed2', 'TransToStAndLoc', 'TransToStAndLoc2',
+                            'TransTot_P', 'TransTot_T', 'TransVotID_P', 'TransVotID_T', 'TransVotReg_P',
+                            'TransVotReg_T', 'VotIDAmt', 'VotRegnAmt'],
+               'tinyint': ['BenCandDist', 'CreditorCandDist', 'DonorCandDist', 'LenderCandDist', 'PayeeCandDist',
+                           'SupOppCandDist'],
+               'bit': ['MemoCd', 'flgActGOTV', 'flgActGenCamp', 'flgActVotID', 'flgActVotRegn', 'flgAdmRatio',
+                       'flgAdminActivity', 'flgCollateral', 'flgDesigCoordExp', 'flgDirCandSup', 'flgDirFndrsg',
+                       'flgDirectFndrsg', 'flgExempt', 'flgFlatMin50PctFed', 'flgFutIncPledged', 'flgGenVtrDrv',
+                       'flgGenericVoterDrvRatio', 'flgLoanRestructured', 'flgOthersLiable', 'flgPerfectedInt',
+                       'flgPersFunds', 'flgPubCommun', 'flgPubCommunRefPrtyRatio', 'flgSecured',
+                       'flgStLocFxPctNonPresNonSen', 'flgStLocFxPctPresAndSen', 'flgStLocFxPctPresOnly',
+                       'flgStLocFxPctSenOnly']}
+
+# Checks applied to child row columns when the row is cleaned, in
+# addition to the conversions listed in outputtypes. 'maxlen' stops the
+# run if the cleaned text is longer than the given length. 'district'
+# blanks districts that repeat the given state column or hold NA.
+# 'fullname' splits a full name field into the name fields beginning
+# with the given prefix before those fields are cleaned. The Schedule C
+# lender and F1S agent full names are not split.
+childfieldchecks = {'SA': {'ContFullName': ('fullname', 'Cont'),
+                           'DonorCandFullName': ('fullname', 'DonorCand'),
+                           'DonorCandOfc': ('maxlen', 3),
+                           'DonorCommID': ('maxlen', 11),
+                           'Emp': ('maxlen', 38),
+                           'Occ': ('maxlen', 38),
+                           'StAbbr': ('maxlen', 2),
+                           'TransID': ('maxlen', 20)},
+                    'SB': {'BenCandDist': ('district', 'BenCandState'),
+                           'BenCandFullName': ('fullname', 'BenCand'),
+                           'PayeeFullName': ('fullname', 'Payee')},
+                    'SC1': {'LendRepFullName': ('fullname', 'LendRep'),
+                            'TrsFullName': ('fullname', 'Trs')},
+                    'SC2': {'GuarFullName': ('fullname', 'Guar')},
+                    'SE': {'CompFullName': ('fullname', 'Comp'),
+                           'PayeeFullName': ('fullname', 'Payee'),
+                           'SupOppCandFullName': ('fullname', 'SupOppCand')},
+                    'SF': {'PayeeCandFullName': ('fullname', 'PayeeCand'),
+                           'PayeeFullName': ('fullname', 'Payee')},
+                    'H4': {'PayeeFullName': ('fullname', 'Payee')},
+                    'H6': {'PayeeFullName': ('fullname', 'Payee')}}
+
+# Report header tables used by the SQLite header store
+hdrtables = {'F1': 'Form1',
+             'F3': 'RptHdrs_F3',
+             'F3L': 'RptHdrs_F3L',
+             'F3P': 'RptHdrs_F3P',
+             'F3X': 'RptHdrs_F3X'}
+
+# Report header columns whose names in the header tables differ from
+# the names used in outputhdrs
+hdrcolumns = {'AddrChg': 'flgAddrChg',
+              'CovgFmDt': 'CovgFmDate',
+              'CovgToDt': 'CovgToDate',
+              'ElecSt': 'ElecStAbbr',
+              'GenElec': 'flgGenElec',
+              'PrimElec': 'flgPrimElec',
+              'StateOfElec': 'StOfElecAbbr'}
+
+# Report header columns stored as a reference to a lookup table, as in
+# the usp_AddRptHdr_* stored procedures. Each entry houses the lookup
+# table, the lookup column matched to the value, the header table column
+# housing the reference and the values of any other required lookup
+# columns. Lookup tables without a USATID column are referenced by the
+# value itself.
+hdrlookups = {'AffCandID': ('lkpCandidates', 'FECCandID', 'AffCandID', {}),
+              'AffCommID': ('lkpCommittees', 'FECCommID', 'AffCommID', {}),
+              'AffRelCd': ('lkpAffRel', 'AffRelCd', 'AffRelID', {}),
+              'CandID': ('lkpCandidates', 'FECCandID', 'CandID', {}),
+              'CommID': ('lkpCommittees', 'FECCommID', 'CommID', {}),
+              'CommTp': ('lkpF1CommTp', 'F1CommTpCd', 'F1CommTpCd', {'F1CommTpDesc': 'Undefined'}),
+              'ElecCd': ('lkpElec', 'ElecCd', 'ElecID', {}),
+              'FormTp': ('lkpFormTp', 'FormTp', 'FormTpID', {}),
+              'PACTp': ('lkpPACTp', 'PACTpCd', 'PACTp', {'PACTp': 'Undefined'}),
+              'PtyCd': ('lkpParties', 'FECCode', 'PartyID', {'Party': 'Undefined', 'Short': 'O'}),
+              'PtyTp': ('lkpPartyTp', 'PartyTpCd', 'PartyTpID', {}),
+              'RptCd': ('lkpRptPrd', 'RptPrdCd', 'RptPrdID', {})}
+
+# File header fields loaded with each report header and the names of
+# the columns that house them
+filehdrcolumns = [('Ver', 'HdrVer'),
+                  ('SftNm', 'SoftNm'),
+                  ('SftVer', 'SoftVer'),
+                  ('RptID', 'RptID'),
+                  ('RptNbr', 'RptNbr'),
+                  ('HdrCmnt', 'HdrCmnt')]
+
+# Tables loaded with each type of child row when the data files format
+# is 'sqlite'
+childtables = {'SA': 'SchA',
+               'SB': 'SchB',
+               'SC': 'SchC',
+               'SC1': 'SchC1',
+               'SC2': 'SchC2',
+               'SD': 'SchD',
+               'SE': 'SchE',
+               'SF': 'SchF',
+               'H1': 'SchH1',
+               'H2': 'SchH2',
+               'H3': 'SchH3',
+               'H4': 'SchH4',
+               'H5': 'SchH5',
+               'H6': 'SchH6',
+               'SI': 'SchI',
+               'SL': 'SchL',
+               'TEXT': 'SchText',
+               'F1S': 'Form1S'}
+
+# Child row columns whose names in the child tables differ from the
+# names used in outputhdrs
+childcolumns = {'AcctLocState': 'AcctLocStAbbr',
+                'BenCandState': 'BenCandStAbbr',
+                'ConduitName': 'ConduitNm',
+                'ConduitState': 'ConduitStAbbr',
+                'CreditorCandFullName': 'CreditorCandFullNm',
+                'CreditorCandState': 'CreditorCandStAbbr',
+                'CreditorOrgName': 'CreditorOrgNm',
+                'CreditorState': 'CreditorStAbbr',
+                'DonorCandSt': 'DonorCandStAbbr',
+                'GuarState': 'GuarStAbbr',
+                'JtFndCommNm': 'JtCommNm',
+                'LenderCandState': 'LenderCandStAbbr',
+                'LenderState': 'LenderStAbbr',
+                'MemoCd': 'flgMemo',
+                'PayeeState': 'PayeeStAbbr'}
+
+# Child row columns stored as a reference to a lookup table, in the same
+# form as hdrlookups. The form type of F1S rows is stored as a line
+# number.
+childlookups = {'AffCandID': ('lkpCandidates', 'FECCandID', 'AffCandID', {}),
+                'AffCommID': ('lkpCommittees', 'FECCommID', 'AffCommID', {}),
+                'AffRelCd': ('lkpAffRel', 'AffRelCd', 'AffRelID', {}),
+                'BenCandID': ('lkpCandidates', 'FECCandID', 'BenCandID', {}),
+                'BenCommID': ('lkpCommittees', 'FECCommID', 'BenCommID', {}),
+                'BkRefSchdNm': ('lkpLnNbr', 'LnNbr', 'BkRefSchdID', {}),
+                'CommID': ('lkpCommittees', 'FECCommID', 'CommID', {}),
+                'ContPurpCd': ('lkpTransPurp', 'TransPurpCd', 'TransPurpID', {}),
+                'CreditorCandID': ('lkpCandidates', 'FECCandID', 'CreditorCandID', {}),
+                'CreditorCommID': ('lkpCommittees', 'FECCommID', 'CreditorCommID', {}),
+                'DesigCommID': ('lkpCommittees', 'FECCommID', 'DesigCommID', {}),
+                'DonorCandID': ('lkpCandidates', 'FECCandID', 'DonorCandID', {}),
+                'DonorCommID': ('lkpCommittees', 'FECCommID', 'DonorCommID', {}),
+                'ElecCd': ('lkpElec', 'ElecCd', 'ElecID', {}),
+                'EntTp': ('lkpEntTp', 'EntTp', 'EntTpID', {}),
+                'ExpCatCd': ('lkpExpCat', 'ExpCatCd', 'ExpCatID', {}),
+                'ExpPurpCd': ('lkpTransPurp', 'TransPurpCd', 'TransPurpID', {}),
+                'FormTp': ('lkpLnNbr', 'LnNbr', 'LnNbrID', {}),
+                'JtFundCommID': ('lkpCommittees', 'FECCommID', 'JtCommID', {}),
+                'LenderCandID': ('lkpCandidates', 'FECCandID', 'LenderCandID', {}),
+                'LenderCommID': ('lkpCommittees', 'FECCommID', 'LenderCommID', {}),
+                'LineNbr': ('lkpLnNbr', 'LnNbr', 'LnNbrID', {}),
+                'PayeeCandID': ('lkpCandidates', 'FECCandID', 'PayeeCandID', {}),
+                'PayeeCommID': ('lkpCommittees', 'FECCommID', 'PayeeCommID', {}),
+                'SubordCommID': ('lkpCommittees', 'FECCommID', 'SubordCommID', {}),
+                'SupOppCandID': ('lkpCandidates', 'FECCandID', 'SupOppCandID', {})}
+
+
+def add_entry_to_error_log(logfile, logtext, fields=None):
+    # Entries are buffered by errorlog and written to logfile in
+    # batches. fields is a dictionary describing the entry, which is
+    # written in place of logtext when ERRORLOGFORMAT is 'json'.
+    errorlog.add(logfile, logtext, fields)
+
+
+def add_field_error_to_error_log(logfile, image, sched, trans, rownbr, formtype, fieldname, val, dateformat=None):
+    fields = collections.OrderedDict([('image', str(image)), ('sched', sched), ('trans', trans),
+                                      ('rownbr', str(rownbr)), ('formtype', formtype), ('fieldname', fieldname),
+                                      ('val', val)])
+    if dateformat is not None:
+        fields['dateformat'] = dateformat
+    add_entry_to_error_log(logfile, '\t'.join(fields.values()), fields)
+
+
+def build_header_map(filehdrs, outputhdrs):
+    # Compile filehdrs into a dictionary keyed by (form type, version)
+    # so each row can be mapped to its output columns with one lookup.
+    # Each value is a tuple housing the output column names, a getter
+    # that pulls the matching source columns from a parsed row in a
+    # single pass and the number of source columns the getter needs.
+    # Columns not included in outputhdrs are dropped here once rather
+    # than on every row. File headers (Hdr) have no output headers, so
+    # all of their columns are kept. When a version appears in more than
+    # one version list, the last list wins.
+    hdrmap = {}
+    for hdr in filehdrs:
+        for subhdr in hdr[1]:
+            rowhdrs = subhdr[1]
+            outputcols = set(outputhdrs.get(hdr[0], rowhdrs))
+            srcidx = [x for x in range(len(rowhdrs)) if rowhdrs[x] in outputcols]
+            names = tuple(rowhdrs[x] for x in srcidx)
+            if len(srcidx) > 1:
+                getter = operator.itemgetter(*srcidx)
+            elif len(srcidx) == 1:
+                getter = lambda row, x=srcidx[0]: (row[x],)
+            else:
+                getter = lambda row: ()
+            width = srcidx[-1] + 1 if srcidx else 0
+            for version in subhdr[0]:
+                hdrmap[(hdr[0], version)] = (names, getter, width)
+    return hdrmap
 
 
 def build_list_of_supported_report_types():
@@ -1201,6 +1535,136 @@ def build_list_of_supported_report_types():
     return types
 
 
+def build_row_cleaners(filehdrs):
+    # Compile a cleaning function for each version of each child row
+    # type in filehdrs, keyed by (form type, version) like the header
+    # map. Each function takes a parsed row, the ImageID, the row number,
+    # the file header's NmDelim and DtFmt values and the report type and
+    # returns the output row: the ImageID, the report type (except for
+    # F1S rows) and the outputhdrs columns, each cleaned as text or
+    # converted to the type listed in outputtypes and checked against
+    # childfieldchecks. The functions are generated from source so each
+    # column is read straight from its position in the row and held in
+    # a local variable, and columns missing from a version are not
+    # cleaned at all. Columns are cleaned in outputhdrs order because
+    # the conversions log the cleaned LineNbr and TransID values.
+    fieldtypes = {}
+    for fieldtype in outputtypes:
+        for field in outputtypes[fieldtype]:
+            fieldtypes[field] = fieldtype
+    cleaners = {}
+    for hdr in filehdrs:
+        formtype = hdr[0]
+        if formtype not in outputprefixes:
+            continue
+        checks = childfieldchecks.get(formtype, {})
+        fields = parsedhdrs[formtype]
+        var = dict((fields[x], 'v' + str(x)) for x in range(len(fields)))
+        rowdata = 'dict(zip(' + repr(tuple(fields)) + ', (' + ', '.join(var[x] for x in fields) + ',)))'
+        for subhdr in hdr[1]:
+            # Find each column's position in the row. When a column
+            # appears more than once, the last position wins.
+            srcidx = {}
+            for x in range(len(subhdr[1])):
+                if subhdr[1][x] in var:
+                    srcidx[subhdr[1][x]] = x
+            width = max(srcidx.values()) + 1 if srcidx else 0
+
+            # Name fields filled by a full name field found in this
+            # version must be cleaned even if they are missing
+            splitnames = {}
+            for field in srcidx:
+                if checks.get(field, ('',))[0] == 'fullname':
+                    prefix = checks[field][1]
+                    splitnames[prefix + 'LName'] = (field, [prefix + x for x in ('LName', 'FName', 'MName', 'Pfx',
+                                                                                 'Sfx')])
+            splitfields = set(x for fullname, names in splitnames.values() for x in names)
+
+            lines = ['def clean_row(row, imageid, rownbr, namedelim, dateformat, rpttype):',
+                     '    if len(row) < ' + str(width) + ':',
+                     '        row = row + [\'\'] * (' + str(width) + ' - len(row))']
+            for field in fields:
+                if field in srcidx:
+                    lines.append('    ' + var[field] + ' = row[' + str(srcidx[field]) +
+                                 "].strip().replace('\\t', ' ').strip(' \"\\n')")
+                else:
+                    lines.append('    ' + var[field] + " = ''")
+
+            for field in outputhdrs[formtype]:
+                v = var[field]
+                if field in splitnames:
+                    fullname, names = splitnames[field]
+                    f = var[fullname]
+                    lines += ['    if ' + f + " != '':",
+                              '        if ' + ' or '.join(var[x] + " != ''" for x in names) + ':',
+                              "            add_entry_to_error_log(RPTERRDIR + 'ErrorMessages.log', 'Full name field " +
+                              fullname + " (' + " + f + " + ') could not be parsed for row ' + str(rownbr) + ' of ' + "
+                              "str(imageid) + ' because that would overwrite existing data. The full name field will "
+                              "be ignored.', {'image': str(imageid), 'rownbr': str(rownbr), 'formtype': " +
+                              repr(formtype) + ", 'fieldname': " + repr(fullname) + ", 'val': " + f + '})',
+                              "        elif namedelim != '':",
+                              '            ' + ', '.join(var[x] for x in names) + ' = parse_full_name(' + f +
+                              ', namedelim)',
+                              '        else:',
+                              '            ' + v + ' = ' + f]
+                elif field not in srcidx and field not in splitfields:
+                    # Missing columns are blank, so only bits need a value
+                    if fieldtypes.get(field) == 'bit':
+                        lines.append('    ' + v + " = '0'")
+                    continue
+
+                fieldtype = fieldtypes.get(field, 'text')
+                check = checks.get(field, ('',))
+                if fieldtype == 'text':
+                    lines += ['    if "\'\'" in ' + v + " or '\"\"' in " + v + ':',
+                              '        ' + v + ' = clean_sql_text(' + v + ')']
+                elif fieldtype == 'bit':
+                    lines.append('    ' + v + ' = convert_to_bit(clean_sql_text(' + v + '))')
+                elif fieldtype == 'currency':
+                    lines += ['    if ' + v + ':',
+                              '        ' + v + ' = ck_curr_val(' + v + ', imageid, ' + repr(field) + ', ' +
+                              var['LineNbr'] + ', rownbr)']
+                else:
+                    if check[0] == 'district':
+                        lines += ['    if ' + v + ' == ' + var[check[1]] + ':',
+                                  '        try:',
+                                  '            float(' + v + ')',
+                                  '        except ValueError:',
+                                  '            ' + v + " = ''",
+                                  '    elif ' + v + " == 'NA' or " + v + " == '**':",
+                                  '        ' + v + " = ''"]
+                    if fieldtype == 'date':
+                        convert = 'convert_to_date(' + v + ', dateformat, '
+                    else:
+                        convert = 'convert_to_tinyint(' + v + ', '
+                    lines += ['    if ' + v + ':',
+                              '        ' + v + ' = ' + convert + 'imageid, ' + repr(field) + ', ' + var['LineNbr'] +
+                              ', rownbr, ' + repr(formtype) + ', ' + var['TransID'] + ')']
+                if check[0] == 'maxlen':
+                    msg = repr(field + ' field too long.')
+                    lines += ['    if len(' + v + ') > ' + str(check[1]) + ':',
+                              '        data = ' + rowdata,
+                              '        print((' + msg + ', imageid, rownbr, data))',
+                              '        sys.exit((' + msg + ', imageid, rownbr, data))']
+
+            output = ['str(imageid)'] if formtype == 'F1S' else ['str(imageid)', 'rpttype']
+            lines.append('    return [' + ', '.join(output + [var[x] for x in outputhdrs[formtype]]) + ']')
+            namespace = {}
+            exec(compile('\n'.join(lines) + '\n', '<' + formtype + ' row cleaner>', 'exec'), globals(), namespace)
+            for version in subhdr[0]:
+                cleaners[(formtype, version)] = namespace['clean_row']
+    return cleaners
+
+
+def build_row_handlers(hdrmap, cleaners):
+    # Returns a RowHandler for each (form type, version) in hdrmap
+    # using the row cleaners built by build_row_cleaners
+    handlers = {}
+    for key in hdrmap:
+        handlers[key] = RowHandler(key[0], cleaners.get(key))
+    return handlers
+
+
 def ck_curr_val(val, image, fieldname, formtype, rownbr):
     errfile = RPTERRDIR + 'BadDates.log'
     try:
@@ -1215,10 +1679,24 @@ def ck_curr_val(val, image, fieldname, formtype, rownbr):
     except:
         add_entry_to_error_log(errfile,
                                'Unable to convert ' + fieldname + ' field (value: "' + val + '") to number for row ' + str(
-                                   rownbr) + ' (form type: ' + formtype + ') of ' + str(image) + '.')
+                                   rownbr) + ' (form type: ' + formtype + ') of ' + str(image) + '.',
+                               {'image': str(image), 'rownbr': str(rownbr), 'formtype': formtype,
+                                'fieldname': fieldname, 'val': val})
         return ''
 
 
+def classify_row_type(rowtype):
+    # Returns the form type of a child row whose first field is rowtype:
+    # the longest form type in outputhdrs that rowtype begins with, or
+    # an empty string if there is none. Text rows are not always ALLCAPS.
+    if rowtype.lower() == 'text':
+        return 'TEXT'
+    for formtype in rowformtypes:
+        if rowtype.startswith(formtype):
+            return formtype
+    return ''
+
+
 def clean_sql_text(val, nullstring='', outputtextdelim=''):
     # This function removes leading and trailing quotation marks and whitespace
     # and converts any instances of an apostrope to two apostrophes so the
@@ -1239,6 +1717,37 @@ def clean_sql_text(val, nullstring='', outputtextdelim=''):
         return outputtextdelim + val + outputtextdelim
 
 
+@functools.lru_cache(maxsize=None)
+def compile_date_format(dateformat):
+    # Returns a function that splits a date string written in the format
+    # specified by a file header's DtFmt value (CCYYMMDD, MMDDYYYY and so
+    # on) into month, day and year strings. Each format is compiled only
+    # once per run. Returns None if the format has no year.
+    month = dateformat.find('MM')
+    day = dateformat.find('DD')
+    if dateformat.find('CCYY') != -1:
+        year = dateformat.find('CCYY')
+    elif dateformat.find('YYYY') != -1:
+        year = dateformat.find('YYYY')
+    elif dateformat.find('YY') != -1:
+        year = dateformat.find('YY')
+
+        def parse_two_digit_year(val):
+            yr = '20' + val[year:year + 2]
+            if int(yr) > CURRYEAR:
+                yr = '19' + val[-2:]
+            return val[month:month + 2], val[day:day + 2], yr
+
+        return parse_two_digit_year
+    else:
+        return None
+
+    def parse_four_digit_year(val):
+        return val[month:month + 2], val[day:day + 2], val[year:year + 4]
+
+    return parse_four_digit_year
+
+
 def convert_to_bit(val):
     val = val.strip()
     if val == '':
@@ -1259,67 +1768,11 @@ def convert_to_date(val, dateformat, image, fieldname, formtype, rownbr, sched,
     val = val.strip(' "')
     if val == '':
         return ''
-    else:
-        try:
-            year = ''
-            month = ''
-            day = ''
-            currtime = datetime.datetime.now()
-            curryear = int(currtime.strftime('%Y'))
-            # First see if date string is M/D/(CC)YY or M-D-(CC)YY
-            if val.find('/') != -1:
-                if val[val.find('/') + 1:].find('/') != -1:
-                    x1 = val.find('/')
-                    x2 = x1 + val[x1 + 1:].find('/') + 1
-                    month = val[:x1].lstrip('0')
-                    day = val[x1 + 1:x2].lstrip('0')
-                    year = val[x2 + 1:]
-                    if int(year) < 10:
-                        year = '0' + year
-                    if int(year) < 100:
-                        year = '20' + year
-                    if int(year) > curryear:
-                        year = '19' + year[-2:]
-            elif val.find('-') != -1:
-                if val[val.find('-') + 1:].find('-') != -1:
-                    x1 = val.find('-')
-                    x2 = x1 + val[x1 + 1:].find('-') + 1
-                    month = val[:x1].lstrip('0')
-                    day = val[x1 + 1:x2].lstrip('0')
-                    year = val[x2 + 1:]
-                    if int(year) < 10:
-                        year = '0' + year
-                    if int(year) < 100:
-                        year = '20' + year
-                    if int(year) > curryear:
-                        year = '19' + year[-2:]
-            else:
-                month = dateformat.find('MM')
-                month = val[month:month + 2]  # .lstrip('0')
-                day = dateformat.find('DD')
-                day = val[day:day + 2]  # .lstrip('0')
-                if dateformat.find('CCYY') != -1:
-                    year = val[dateformat.find('CCYY'):dateformat.find('CCYY') + 4]
-                elif dateformat.find('YYYY') != -1:
-                    year = val[dateformat.find('YYYY'):dateformat.find('YYYY') + 4]
-                elif dateformat.find('YY') != -1:
-                    year = '20' + val[dateformat.find('YY'):dateformat.find('YY') + 2]
-                    if int(year) > curryear:
-                        year = '19' + val[-2:]
-                else:
-                    add_entry_to_error_log(errfile, str(image) + '\t' + sched + '\t' + trans + '\t' + str(
-                        rownbr) + '\t' + formtype + '\t' + fieldname + '\t' + val + '\t' + dateformat)
-                    with open(errfile, 'a') as output:
-                        output.write(errtxt + '\n')
-                    return ''
-            datestring = month + '/' + day + '/' + year
-            datadate = time.strptime(datestring, '%m/%d/%Y')
-            return datestring
-
-        except:
-            add_entry_to_error_log(errfile, str(image) + '\t' + sched + '\t' + trans + '\t' + str(
-                rownbr) + '\t' + formtype + '\t' + fieldname + '\t' + val + '\t' + dateformat)
-            return ''
+    datestring = normalize_date(val, dateformat)
+    if datestring is None:
+        add_field_error_to_error_log(errfile, image, sched, trans, rownbr, formtype, fieldname, val, dateformat)
+        return ''
+    return datestring
 
 
 def convert_to_tinyint(val, image, fieldname, formtype, rownbr, sched, trans=''):
@@ -1333,14 +1786,12 @@ def convert_to_tinyint(val, image, fieldname, formtype, rownbr, sched, trans='')
         try:
             x = int(val)
             if x < 0 or x > 255:
-                add_entry_to_error_log(errfile, str(image) + '\t' + sched + '\t' + trans + '\t' + str(
-                    rownbr) + '\t' + formtype + '\t' + fieldname + '\t' + val)
+                add_field_error_to_error_log(errfile, image, sched, trans, rownbr, formtype, fieldname, val)
                 return ''
             else:
                 return str(x)
         except:
-            add_entry_to_error_log(errfile, str(image) + '\t' + sched + '\t' + trans + '\t' + str(
-                rownbr) + '\t' + formtype + '\t' + fieldname + '\t' + val)
+            add_field_error_to_error_log(errfile, image, sched, trans, rownbr, formtype, fieldname, val)
             return ''
 
 
@@ -1349,18 +1800,50 @@ def create_file_timestamp():
     return filetime.strftime('%Y%m%d%H%M')
 
 
-def get_row_headers(header, version):
-    rowhdrs = []
-    for hdr in filehdrs:
-        if hdr[0] == header:
-            for subhdr in hdr[1]:
-                if str(version) in subhdr[0]:
-                    rowhdrs = subhdr[1]
-    return rowhdrs
-
-
 def load_rpt_hdrs(rpttype, imageid, rowdata, filehdr, outputhdrs, DBCONNSTR):
-    return 0
+    # Loads a report header using hdrstore. Returns -1 if the report
+    # already exists and -2 if the header could not be loaded. Headers
+    # loaded during a journaled run are recorded in the run manifest, so
+    # the header can be removed if the run is interrupted before the
+    # report is recorded.
+    result = hdrstore.add_rpt_hdr(rpttype, imageid, rowdata, filehdr, outputhdrs)
+    if result == 1 and runjournal is not None:
+        runjournal.add_header(imageid)
+    return result
+
+
+@functools.lru_cache(maxsize=DATECACHESIZE)
+def normalize_date(val, dateformat):
+    # Converts a date string stripped of whitespace and quotation marks
+    # to M/D/YYYY or MM/DD/YYYY. Returns None when the value is not a
+    # valid date. Dates repeat heavily within a filing, so results are
+    # cached.
+    try:
+        # First see if date string is M/D/(CC)YY or M-D-(CC)YY
+        if val.find('/') != -1:
+            month, day, year = split_delimited_date(val, '/')
+        elif val.find('-') != -1:
+            month, day, year = split_delimited_date(val, '-')
+        else:
+            parser = compile_date_format(dateformat)
+            if parser is None:
+                return None
+            month, day, year = parser(val)
+        datestring = month + '/' + day + '/' + year
+        time.strptime(datestring, '%m/%d/%Y')
+        return datestring
+    except ValueError:
+        return None
+
+
+def normalize_version(version):
+    # Header versions are listed in filehdrs as strings. Versions below
+    # 4 are listed without a decimal (3 rather than 3.0).
+    version = float(version)
+    if version < 4:
+        version = int(version)
+    return str(version)
+
 
 def parse_data_row(data, delim):
     # There are many cases where a field begins with " but is cut off or
@@ -1432,14 +1915,36 @@ def parse_full_name(data, delimiter):
     return fullname
 
 
-def populate_data_row_dict(data, headers, output):
-    for x in range(len(headers)):
-        if headers[x] in list(output.keys()) and x < len(
-                data):  # 100235 (F3X, v5.0) missing last 12 cols after treas sign date
-            output[headers[x]] = data[x].strip().replace('\t', ' ').strip(' "\n')
+def populate_data_row_dict(data, projection, output, delim='\t'):
+    # projection is an entry from the map built by build_header_map.
+    # Short rows are padded so missing columns are left blank.
+    names, getter, width = projection
+    if len(data) < width:  # 100235 (F3X, v5.0) missing last 12 cols after treas sign date
+        data = data + [''] * (width - len(data))
+    output.update(zip(names, [val.strip().replace(delim, ' ').strip(' "\n') for val in getter(data)]))
     return output
 
 
+def split_delimited_date(val, delim):
+    # Splits a M/D/(CC)YY or M-D-(CC)YY date string into month, day and
+    # year strings. Two-digit years later than the current year are
+    # assumed to be in the 1900s.
+    x1 = val.find(delim)
+    if val[x1 + 1:].find(delim) == -1:
+        return '', '', ''
+    x2 = x1 + val[x1 + 1:].find(delim) + 1
+    month = val[:x1].lstrip('0')
+    day = val[x1 + 1:x2].lstrip('0')
+    year = val[x2 + 1:]
+    if int(year) < 10:
+        year = '0' + year
+    if int(year) < 100:
+        year = '20' + year
+    if int(year) > CURRYEAR:
+        year = '19' + year[-2:]
+    return month, day, year
+
+
 def check_rpt_hdrs_f3(image, data, namedelim='', dateformat='CCYYMMDD'):
     # FormTp
     data['FormTp'] = clean_sql_text(data['FormTp'], 'nullstring', "'")
@@ -3336,2643 +3841,2073 @@ def check_rpt_hdrs_f1(image, data, namedelim='', dateformat='CCYYMMDD'):
     return data
 
 
-def check_row_data_f1s(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # FormTp
-    data['FormTp'] = clean_sql_text(data['FormTp'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # JtFndCommNm
-    data['JtFndCommNm'] = clean_sql_text(data['JtFndCommNm'])
-
-    # JtFundCommID
-    data['JtFundCommID'] = clean_sql_text(data['JtFundCommID'])
-
-    # AffCommID
-    data['AffCommID'] = clean_sql_text(data['AffCommID'])
-
-    # AffCommNm
-    data['AffCommNm'] = clean_sql_text(data['AffCommNm'])
-
-    # AffCandID
-    data['AffCandID'] = clean_sql_text(data['AffCandID'])
-
-    # AffLName
-    data['AffLName'] = clean_sql_text(data['AffLName'])
-
-    # AffFName
-    data['AffFName'] = clean_sql_text(data['AffFName'])
-
-    # AffMName
-    data['AffMName'] = clean_sql_text(data['AffMName'])
-
-    # AffPfx
-    data['AffPfx'] = clean_sql_text(data['AffPfx'])
-
-    # AffSfx
-    data['AffSfx'] = clean_sql_text(data['AffSfx'])
-
-    # AffAddr1
-    data['AffAddr1'] = clean_sql_text(data['AffAddr1'])
-
-    # AffAddr2
-    data['AffAddr2'] = clean_sql_text(data['AffAddr2'])
-
-    # AffCity
-    data['AffCity'] = clean_sql_text(data['AffCity'])
-
-    # AffStAbbr
-    data['AffStAbbr'] = clean_sql_text(data['AffStAbbr'])
-
-    # AffZip
-    data['AffZip'] = clean_sql_text(data['AffZip'])
-
-    # AffRelCd
-    data['AffRelCd'] = clean_sql_text(data['AffRelCd'])
-
-    # AgtLName
-    data['AgtLName'] = clean_sql_text(data['AgtLName'])
-
-    # AgtFName
-    data['AgtFName'] = clean_sql_text(data['AgtFName'])
-
-    # AgtMName
-    data['AgtMName'] = clean_sql_text(data['AgtMName'])
-
-    # AgtPfx
-    data['AgtPfx'] = clean_sql_text(data['AgtPfx'])
-
-    # AgtSfx
-    data['AgtSfx'] = clean_sql_text(data['AgtSfx'])
-
-    # AgtAddr1
-    data['AgtAddr1'] = clean_sql_text(data['AgtAddr1'])
-
-    # AgtAddr2
-    data['AgtAddr2'] = clean_sql_text(data['AgtAddr2'])
-
-    # AgtCity
-    data['AgtCity'] = clean_sql_text(data['AgtCity'])
-
-    # AgtStAbbr
-    data['AgtStAbbr'] = clean_sql_text(data['AgtStAbbr'])
-
-    # AgtZip
-    data['AgtZip'] = clean_sql_text(data['AgtZip'])
-
-    # AgtTitle
-    data['AgtTitle'] = clean_sql_text(data['AgtTitle'])
-
-    # AgtPhone
-    data['AgtPhone'] = clean_sql_text(data['AgtPhone'])
-
-    # BankNm
-    data['BankNm'] = clean_sql_text(data['BankNm'])
-
-    # BankAddr1
-    data['BankAddr1'] = clean_sql_text(data['BankAddr1'])
-
-    # BankAddr2
-    data['BankAddr2'] = clean_sql_text(data['BankAddr2'])
+class ErrorLog(object):
+    # Holds error log entries in memory and appends them to the error
+    # logs in batches of ERRORLOGBUFFER entries rather than opening and
+    # closing a log for every bad value. Each batch is written to a log
+    # with a single call, so entries from worker processes sharing a
+    # log are not interleaved. counts houses the number of entries
+    # logged for each (log, form type, field name) combination. Call
+    # close before the process exits to write any remaining entries.
+
+    def __init__(self, logformat=ERRORLOGFORMAT, buffersize=ERRORLOGBUFFER):
+        self.logformat = logformat
+        self.buffersize = buffersize
+        self.entries = {}
+        self.size = 0
+        self.counts = collections.Counter()
+
+    def add(self, logfile, logtext, fields=None):
+        if fields is None:
+            fields = {}
+        if self.logformat == 'json':
+            logfile = os.path.splitext(logfile)[0] + '.jsonl'
+            if len(fields) > 0:
+                logtext = json.dumps(fields)
+            else:
+                logtext = json.dumps({'message': logtext.strip()})
+        self.entries.setdefault(logfile, []).append(logtext.strip())
+        self.counts[(os.path.basename(logfile), fields.get('formtype', ''), fields.get('fieldname', ''))] += 1
+        self.size += 1
+        if self.size >= self.buffersize:
+            self.flush()
+
+    def close(self):
+        self.flush()
+
+    def discard(self):
+        # Drops the entries not yet written along with their counts
+        self.entries = {}
+        self.size = 0
+        self.counts = collections.Counter()
+
+    def flush(self):
+        for logfile in self.entries:
+            text = os.linesep.join(self.entries[logfile]) + os.linesep
+            with open(logfile, 'ab', buffering=0) as output:
+                output.write(text.encode('utf-8'))
+        self.entries = {}
+        self.size = 0
+
+    def take_counts(self):
+        # Returns the counts accumulated since the last call and resets
+        # them so they can be passed to another process.
+        counts = self.counts
+        self.counts = collections.Counter()
+        return counts
+
+
+class HeaderStore(object):
+    # Default header store. Report headers are loaded into SQL Server by
+    # the usp_AddRptHdr_* stored procedures outside this module, so no
+    # headers are loaded here and every report is parsed. Other header
+    # stores implement the same methods. add_rpt_hdr returns -1 if the
+    # report already exists and -2 if the header could not be loaded.
+    # begin, commit and rollback are called around each report.
+    # remove_rpt_hdr removes the header of a report that was being
+    # parsed when a journaled run was interrupted.
+
+    def add_rpt_hdr(self, rpttype, imageid, rowdata, filehdr, outputhdrs):
+        return 0
+
+    def begin(self):
+        pass
+
+    def close(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def remove_rpt_hdr(self, imageid):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class LineTokenizer(object):
+    # Cleans up the whitespace in each line of a filing and splits the
+    # line into fields, the way the row loop and parse_data_row did one
+    # step at a time. When OUTPUTDELIMITER is a tab, tabs and carriage
+    # returns become spaces and the line is stripped. Runs of spaces are
+    # collapsed. Each step is skipped when a line doesn't need it, which
+    # is true of most lines. Comma-delimited lines are split by one csv
+    # reader kept for the whole filing rather than a new reader for each
+    # line. Fields of other lines are stripped of quotation marks and
+    # spaces only when the line houses a quotation mark or a space next
+    # to a delimiter or at either end, since no field needs stripping
+    # otherwise.
+
+    def __init__(self, delim):
+        self.delim = delim
+        self.spaced = (' ' + delim, delim + ' ')
+        self.line = None
+        self.reader = None
+        if delim == ',':
+            self.reader = csv.reader(self, delimiter=',', quotechar='"')
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # Hands the line being tokenized to the csv reader. A line with
+        # an unclosed quotation mark makes the reader ask for another
+        # line, and it gets none, so each line is still parsed on its
+        # own, as parse_data_row does.
+        line = self.line
+        if line is None:
+            raise StopIteration
+        self.line = None
+        return line
+
+    def tokenize(self, line):
+        # Returns the line with its whitespace cleaned up and a list of
+        # its fields, or None if the line is blank
+        if OUTPUTDELIMITER == '\t':
+            if '\t' in line:
+                line = line.replace('\t', ' ')
+            if '\r' in line:
+                line = line.replace('\r', ' ')
+            line = line.strip()
+            if line == '':
+                return None
+        elif line.strip() == '':
+            return None
+        while '  ' in line:
+            line = line.replace('  ', ' ')
+        if self.reader is not None:
+            self.line = line
+            return line, next(self.reader)
+        if '"' in line or self.spaced[0] in line or self.spaced[1] in line or line[0] == ' ' or line[-1] == ' ':
+            return line, [datum.strip('" ') for datum in line.split(self.delim)]
+        return line, line.split(self.delim)
+
+
+class OutputWriter(object):
+    # Keeps one buffered handle open for each data file for the whole
+    # run and streams rows to the files as they are parsed, so memory
+    # use does not grow with the size of a filing. Call begin before
+    # writing a filing's rows, then commit once the filing has been
+    # parsed or rollback to remove every row written since begin.
+
+    def __init__(self, outputfiles, buffersize=OUTPUTBUFFER):
+        self.outputfiles = outputfiles
+        self.buffersize = buffersize
+        self.handles = {}
+        self.starts = {}
+        self.positions = {}
+        self.marks = {}
+
+    def begin(self):
+        self.marks = dict(self.positions)
+
+    def close(self):
+        for key in self.handles:
+            self.handles[key].close()
+        self.handles = {}
+
+    def commit(self):
+        # Flush so a filing's rows are on disk before the filing is
+        # moved out of RPTSVDIR.
+        for key in self.handles:
+            if self.positions[key] != self.marks.get(key, self.starts[key]):
+                self.handles[key].flush()
+        self.marks = dict(self.positions)
+
+    def rollback(self):
+        for key in self.handles:
+            mark = self.marks.get(key, self.starts[key])
+            if self.positions[key] != mark:
+                self.handles[key].flush()
+                self.handles[key].truncate(mark)
+                self.positions[key] = mark
+
+    def write(self, key, text):
+        # Files are opened the first time they are written to, so the
+        # "Other Data" file is created only when it's needed.
+        if key not in self.handles:
+            self.handles[key] = open(self.outputfiles[key], 'ab', buffering=self.buffersize)
+            self.starts[key] = self.handles[key].seek(0, os.SEEK_END)
+            self.positions[key] = self.starts[key]
+        text = text.encode('utf-8')
+        self.handles[key].write(text)
+        self.positions[key] += len(text)
+
+    def write_row(self, key, row):
+        self.write(key, OUTPUTDELIMITER.join(map(str, row)) + '\r')
+
+
+class ParquetOutputWriter(object):
+    # Writes each type of child row to a typed, columnar Parquet file
+    # with the columns listed in outputhdrs. ImageID is stored as int32,
+    # and the columns listed in outputtypes are stored as decimals,
+    # dates, booleans or tinyints. Rows for the "Other Data" file are
+    # still written to a delimited text file. Rows are written in row
+    # groups of ROWGROUPSIZE rows. Once a filing has buffered that many
+    # rows of one type, they are written to a temporary Parquet file for
+    # the filing, whose row groups are appended to the data file when
+    # the filing is committed and which is deleted when it's rolled
+    # back, so a filing that is rolled back never reaches the data files
+    # and memory use does not grow with the size of a filing.
+
+    def __init__(self, outputfiles, rowgroupsize=ROWGROUPSIZE):
+        if pyarrow is None:
+            raise ImportError('pyarrow is required to write Parquet data files.')
+        self.outputfiles = outputfiles
+        self.rowgroupsize = rowgroupsize
+        self.otherdata = OutputWriter({'OtherData': outputfiles['OtherData']})
+        self.writers = {}
+        self.tempwriters = {}
+        self.pending = {}
+        self.batches = {}
+        for key in outputprefixes:
+            self.pending[key] = []
+            self.batches[key] = []
+
+    def begin(self):
+        self.otherdata.begin()
+        self.rollback_temp_files()
+        for key in self.pending:
+            self.pending[key] = []
+
+    def build_table(self, key, rows):
+        schema = build_parquet_schema(key)
+        columns = []
+        for x in range(len(schema)):
+            converter = parquet_converters[str(schema.field(x).type)]
+            columns.append(pyarrow.array([converter(row[x]) for row in rows], type=schema.field(x).type))
+        return pyarrow.Table.from_arrays(columns, schema=schema)
+
+    def close(self):
+        # Files with no rows are still written so each file's schema is
+        # available to downstream readers.
+        self.rollback_temp_files()
+        for key in outputprefixes:
+            self.write_row_group(key)
+            if key not in self.writers:
+                self.open_file(key)
+            self.writers[key].close()
+        self.writers = {}
+        self.otherdata.close()
+
+    def commit(self):
+        self.otherdata.commit()
+        for key in self.pending:
+            if key in self.tempwriters:
+                # Rows committed before this filing are written first so
+                # the data file stays in the order rows were parsed.
+                self.write_row_group(key)
+                self.tempwriters[key].close()
+                del self.tempwriters[key]
+                if key not in self.writers:
+                    self.open_file(key)
+                tempfile = pyarrow.parquet.ParquetFile(self.temp_file(key))
+                for x in range(tempfile.num_row_groups):
+                    self.writers[key].write_table(tempfile.read_row_group(x))
+                tempfile.close()
+                os.remove(self.temp_file(key))
+            if len(self.pending[key]) > 0:
+                self.batches[key].extend(self.pending[key])
+                self.pending[key] = []
+                if len(self.batches[key]) >= self.rowgroupsize:
+                    self.write_row_group(key)
+
+    def open_file(self, key):
+        self.writers[key] = pyarrow.parquet.ParquetWriter(self.outputfiles[key], build_parquet_schema(key))
+
+    def rollback(self):
+        self.otherdata.rollback()
+        self.rollback_temp_files()
+        for key in self.pending:
+            self.pending[key] = []
+
+    def rollback_temp_files(self):
+        for key in self.tempwriters:
+            self.tempwriters[key].close()
+            os.remove(self.temp_file(key))
+        self.tempwriters = {}
+
+    def temp_file(self, key):
+        # The suffix keeps the file from matching the shard pattern used
+        # by merge_output_shards.
+        return self.outputfiles[key] + '.tmp'
+
+    def write(self, key, text):
+        # Only the "Other Data" file is written as text
+        self.otherdata.write(key, text)
+
+    def write_row(self, key, row):
+        self.pending[key].append(row)
+        if len(self.pending[key]) >= self.rowgroupsize:
+            if key not in self.tempwriters:
+                self.tempwriters[key] = pyarrow.parquet.ParquetWriter(self.temp_file(key), build_parquet_schema(key))
+            self.tempwriters[key].write_table(self.build_table(key, self.pending[key]))
+            self.pending[key] = []
+
+    def write_row_group(self, key):
+        rows = self.batches[key]
+        if len(rows) == 0:
+            return
+        if key not in self.writers:
+            self.open_file(key)
+        self.writers[key].write_table(self.build_table(key, rows))
+        self.batches[key] = []
+
+
+class ProfiledOutputWriter(object):
+    # Wraps an output writer so the time spent writing each type of row
+    # and the number of rows written are recorded by a RunProfile. Time
+    # spent committing and closing the writer counts toward the write
+    # stage but not its calls, since the SQLite writer loads rows then.
+
+    def __init__(self, writer, profile):
+        self.writer = writer
+        self.profile = profile
+
+    def begin(self):
+        self.writer.begin()
+
+    def close(self):
+        start = time.perf_counter()
+        self.writer.close()
+        self.profile.add('stage', 'write', time.perf_counter() - start, calls=0)
+
+    def commit(self):
+        start = time.perf_counter()
+        self.writer.commit()
+        self.profile.add('stage', 'write', time.perf_counter() - start, calls=0)
+
+    def rollback(self):
+        self.writer.rollback()
+
+    def write(self, key, text):
+        start = time.perf_counter()
+        self.writer.write(key, text)
+        self.profile.add_row(key, time.perf_counter() - start)
+
+    def write_row(self, key, row):
+        start = time.perf_counter()
+        self.writer.write_row(key, row)
+        self.profile.add_row(key, time.perf_counter() - start)
+
+
+class ProfiledReport(object):
+    # Wraps an open report so the time spent reading its lines is
+    # recorded by a RunProfile. Each line is timed, but the total is
+    # recorded once, when the report is closed.
+
+    def __init__(self, datafile, profile):
+        self.datafile = datafile
+        self.profile = profile
+        self.seconds = 0.0
+        self.lines = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            line = next(self.datafile)
+        finally:
+            self.seconds += time.perf_counter() - start
+        self.lines += 1
+        return line
+
+    def close(self):
+        self.datafile.close()
+        self.profile.add('stage', 'read', self.seconds, calls=self.lines)
+
+
+class ReportChunk(object):
+    # One piece of a report split by split_report so its rows can be
+    # parsed by different worker processes. start and end are the byte
+    # offsets of the chunk, which begins and ends at line boundaries,
+    # and linenbr is the line number of its first line. rpthdrs houses
+    # the headers returned by parse_report_headers, which are used to
+    # parse the rows of every chunk but the first. The first chunk
+    # begins at the top of the report, so its headers are parsed,
+    # checked and loaded as usual. suffix is appended to the names of
+    # the shard files the chunk's rows are written to; the shards sort
+    # in line order, so merge_output_shards stitches them back together.
+
+    def __init__(self, fecfile, number, start, end, linenbr, rpthdrs):
+        self.fecfile = fecfile
+        self.number = number
+        self.start = start
+        self.end = end
+        self.linenbr = linenbr
+        self.rpthdrs = rpthdrs
+        self.suffix = '_' + os.path.basename(fecfile).replace('.fec', '') + '_%04d' % number
+
+
+class RowHandler(object):
+    # Handles one form type of child row in one header version. clean is
+    # the row cleaner compiled by build_row_cleaners, which checks the
+    # row and drops its full name fields, or None for report header
+    # rows, which aren't written to the data files. key is the data file
+    # cleaned rows are written to.
+
+    def __init__(self, formtype, clean=None):
+        self.formtype = formtype
+        self.clean = clean
+        self.key = formtype
+
+
+class RunJournal(object):
+    # Run manifest of a run started with the --journal argument, which
+    # lets an interrupted run be resumed with the --resume argument. The
+    # manifest is a JSON lines file in RPTOUTDIR named after the run's
+    # timestamp. A record is appended once the rows of each report have
+    # been committed, before the report is moved, housing the report's
+    # ImageID, the directory it's moved to, its error log counts and the
+    # size of each data file that changed. The data files are synced to
+    # disk before the record is written, and the manifest is synced
+    # after. The headers loaded into an SQLite header store are recorded
+    # as they're loaded, and the run records its start and finish. When
+    # an existing manifest is opened, its records are read back: done
+    # houses the directory each recorded report was moved to, sizes the
+    # size of each data file as of the last record and pending the
+    # ImageID of a report whose header was loaded but which was not
+    # recorded.
+
+    def __init__(self, manifestfile, outputfiles):
+        self.manifestfile = manifestfile
+        self.outputfiles = outputfiles
+        self.done = {}
+        self.sizes = {}
+        self.counts = collections.Counter()
+        self.rptkeys = {}
+        self.pending = None
+        if os.path.exists(manifestfile):
+            self.load()
+        self.manifest = open(manifestfile, 'a')
+
+    def add_header(self, imageid):
+        self.write({'header': imageid})
+
+    def checkpoint(self, record):
+        # Writes record once every data file and error log entry it
+        # covers is on disk
+        errorlog.flush()
+        sizes = {}
+        for key in sorted(self.outputfiles):
+            path = self.outputfiles[key]
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if self.sizes.get(path) != size:
+                sizes[path] = size
+                if size > 0:
+                    with open(path, 'ab') as datafile:
+                        os.fsync(datafile.fileno())
+        self.sizes.update(sizes)
+        counts = errorlog.take_counts()
+        self.counts.update(counts)
+        record['sizes'] = sizes
+        record['counts'] = [list(key) + [counts[key]] for key in sorted(counts)]
+        self.write(record, True)
+
+    def close(self):
+        self.manifest.close()
+
+    def commit(self, fecfile, destdir):
+        # Records a report whose rows have been committed. keys houses
+        # the keys returned by read_report_keys when superseded reports
+        # are skipped, so the index of parsed reports can be saved even
+        # if the run is resumed.
+        imageid = int(os.path.basename(fecfile).replace('.fec', ''))
+        record = {'imageid': imageid, 'report': fecfile, 'destdir': destdir}
+        if fecfile in self.rptkeys:
+            record['keys'] = self.rptkeys[fecfile][1]
+        self.checkpoint(record)
+        self.done[imageid] = destdir
+        self.pending = None
+
+    def finish(self):
+        self.write({'finished': True}, True)
+
+    def load(self):
+        # Reads the records of an existing manifest. A record cut short
+        # when the run was interrupted is dropped.
+        with open(self.manifestfile, 'rb') as manifest:
+            data = manifest.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            with open(self.manifestfile, 'r+b') as manifest:
+                manifest.truncate(end)
+        for line in data[:end].decode('utf-8').splitlines():
+            record = json.loads(line)
+            if 'header' in record:
+                self.pending = record['header']
+                continue
+            if 'finished' in record:
+                continue
+            self.sizes.update(record['sizes'])
+            for entry in record['counts']:
+                self.counts[tuple(entry[:-1])] += entry[-1]
+            if 'imageid' in record:
+                self.done[record['imageid']] = record['destdir']
+                self.pending = None
+                if 'keys' in record:
+                    self.rptkeys[record['report']] = (record['imageid'], [tuple(x) for x in record['keys']])
+
+    def restore(self):
+        # Truncates each data file to its size as of the last record,
+        # removing the rows written for a report that wasn't recorded
+        for path in self.sizes:
+            if os.path.exists(path) and os.path.getsize(path) > self.sizes[path]:
+                with open(path, 'r+b') as datafile:
+                    datafile.truncate(self.sizes[path])
+
+    def write(self, record, sync=False):
+        self.manifest.write(json.dumps(record) + '\n')
+        self.manifest.flush()
+        if sync:
+            os.fsync(self.manifest.fileno())
+
+
+class RunProfile(object):
+    # Records where the time goes when reports are parsed with the
+    # --profile argument. Each stage of parsing listed in profiledstages
+    # is timed, along with reading lines, cleaning rows and writing rows,
+    # and so is each function listed in profiledfunctions, which are
+    # called while the stages run. Times are recorded by form type where
+    # it's known. Time spent on a report outside of the stages, such as
+    # classifying rows, is recorded as the "other" stage, so the stages
+    # add up to the time spent parsing reports. The rows written to each
+    # data file are counted, and the topn slowest reports are kept along
+    # with their stage times. Worker processes pass their measurements
+    # to the parent process with take and merge.
+
+    def __init__(self, topn=PROFILETOPN):
+        self.topn = topn
+        self.formtype = ''
+        self.report = None
+        self.reset()
+
+    def add(self, group, name, seconds, formtype='', calls=1):
+        self.seconds[(group, name, formtype)] += seconds
+        self.calls[(group, name, formtype)] += calls
+        if group == 'stage' and self.report is not None:
+            self.report['stages'][name] += seconds
+
+    def add_report(self, report):
+        # Keeps the topn slowest reports in a heap
+        heapq.heappush(self.slowest, (report['seconds'], report['report'], report))
+        if len(self.slowest) > self.topn:
+            heapq.heappop(self.slowest)
+
+    def add_row(self, key, seconds):
+        self.add('stage', 'write', seconds, key)
+        self.rows[key] += 1
+        if self.report is not None:
+            self.report['rows'] += 1
+
+    def merge(self, data):
+        # Adds measurements returned by take in another process
+        seconds, calls, rows, reports, bytesread, slowest = data
+        self.seconds.update(seconds)
+        self.calls.update(calls)
+        self.rows.update(rows)
+        self.reports += reports
+        self.bytesread += bytesread
+        for entry in slowest:
+            self.add_report(entry[2])
+
+    def reset(self):
+        self.seconds = collections.Counter()
+        self.calls = collections.Counter()
+        self.rows = collections.Counter()
+        self.reports = 0
+        self.bytesread = 0
+        self.slowest = []
+
+    def summary(self, outputfiles, seconds):
+        # Returns the measurements as a dictionary that can be saved as
+        # JSON. seconds is the wall time of the run. Bytes written are
+        # the sizes of the data files in outputfiles.
+        stages = []
+        functions = []
+        for key in sorted(self.seconds):
+            group, name, formtype = key
+            entry = collections.OrderedDict([('name', name), ('formtype', formtype),
+                                             ('seconds', round(self.seconds[key], 6)), ('calls', self.calls[key])])
+            if group == 'stage':
+                stages.append(entry)
+            else:
+                functions.append(entry)
+        byteswritten = {}
+        for key in outputfiles:
+            if os.path.exists(outputfiles[key]):
+                byteswritten[key] = os.path.getsize(outputfiles[key])
+        return collections.OrderedDict([('seconds', round(seconds, 3)), ('reports', self.reports),
+                                        ('bytesread', self.bytesread), ('byteswritten', byteswritten),
+                                        ('rows', dict(self.rows)), ('stages', stages), ('functions', functions),
+                                        ('slowest', [x[2] for x in sorted(self.slowest, reverse=True)])])
+
+    def take(self):
+        # Returns the measurements recorded since the last call and
+        # resets them so they can be passed to another process
+        data = (self.seconds, self.calls, self.rows, self.reports, self.bytesread, self.slowest)
+        self.reset()
+        return data
+
+    def wrap(self, func, group, name):
+        # Returns a version of func that records the time spent in each
+        # call under the form type being cleaned, if any
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(group, name, time.perf_counter() - start, self.formtype)
+        return timed
+
+    def wrap_cleaner(self, cleaner, formtype):
+        # Returns a version of a row cleaner that records the time spent
+        # cleaning each row under its form type
+        def timed(*args):
+            self.formtype = formtype
+            start = time.perf_counter()
+            try:
+                return cleaner(*args)
+            finally:
+                self.add('stage', 'clean', time.perf_counter() - start, formtype)
+                self.formtype = ''
+        return timed
+
+    def wrap_open(self, func):
+        # Returns a version of open_report whose reports record the time
+        # spent reading them
+        def timed(fecfile):
+            return ProfiledReport(func(fecfile), self)
+        return timed
+
+    def wrap_report(self, func):
+        # Returns a version of parse_report that records the size of
+        # each report, the time spent parsing it and the rows written.
+        # Each chunk of a split report is recorded on its own.
+        def timed(fecfile, writer, chunk=None):
+            if chunk is None:
+                self.report = {'report': os.path.basename(fecfile), 'bytes': get_report_size(fecfile)}
+            else:
+                self.report = {'report': os.path.basename(fecfile) + ' chunk ' + str(chunk.number),
+                               'bytes': chunk.end - chunk.start}
+            self.report.update({'rows': 0, 'seconds': 0.0, 'stages': collections.Counter()})
+            self.formtype = ''
+            start = time.perf_counter()
+            try:
+                return func(fecfile, writer, chunk)
+            finally:
+                report = self.report
+                report['seconds'] = time.perf_counter() - start
+                self.add('stage', 'other', max(report['seconds'] - sum(report['stages'].values()), 0.0))
+                self.report = None
+                report['stages'] = dict(report['stages'])
+                self.reports += 1
+                self.bytesread += report['bytes']
+                self.add_report(report)
+        return timed
+
+
+class SQLiteHeaderStore(HeaderStore):
+    # Loads report headers into an SQLite database housing the Form1 and
+    # RptHdrs_F3, F3L, F3P and F3X tables and the lookup tables used by
+    # the usp_AddRptHdr_* stored procedures. Lookup values are resolved
+    # by a LookupCache. Each report is loaded in a transaction of its
+    # own, which is committed once the report has been parsed and any
+    # child rows loaded through the store's connection have been
+    # inserted, so a report's header is never committed without its
+    # rows and the database is locked for at most one report. A report
+    # that is rolled back leaves neither behind.
+
+    def __init__(self, dbfile):
+        self.conn = sqlite3.connect(dbfile, timeout=60)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.datecolumns = set(outputtypes['date'] + ['ElecDt', 'SubmDt'])
+        self.create_tables()
+        self.lookups = LookupCache(self.conn)
+
+    def add_rpt_hdr(self, rpttype, imageid, rowdata, filehdr, outputhdrs):
+        table = hdrtables[rpttype]
+
+        # See if this file already has been imported
+        if self.conn.execute('SELECT ImageID FROM ' + table + ' WHERE ImageID = ?', (imageid,)).fetchone():
+            return -1
+        try:
+            columns = ['ImageID']
+            values = [imageid]
+            for hdr in outputhdrs:
+                if hdr.endswith('FullName'):
+                    continue
+                val = self.convert_value(rowdata[hdr], hdr in self.datecolumns)
+                if hdr in hdrlookups:
+                    columns.append(hdrlookups[hdr][2])
+                    values.append(self.get_lookup_id(hdr, val))
+                else:
+                    columns.append(hdrcolumns.get(hdr, hdr))
+                    values.append(val)
+            for field, column in filehdrcolumns:
+                columns.append(column)
+                values.append(filehdr[field])
+            self.conn.execute('INSERT INTO ' + table + ' (' + ', '.join(columns) + ') VALUES (' +
+                              ', '.join(['?'] * len(values)) + ')', values)
+        except (sqlite3.Error, ValueError):
+            return -2
+        return 1
+
+    def close(self):
+        self.lookups.flush()
+        self.conn.commit()
+        self.conn.close()
+
+    def commit(self):
+        self.lookups.flush()
+        self.conn.commit()
+
+    def convert_value(self, val, isdate=False):
+        # The check_rpt_hdrs_* functions quote text for SQL Server and
+        # return NULL or nullstring, which some of them uppercase, when a
+        # value is missing
+        if val is None or val.upper() in ('', 'NULL', 'NULLSTRING'):
+            return None
+        if len(val) > 1 and val.startswith("'") and val.endswith("'"):
+            val = val[1:-1].replace("''", "'")
+            if isdate:
+                val = datetime.datetime.strptime(val, '%m/%d/%Y').date().isoformat()
+            return val
+        try:
+            return int(val)
+        except ValueError:
+            return float(val)
+
+    def create_tables(self):
+        for table in sorted(lkptables):
+            self.conn.execute('CREATE TABLE IF NOT EXISTS ' + table + ' (' + lkptables[table] + ')')
+        for rpttype in sorted(hdrtables):
+            columns = ['ImageID INTEGER PRIMARY KEY']
+            for hdr in outputhdrs[rpttype]:
+                if hdr.endswith('FullName'):
+                    continue
+                if hdr in hdrlookups:
+                    columns.append(hdrlookups[hdr][2])
+                else:
+                    columns.append(hdrcolumns.get(hdr, hdr))
+            for field, column in filehdrcolumns:
+                if column == 'HdrVer':
+                    column = column + ' REAL'
+                columns.append(column)
+            columns.extend(['Active INTEGER NOT NULL DEFAULT 0', 'Vetted INTEGER NOT NULL DEFAULT 0'])
+            self.conn.execute('CREATE TABLE IF NOT EXISTS ' + hdrtables[rpttype] + ' (' + ', '.join(columns) + ')')
+        self.conn.commit()
+
+    def get_lookup_id(self, hdr, val):
+        # Returns the USATID of a value in a lookup table, adding the
+        # value if it's new
+        table, column, idcolumn, defaults = hdrlookups[hdr]
+        return self.lookups.get_id(table, column, val, defaults)
+
+    def remove_rpt_hdr(self, imageid):
+        for rpttype in sorted(hdrtables):
+            self.conn.execute('DELETE FROM ' + hdrtables[rpttype] + ' WHERE ImageID = ?', (imageid,))
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+        self.lookups.rollback()
+
+
+class SQLiteOutputWriter(object):
+    # Loads each type of child row into the child table listed in
+    # childtables, in the SQLite database housing the report headers.
+    # The header store's connection is used, so rows are committed along
+    # with the headers they belong to, and codes are resolved to the
+    # USATID of their lookup tables by the header store's LookupCache.
+    # Dates are stored as ISO 8601 text and amounts as real numbers.
+    # Rows for the "Other Data" file are still written to a delimited
+    # text file. Rows are inserted batchsize rows at a time and when the
+    # filing they belong to is committed, in the filing's transaction on
+    # the header store's connection, so they are committed by the header
+    # store along with the filing's header. A filing that is rolled back
+    # never reaches the database.
+
+    def __init__(self, outputfiles, store, batchsize=CHILDBATCHSIZE):
+        self.conn = store.conn
+        self.lookups = store.lookups
+        self.batchsize = batchsize
+        self.otherdata = OutputWriter({'OtherData': outputfiles['OtherData']})
+        self.pending = []
+        self.statements = {}
+        create_child_tables(self.conn)
+
+    def begin(self):
+        self.otherdata.begin()
+        self.pending = []
+
+    def close(self):
+        self.otherdata.close()
+
+    def commit(self):
+        self.otherdata.commit()
+        self.load()
+
+    def convert_row(self, key, row):
+        # Converts a row built by a row cleaner to the values of the
+        # columns of its child table
+        values = [int(row[0])]
+        start = 1
+        if key != 'F1S':
+            values.append(self.lookups.get_id('lkpFormTp', 'FormTp', row[1]))
+            start = 2
+        for hdr, val in zip(outputhdrs[key], row[start:]):
+            if hdr in childlookups:
+                table, column, idcolumn, defaults = childlookups[hdr]
+                values.append(self.lookups.get_id(table, column, val, defaults))
+            elif val == '':
+                values.append(None)
+            elif hdr in outputtypes['date']:
+                values.append(convert_parquet_date(val).isoformat())
+            elif hdr in outputtypes['currency']:
+                val = convert_parquet_currency(val)
+                values.append(float(val) if val is not None else None)
+            elif hdr in outputtypes['tinyint'] or hdr in outputtypes['bit']:
+                values.append(int(val))
+            else:
+                values.append(val)
+        return values
+
+    def load(self):
+        # Inserts the rows held in memory. They are committed by the
+        # header store.
+        if len(self.pending) == 0:
+            return
+        rows = collections.defaultdict(list)
+        for key, row in self.pending:
+            rows[key].append(self.convert_row(key, row))
+        for key in rows:
+            if key not in self.statements:
+                columns = [column.split(' ')[0] for column in build_child_columns(key)[1:]]
+                self.statements[key] = ('INSERT INTO ' + childtables[key] + ' (' + ', '.join(columns) +
+                                        ') VALUES (' + ', '.join(['?'] * len(columns)) + ')')
+            self.conn.executemany(self.statements[key], rows[key])
+        self.pending = []
+
+    def rollback(self):
+        self.otherdata.rollback()
+        self.pending = []
+
+    def write(self, key, text):
+        # Only the "Other Data" file is written as text
+        self.otherdata.write(key, text)
+
+    def write_row(self, key, row):
+        self.pending.append((key, row))
+        if len(self.pending) >= self.batchsize:
+            self.load()
+
+
+def build_child_columns(key):
+    # Returns the column definitions of the child table loaded with a
+    # child row type, in the order of the values returned by
+    # SQLiteOutputWriter.convert_row. References to lookup tables are
+    # declared as foreign keys, which are checked by check_child_rows.
+    columns = ['USATID INTEGER PRIMARY KEY', 'ImageID INTEGER NOT NULL']
+    if key != 'F1S':
+        columns.append('PrtTpID INTEGER REFERENCES lkpFormTp (USATID)')
+    for hdr in outputhdrs[key]:
+        if hdr in childlookups:
+            columns.append(childlookups[hdr][2] + ' INTEGER REFERENCES ' + childlookups[hdr][0] + ' (USATID)')
+        elif hdr in outputtypes['date']:
+            columns.append(childcolumns.get(hdr, hdr) + ' DATE')
+        elif hdr in outputtypes['currency']:
+            columns.append(childcolumns.get(hdr, hdr) + ' REAL')
+        elif hdr in outputtypes['tinyint'] or hdr in outputtypes['bit']:
+            columns.append(childcolumns.get(hdr, hdr) + ' INTEGER')
+        else:
+            columns.append(childcolumns.get(hdr, hdr) + ' TEXT')
+    return columns
+
+
+def build_output_file_list(filestamp, suffix='', outputformat='text'):
+    # Returns a dictionary housing the path of the data file generated
+    # for each child row type plus the "Other Data" file. suffix is
+    # appended to each filename and is used to build the shard files
+    # written by each worker process. The "Other Data" file is always
+    # a text file, and it's the only file when child rows are loaded
+    # into SQLite.
+    ext = '.txt'
+    if outputformat == 'parquet':
+        ext = '.parquet'
+    files = {'OtherData': RPTOUTDIR + 'OtherData_' + filestamp + suffix + '.txt'}
+    if outputformat == 'sqlite':
+        return files
+    for key in outputprefixes:
+        files[key] = RPTOUTDIR + outputprefixes[key] + '_' + filestamp + suffix + ext
+    return files
+
+
+def build_parquet_schema(key):
+    # Builds the Parquet schema for a child row type from outputhdrs
+    fields = [pyarrow.field('ImageID', pyarrow.int32())]
+    if key != 'F1S':
+        fields.append(pyarrow.field('PrtTp', pyarrow.string()))
+    for hdr in outputhdrs[key]:
+        if hdr in outputtypes['date']:
+            fields.append(pyarrow.field(hdr, pyarrow.date32()))
+        elif hdr in outputtypes['currency']:
+            fields.append(pyarrow.field(hdr, pyarrow.decimal128(19, 4)))
+        elif hdr in outputtypes['tinyint']:
+            fields.append(pyarrow.field(hdr, pyarrow.uint8()))
+        elif hdr in outputtypes['bit']:
+            fields.append(pyarrow.field(hdr, pyarrow.bool_()))
+        else:
+            fields.append(pyarrow.field(hdr, pyarrow.string()))
+    return pyarrow.schema(fields)
+
+
+def check_child_rows(conn):
+    # Checks the integrity of the child tables loaded by
+    # SQLiteOutputWriter and returns a list describing each problem
+    # found: rows whose report header is missing from the header tables
+    # (Form1 for F1S rows) and references to lookup values that don't
+    # exist
+    problems = []
+    reports = ' UNION ALL '.join('SELECT ImageID FROM ' + hdrtables[x] for x in sorted(hdrtables))
+    for key in sorted(childtables):
+        table = childtables[key]
+        parents = reports
+        if key == 'F1S':
+            parents = 'SELECT ImageID FROM ' + hdrtables['F1']
+        count = conn.execute('SELECT COUNT(*) FROM ' + table + ' WHERE ImageID NOT IN (' + parents + ')').fetchone()[0]
+        if count > 0:
+            problems.append('{0:,} {1} rows have no report header.'.format(count, table))
+        counts = collections.Counter(row[2] for row in conn.execute('PRAGMA foreign_key_check(' + table + ')'))
+        for parent in sorted(counts):
+            problems.append('{0:,} {1} rows reference values missing from {2}.'.format(counts[parent], table, parent))
+    return problems
+
+
+def convert_parquet_currency(val):
+    # Values are rounded to four decimal places to match the SQL Server
+    # money data type. Values that can't be stored are written as nulls.
+    if val == '':
+        return None
+    try:
+        val = decimal.Decimal(val).quantize(decimal.Decimal('0.0001'))
+    except decimal.InvalidOperation:
+        return None
+    if not val.is_finite() or len(val.as_tuple().digits) > 19:
+        return None
+    return val
 
-    # BankCity
-    data['BankCity'] = clean_sql_text(data['BankCity'])
 
-    # BankStAbbr
-    data['BankStAbbr'] = clean_sql_text(data['BankStAbbr'])
+def convert_parquet_date(val):
+    # Dates are written as M/D/YYYY or MM/DD/YYYY by convert_to_date
+    if val == '':
+        return None
+    return datetime.datetime.strptime(val, '%m/%d/%Y').date()
 
-    # BankZip
-    data['BankZip'] = clean_sql_text(data['BankZip'])
 
-    return data
+def convert_parquet_int(val):
+    if val == '':
+        return None
+    return int(val)
 
 
-def check_row_data_sch_a(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
+def create_child_tables(conn):
+    # Creates the child tables listed in childtables, each with an index
+    # on ImageID
+    for key in sorted(childtables):
+        table = childtables[key]
+        conn.execute('CREATE TABLE IF NOT EXISTS ' + table + ' (' + ', '.join(build_child_columns(key)) + ')')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_' + table + '_ImageID ON ' + table + ' (ImageID)')
+    conn.commit()
 
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
 
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-    if len(data['TransID']) > 20:
-        print(("TransID field too long.", image, rownbr, data))
-        sys.exit(("TransID field too long.", image, rownbr, data))
+def create_header_store(storetype):
+    # Returns the header store used by load_rpt_hdrs
+    if storetype == 'sqlite':
+        return SQLiteHeaderStore(HDRDBFILE)
+    return HeaderStore()
+
+
+def create_output_writer(outputfiles, outputformat='text', store=None):
+    # Returns the writer used to stream child rows to the data files.
+    # The 'sqlite' writer loads child rows through store, which must be
+    # an SQLiteHeaderStore.
+    if outputformat == 'parquet':
+        return ParquetOutputWriter(outputfiles)
+    if outputformat == 'sqlite':
+        return SQLiteOutputWriter(outputfiles, store)
+    return OutputWriter(outputfiles)
+
+
+def build_report_keys(imageid, fullrpttype, rpttype, filehdrdata, rpthdrdata):
+    # Returns the keys used to determine whether one report supersedes
+    # another. Every report is keyed by the report that began its chain
+    # of amendments; amendments name that report in the RptID field of
+    # the file header (FEC-123456). Form 3 reports also are keyed by
+    # committee, report type and coverage dates, because the database
+    # deactivates earlier reports covering exactly the same dates.
+    origid = imageid
+    rptid = str(filehdrdata['RptID']).strip(' "').upper()
+    if fullrpttype.endswith('A') and rptid.startswith('FEC-') and rptid[4:].isdigit():
+        if int(rptid[4:]) < imageid:
+            origid = int(rptid[4:])
+    keys = [('FEC', origid)]
+    if rpttype.startswith('F3'):
+        commid = rpthdrdata.get('CommID', '').strip(' "').upper()
+        covgfmdt = rpthdrdata.get('CovgFmDt', '').strip(' "')
+        covgtodt = rpthdrdata.get('CovgToDt', '').strip(' "')
+        if commid != '' and covgfmdt != '' and covgtodt != '':
+            covgfmdt = normalize_date(covgfmdt, filehdrdata['DtFmt'])
+            covgtodt = normalize_date(covgtodt, filehdrdata['DtFmt'])
+            if covgfmdt is not None and covgtodt is not None:
+                keys.append((rpttype, commid, covgfmdt, covgtodt))
+    return keys
+
+
+def find_resumable_run():
+    # Returns the timestamp of the most recent journaled run whose run
+    # manifest doesn't record that it finished, or None if every
+    # journaled run finished
+    for manifestfile in sorted(glob.glob(RPTOUTDIR + 'Manifest_*.jsonl'), reverse=True):
+        with open(manifestfile, 'rb') as manifest:
+            lines = manifest.read().splitlines()
+        if len(lines) == 0 or b'"finished"' not in lines[-1]:
+            return os.path.basename(manifestfile)[9:-6]
+    return None
+
+
+def find_superseded_reports(fecfiles, rptindex):
+    # Reads the headers of each report in fecfiles and compares them to
+    # one another and to rptindex, which maps each key returned by
+    # build_report_keys to the latest ImageID parsed for that key.
+    # Returns a dictionary mapping each superseded report to the ImageID
+    # of the report that supersedes it, along with a dictionary housing
+    # the ImageID and keys of every report in fecfiles.
+    rptkeys = {}
+    latest = dict(rptindex)
+    for fecfile in fecfiles:
+        rptkeys[fecfile] = read_report_keys(fecfile)
+        imageid, keys = rptkeys[fecfile]
+        for key in keys:
+            if latest.get(key, 0) < imageid:
+                latest[key] = imageid
+    superseded = {}
+    for fecfile in fecfiles:
+        imageid, keys = rptkeys[fecfile]
+        for key in keys:
+            if latest[key] > imageid:
+                superseded[fecfile] = latest[key]
+                break
+    return superseded, rptkeys
+
+
+def finish_archives(archives):
+    # Moves each archive in ARCSVDIR to ARCPROCDIR once all of the
+    # reports returned for it by list_archive_reports have been handled,
+    # meaning they are in the sync state store or were extracted to
+    # RPTRVWDIR. Archives with reports left to parse stay in ARCSVDIR
+    # for the next run.
+    close_archives()
+    for archive in archives:
+        for fecfile in archives[archive]:
+            member = os.path.basename(fecfile)
+            if member.replace('.fec', '') not in syncstate and not os.path.exists(RPTRVWDIR + member):
+                break
+        else:
+            shutil.move(archive, archive.replace(ARCSVDIR, ARCPROCDIR))
+
+
+def finish_report_chunk(chunks, chunk, destdir, outputfiles):
+    # Records that a chunk of a report split by split_report has been
+    # parsed. chunks houses, for each split report, the number of chunks
+    # left to parse and the directory returned for its first chunk, which
+    # parsed its headers. Once every chunk of a report has been parsed,
+    # moves the report to that directory, first deleting the shards
+    # written for the report unless it's moved to RPTPROCDIR.
+    if chunk.number == 0:
+        chunks[chunk.fecfile][1] = destdir
+    chunks[chunk.fecfile][0] -= 1
+    if chunks[chunk.fecfile][0] > 0:
+        return
+    destdir = chunks.pop(chunk.fecfile)[1]
+    if destdir != RPTPROCDIR:
+        remove_chunk_shards(chunk.fecfile, outputfiles)
+    move_report(chunk.fecfile, destdir)
+
+
+def get_report_size(fecfile):
+    # Returns the size of a report in bytes, whether or not it's housed
+    # in a daily archive
+    archive, member = split_report_source(fecfile)
+    if archive is None:
+        return os.path.getsize(fecfile)
+    return open_archive(archive).getinfo(member).file_size
+
+
+@functools.lru_cache(maxsize=ROWTYPECACHESIZE)
+def get_row_handler(rowtype, hdrverkey):
+    # Returns the RowHandler for child rows whose first field is rowtype
+    # in reports whose header version is hdrverkey, or None if the row's
+    # form type isn't found or has no headers in that version. A filing
+    # uses only a handful of row type codes, so each is classified once
+    # and every other row takes a single cache lookup.
+    return rowhandlers.get((classify_row_type(rowtype), hdrverkey))
+
+
+def init_worker(filestamp, stopflag, outputformat='text', storetype='sqlserver', profiling=False):
+    # Each worker process writes to its own set of shard files, which
+    # are merged into the data files once all reports have been parsed.
+    # Each worker also gets its own error log so entries buffered by the
+    # parent process are not written again by the workers, and its own
+    # header store, sync state store connection and set of open
+    # archives. Chunks of split
+    # reports are written to shard files of their own. The writer, error
+    # log and stores are closed when the worker exits. When profiling,
+    # each worker records its own measurements, which are passed to the
+    # parent process after each report.
+    global errorlog, hdrstore, openarchives, runprofile, syncstate, workerformat, workerstamp, workerwriter, workerstop
+    errorlog = ErrorLog()
+    hdrstore = create_header_store(storetype)
+    openarchives = {}
+    syncstate = SyncState()
+    workerwriter = create_output_writer(build_output_file_list(filestamp, '_' + str(os.getpid()), outputformat),
+                                        outputformat, hdrstore)
+    if profiling:
+        runprofile = RunProfile()
+        workerwriter = install_profile(runprofile, workerwriter)
+    workerstop = stopflag
+    workerstamp = filestamp
+    workerformat = outputformat
+    # Finalizers with the same priority run in the reverse order they
+    # were registered, so the writer, which may load rows through the
+    # header store, is closed first
+    multiprocessing.util.Finalize(errorlog, errorlog.close, exitpriority=10)
+    multiprocessing.util.Finalize(hdrstore, hdrstore.close, exitpriority=10)
+    multiprocessing.util.Finalize(syncstate, syncstate.close, exitpriority=10)
+    multiprocessing.util.Finalize(workerwriter, workerwriter.close, exitpriority=10)
+
+
+def install_profile(profile, writer):
+    # Replaces the functions listed in profiledstages and
+    # profiledfunctions, the row handlers' cleaners, LineTokenizer's
+    # tokenize method, open_report and parse_report
+    # with versions timed by profile, and returns writer wrapped so the
+    # rows it writes are counted. Called once by each process that
+    # parses reports. Functions are looked up by name when they're
+    # called, including by the row cleaners, so the timed versions are
+    # used everywhere.
+    for name in profiledstages:
+        globals()[name] = profile.wrap(globals()[name], 'stage', profiledstages[name])
+    for name in profiledfunctions:
+        globals()[name] = profile.wrap(globals()[name], 'function', name)
+    for handler in rowhandlers.values():
+        if handler.clean is not None:
+            handler.clean = profile.wrap_cleaner(handler.clean, handler.formtype)
+    LineTokenizer.tokenize = profile.wrap(LineTokenizer.tokenize, 'stage', 'split')
+    globals()['open_report'] = profile.wrap_open(open_report)
+    globals()['parse_report'] = profile.wrap_report(parse_report)
+    return ProfiledOutputWriter(writer, profile)
+
+
+def close_archives():
+    # Closes the daily archives opened by open_report
+    for archive in list(openarchives):
+        openarchives.pop(archive).close()
+
+
+def merge_output_shards(outputfiles, filestamp):
+    # Appends the shard files written by each worker process to the
+    # data files, then deletes the shards. Parquet shards are merged one
+    # row group at a time.
+    for key in outputfiles:
+        prefix, ext = os.path.splitext(outputfiles[key])
+        shards = sorted(glob.glob(prefix + '_*' + ext))
+        if len(shards) == 0:
+            continue
+        if ext == '.parquet':
+            writer = pyarrow.parquet.ParquetWriter(outputfiles[key], build_parquet_schema(key))
+            for shard in shards:
+                shardfile = pyarrow.parquet.ParquetFile(shard)
+                for x in range(shardfile.num_row_groups):
+                    writer.write_table(shardfile.read_row_group(x))
+                shardfile.close()
+                os.remove(shard)
+            writer.close()
+            continue
+        with open(outputfiles[key], 'ab') as outputfile:
+            for shard in shards:
+                with open(shard, 'rb') as shardfile:
+                    shutil.copyfileobj(shardfile, outputfile)
+                os.remove(shard)
+
+
+def move_report(fecfile, destdir):
+    # Moves a report to destdir and records its new location in the
+    # sync state store. Reports streamed from an archive are extracted
+    # only when they are moved somewhere other than RPTPROCDIR, so they
+    # can be reviewed or parsed again later.
+    archive, member = split_report_source(fecfile)
+    nbytes = get_report_size(fecfile)
+    if archive is None:
+        shutil.move(fecfile, fecfile.replace(RPTSVDIR, destdir))
+    elif destdir != RPTPROCDIR:
+        open_archive(archive).extract(member, destdir)
+    if syncstate is not None:
+        syncstate.set_location(member.replace('.fec', ''), nbytes, synclocations.get(destdir))
+
+
+def open_archive(archive):
+    # Returns the open ZipFile for an archive. Only the archive most
+    # recently used is kept open.
+    if archive not in openarchives:
+        close_archives()
+        openarchives[archive] = zipfile.ZipFile(archive)
+    return openarchives[archive]
+
+
+def open_report(fecfile):
+    # Opens a report for reading using SRCENCODING. Reports housed in a
+    # daily archive are streamed from the archive without being
+    # extracted.
+    archive, member = split_report_source(fecfile)
+    if archive is None:
+        return open(fecfile, 'r', encoding=SRCENCODING)
+    return io.TextIOWrapper(open_archive(archive).open(member), encoding=SRCENCODING)
+
+
+def open_report_chunk(chunk):
+    # Opens a chunk of a report split by split_report for reading. The
+    # chunk is copied from a memory map of the report, so each process
+    # holds only its own chunk in memory.
+    with open(chunk.fecfile, 'rb') as source:
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return io.TextIOWrapper(io.BytesIO(data[chunk.start:chunk.end]), encoding=SRCENCODING)
+
+
+def parse_child_rows(imageid, lines, writer, rpthdrs, hdrflg=0):
+    # Streams the child rows yielded by lines, an iterator of line
+    # numbers and lines, to writer. rpthdrs houses the headers returned
+    # by parse_report_headers, with the report header checked. Unless
+    # hdrflg is 1, rows are ignored until the report header row is found.
+    delim, fullrpttype, rpttype, hdrver, hdrverkey, filehdrdata, rpthdrdata = rpthdrs
+    tokenizer = LineTokenizer(delim)
+    for linenbr, line in lines:
+        # Do some basic whitespace cleanup and convert line to list.
+        # Skip blank lines.
+        tokens = tokenizer.tokenize(line)
+        if tokens is None:
+            continue
+        line, data = tokens
+
+        # If hdrflag == 0, see if this is header line; if not, continue
+        if hdrflg == 0:
+            if data[0] == rpthdrdata['FormTp'].strip(" '"):
+                hdrflg = 1
+            continue
+
+        # This is a data row. Look up the handler for its row type code.
+        # Write the row to the other data file if the row's form type
+        # isn't found or no headers are found for this version.
+        handler = get_row_handler(data[0], hdrverkey)
+        if handler is None:
+            writer.write('OtherData', str(imageid) + OUTPUTDELIMITER + str(hdrver) + OUTPUTDELIMITER + 'line: ' +
+                         str(linenbr) + OUTPUTDELIMITER + line + '\r')
+            continue
+
+        # Report header rows are not written to data files
+        if handler.clean is None:
+            continue
+
+        # Verify the data is valid and build the list written to the
+        # data file. Full name fields are not included in the output
+        # headers, so they are dropped here.
+        data = handler.clean(data, imageid, linenbr, filehdrdata['NmDelim'], filehdrdata['DtFmt'], fullrpttype)
+        writer.write_row(handler.key, data)
+
+
+def parse_report(fecfile, writer, chunk=None):
+    # Parses a single electronic filing, streams its child rows to the
+    # data files using writer (an OutputWriter) and moves the filing to
+    # the appropriate directory. If the filing can't be parsed, any rows
+    # already written for it and its header are rolled back. The filing
+    # is read once, and it is closed before it is moved. When chunk is a
+    # ReportChunk, only that chunk of the filing is parsed, and rather
+    # than move the filing, returns the directory it should be moved to
+    # once every chunk has been parsed.
+    writer.begin()
+    hdrstore.begin()
+    try:
+        if chunk is None:
+            with open_report(fecfile) as datafile:
+                destdir = parse_report_rows(fecfile, datafile, writer)
+        else:
+            with open_report_chunk(chunk) as datafile:
+                destdir = parse_report_rows(fecfile, datafile, writer, chunk)
+    except BaseException:
+        writer.rollback()
+        hdrstore.rollback()
+        raise
+    writer.commit()
+    hdrstore.commit()
+    if chunk is not None:
+        return destdir
+
+    # Record the file in the run manifest so a resumed run doesn't
+    # parse it again
+    if runjournal is not None:
+        runjournal.commit(fecfile, destdir)
+
+    # Move the file to the directory returned by parse_report_rows
+    move_report(fecfile, destdir)
+
+
+def parse_report_chunk(chunk):
+    # Parses a chunk of a report split by split_report in a worker
+    # process, writing its rows to shard files of its own. Returns the
+    # directory the report should be moved to once every chunk has been
+    # parsed.
+    writer = create_output_writer(build_output_file_list(workerstamp, chunk.suffix, workerformat), workerformat)
+    if runprofile is not None:
+        writer = ProfiledOutputWriter(writer, runprofile)
+    try:
+        return parse_report(chunk.fecfile, writer, chunk)
+    finally:
+        writer.close()
 
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
 
-    # BkRefSchdNm
-    data['BkRefSchdNm'] = clean_sql_text(data['BkRefSchdNm'])
+def parse_report_headers(imageid, filehdr, rpthdr):
+    # Parses the file header and report header extracted by
+    # read_report_headers. Returns the source delimiter, the full and
+    # abbreviated report types, the header version, the key used to look
+    # up the version in hdrmap and dictionaries housing the file header
+    # and report header data, or None if the report type is not
+    # supported. The report header data has not been validated.
 
-    # EntTp
-    data['EntTp'] = clean_sql_text(data['EntTp'])
+    # Change file delimiter to commas if ASCII-28 not found in report header
+    delim = SRCDELIMITER
+    if not delim in rpthdr:
+        delim = ','
 
-    # ContOrgNm
-    data['ContOrgNm'] = clean_sql_text(data['ContOrgNm'])
+    # Extract report type from report header
+    fullrpttype = rpthdr[:rpthdr.find(delim)].lstrip(' "').rstrip(' "')
+    rpttype = fullrpttype.rstrip('ANT')
 
-    # ContFullName
-    if data['ContFullName'] != '':
-        if data['ContLName'] != '' or data['ContFName'] != '' or data['ContMName'] != '' or data['ContPfx'] != '' or \
-                        data['ContSfx'] != '':
-            AddEntryToErrorLog('Contributor full name (' + data[
-                'ContFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['ContFullName'], namedelim)
-            data['ContLName'] = name[0]
-            data['ContFName'] = name[1]
-            data['ContMName'] = name[2]
-            data['ContPfx'] = name[3]
-            data['ContSfx'] = name[4]
+    # If report type not supported, return None; otherwise retrieve
+    # header version
+    if rpttype not in rpttypes:
+        return None
+    else:
+        hdrver = ''
+        if filehdr.lower().find('fec_ver_#') != -1:  # FEC_VER_#, FEC_Ver_#
+            hdrver = filehdr[filehdr.lower().find('fec_ver_#') + 9:].lstrip(' =')
+            hdrver = float(hdrver[:hdrver.find('\n')].strip(' "'))
         else:
-            data['ContLName'] = data['ContFullName']
-
-    # ContLName
-    data['ContLName'] = clean_sql_text(data['ContLName'])
+            hdrver = float(filehdr.split(delim)[2].strip(' "'))
 
-    # ContFName
-    data['ContFName'] = clean_sql_text(data['ContFName'])
+    # Now that we know the form type and header version, we are going
+    # to build the header data row to insert into the database.
 
-    # ContMName
-    data['ContMName'] = clean_sql_text(data['ContMName'])
+    # First, fetch file headers. Custom code needed for versions 1 and 2.
+    filehdrdata = {'ImageID': imageid,
+                   'RecType': 'HDR',
+                   'EFType': 'FEC',
+                   'Ver': hdrver,
+                   'SftNm': '',
+                   'SftVer': '',
+                   'RptID': '',
+                   'RptNbr': '0',
+                   'HdrCmnt': '',
+                   'NmDelim': '',
+                   'DecNoDec': 'DEC',
+                   'DtFmt': 'CCYYMMDD'}
 
-    # ContPfx
-    data['ContPfx'] = clean_sql_text(data['ContPfx'])
+    if hdrver < 3.0:
+        # Custom code for multiline headers (versions 1 and 2)
+        # Set default name delimiter to ^
+        filehdrdata['NmDelim'] = '^'
+        filehdr = filehdr.split('\n')
+        for hdr in filehdr:
+            line = hdr.strip()
+            if line.lower().startswith('soft_name'):
+                filehdrdata['SftNm'] = line[line.find('=') + 1:].strip(' "')
+            elif line.lower().startswith('soft_ver'):
+                filehdrdata['SftVer'] = line[line.find('=') + 1:].strip(' "')
+            elif line.lower().startswith('control'):
+                filehdrdata['RptID'] = line[line.find('=') + 1:].strip(' "')
+            elif line.lower().startswith('namedelim'):
+                filehdrdata['NmDelim'] = line[line.find('=') + 1:].strip(' "')
+            elif line.lower().startswith('dec/nodec'):
+                filehdrdata['DecNoDec'] = line[line.find('=') + 1:].strip(' "')
+            elif line.lower().startswith('date_fmat'):
+                filehdrdata['DtFmt'] = line[line.find('=') + 1:].strip(' "')
+            elif line.lower().find('comment') != -1:
+                filehdrdata['HdrCmnt'] = line[line.find('=') + 1:].strip(' "')
 
-    # ContSfx
-    data['ContSfx'] = clean_sql_text(data['ContSfx'])
+    else:
+        # Parse file header row
+        filehdr = parse_data_row(filehdr, delim)
 
-    # Addr1
-    data['Addr1'] = clean_sql_text(data['Addr1'])
+        # Populate header dictionary. Short rows are okay because
+        # sometimes the header comment is omitted.
+        projection = hdrmap.get(('Hdr', normalize_version(hdrver)))
+        if projection is not None:
+            filehdrdata = populate_data_row_dict(filehdr, projection, filehdrdata, OUTPUTDELIMITER)
 
-    # Addr2
-    data['Addr2'] = clean_sql_text(data['Addr2'])
+    # First, change hdrver to int when < 4
+    if hdrver < 4:
+        hdrver = int(hdrver)
+    hdrverkey = normalize_version(hdrver)
 
-    # City
-    data['City'] = clean_sql_text(data['City'])
+    # Get output headers
+    rpthdrdata = {}
+    for hdr in outputhdrs[rpttype]:
+        rpthdrdata[hdr] = ''
 
-    # StAbbr
-    data['StAbbr'] = clean_sql_text(data['StAbbr'])
-    if len(data['StAbbr']) > 2:
-        print(("StAbbr field too long.", image, rownbr, data))
-        sys.exit(("StAbbr field too long.", image, rownbr, data))
+    # Parse report header row
+    rpthdr = parse_data_row(rpthdr, delim)
 
-    # Zip
-    data['Zip'] = clean_sql_text(data['Zip'])
+    # Populate report header dictionary
+    projection = hdrmap.get((rpttype, hdrverkey))
+    if projection is not None:
+        rpthdrdata = populate_data_row_dict(rpthdr, projection, rpthdrdata, OUTPUTDELIMITER)
 
-    # ElecCd
-    data['ElecCd'] = clean_sql_text(data['ElecCd'])
+    # Attempt to determine name delimiter if missing
+    if filehdrdata['NmDelim'] == '':
+        if 'TrsFullName' in list(rpthdrdata.keys()):
+            if rpthdrdata['TrsFullName'].find('^') != -1:
+                filehdrdata['NmDelim'] = '^'
+            elif rpthdrdata['TrsFullName'].find(',') != -1:
+                filehdrdata['NmDelim'] = ','
 
-    # ElecDesc
-    data['ElecDesc'] = clean_sql_text(data['ElecDesc'])
+    return delim, fullrpttype, rpttype, hdrver, hdrverkey, filehdrdata, rpthdrdata
 
-    # ContDt
-    data['ContDt'] = convert_to_date(data['ContDt'], dateformat, image, 'ContDt', data['LineNbr'], rownbr, 'SA',
-                                     data['TransID'])
 
-    # ContAmt
-    data['ContAmt'] = ck_curr_val(data['ContAmt'], image, 'ContAmt', data['LineNbr'], rownbr)
+def parse_report_rows(fecfile, datafile, writer, chunk=None):
+    # Parses the electronic filing open in datafile and streams its
+    # child rows to writer. Returns the directory the filing should be
+    # moved to once it has been closed. When chunk is a ReportChunk,
+    # datafile houses only the chunk's lines. Chunks after the first
+    # are parsed using the headers parsed when the report was split.
 
-    # ContAgg
-    data['ContAgg'] = ck_curr_val(data['ContAgg'], image, 'ContAgg', data['LineNbr'], rownbr)
+    # Store ImageID in variable
+    imageid = int(os.path.basename(fecfile).replace('.fec', ''))
 
-    # ContPurpCd
-    data['ContPurpCd'] = clean_sql_text(data['ContPurpCd'])
+    # Parse the rows of a chunk after the first
+    if chunk is not None and chunk.number > 0:
+        parse_child_rows(imageid, enumerate(datafile, chunk.linenbr), writer, chunk.rpthdrs, 1)
+        return RPTPROCDIR
 
-    # ContPurpDesc
-    data['ContPurpDesc'] = clean_sql_text(data['ContPurpDesc'])
+    # Move file to hold directory if it's a known bad file
+    if imageid in BADREPORTS:
+        return RPTHOLDDIR
 
-    # Emp
-    data['Emp'] = clean_sql_text(data['Emp'])
-    if len(data['Emp']) > 38:
-        print(("Emp field too long.", image, rownbr, data))
-        sys.exit(("Emp field too long.", image, rownbr, data))
+    # Extract file header and report header
+    filehdr, rpthdr, lines = read_report_headers(datafile)
 
-    # Occ
-    data['Occ'] = clean_sql_text(data['Occ'])
-    if len(data['Occ']) > 38:
-        print(("Occ field too long.", image, rownbr, data))
-        sys.exit(("Occ field too long.", image, rownbr, data))
+    # Parse file header and report header
+    rpthdrs = parse_report_headers(imageid, filehdr, rpthdr)
 
-    # DonorCommID
-    data['DonorCommID'] = clean_sql_text(data['DonorCommID'])
-    if len(data['DonorCommID']) > 11:
-        print(("DonorCommID field too long.", image, rownbr, data))
-        sys.exit(("DonorCommID field too long.", image, rownbr, data))
+    # If report type not supported, move file to Hold directory and
+    # proceed to next file
+    if rpthdrs is None:
+        return RPTHOLDDIR
+    delim, fullrpttype, rpttype, hdrver, hdrverkey, filehdrdata, rpthdrdata = rpthdrs
 
-    # DonorCommNm
-    data['DonorCommNm'] = clean_sql_text(data['DonorCommNm'])
+    # Call function to verify data is valid, then load into database
+    sqlresult = 0
+    if rpttype == 'F3':
+        rpthdrdata = check_rpt_hdrs_f3(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
+        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
+    elif rpttype == 'F3L':
+        rpthdrdata = check_rpt_hdrs_f3l(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
+        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
+    elif rpttype == 'F3P':
+        rpthdrdata = check_rpt_hdrs_f3p(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
+        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
+    elif rpttype == 'F3X':
+        rpthdrdata = check_rpt_hdrs_f3x(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
+        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
+    elif rpttype == 'F1':
+        rpthdrdata = check_rpt_hdrs_f1(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
+        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
 
-    # DonorCandID
-    data['DonorCandID'] = clean_sql_text(data['DonorCandID'])
+    # On error, move file to Review directory
+    if sqlresult == -1:
+        return RPTRVWDIR
+    elif sqlresult == -2:
+        return RPTRVWDIR
 
-    # DonorCandFullName
-    if data['DonorCandFullName'] != '':
-        if data['DonorCandLName'] != '' or data['DonorCandFName'] != '' or data['DonorCandMName'] != '' or data[
-            'DonorCandPfx'] != '' or data['DonorCandSfx'] != '':
-            AddEntryToErrorLog('Donor candidater full name (' + data[
-                'DonorCandFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['DonorCandFullName'], namedelim)
-            data['DonorCandLName'] = name[0]
-            data['DonorCandFName'] = name[1]
-            data['DonorCandMName'] = name[2]
-            data['DonorCandPfx'] = name[3]
-            data['DonorCandSfx'] = name[4]
+    # ITERATE OVER DATA ROWS
+    # ----------------------
+    # The lines yielded by read_report_headers begin with the report
+    # header, so look for the report header and ignore all rows before
+    # finding a line that begins with the report type.
+    parse_child_rows(imageid, lines, writer, (delim, fullrpttype, rpttype, hdrver, hdrverkey, filehdrdata, rpthdrdata))
+    return RPTPROCDIR
+
+
+def parse_report_worker(task):
+    # Calls parse_report from a worker process for a report, or
+    # parse_report_chunk for a chunk of a report split by split_report.
+    # task houses the report and the chunk, which is None for whole
+    # reports. Rather than raise an exception, returns a description of
+    # the error so the parent process can report it, along with the
+    # error log counts for the task and, when profiling, the task's
+    # measurements. For a chunk that was parsed, also returns the chunk
+    # and the directory returned for it. Once any worker fails, the
+    # remaining workers stop picking up new tasks.
+    fecfile, chunk = task
+    if workerstop.is_set():
+        return None, None, None, None
+    error = None
+    parsed = None
+    try:
+        if chunk is None:
+            parse_report(fecfile, workerwriter)
         else:
-            data['DonorCandLName'] = data['DonorCandFullName']
-
-    # DonorCandLName
-    data['DonorCandLName'] = clean_sql_text(data['DonorCandLName'])
-
-    # DonorCandFName
-    data['DonorCandFName'] = clean_sql_text(data['DonorCandFName'])
-
-    # DonorCandMName
-    data['DonorCandMName'] = clean_sql_text(data['DonorCandMName'])
-
-    # DonorCandPfx
-    data['DonorCandPfx'] = clean_sql_text(data['DonorCandPfx'])
-
-    # DonorCandSfx
-    data['DonorCandSfx'] = clean_sql_text(data['DonorCandSfx'])
-
-    # DonorCandOfc
-    data['DonorCandOfc'] = clean_sql_text(data['DonorCandOfc'])
-    if len(data['DonorCandOfc']) > 3:
-        print(("DonorCandOfc field too long.", image, rownbr, data))
-        sys.exit(("DonorCandOfc field too long.", image, rownbr, data))
-
-    # DonorCandSt
-    data['DonorCandSt'] = clean_sql_text(data['DonorCandSt'])
-
-    # DonorCandDist
-    data['DonorCandDist'] = convert_to_tinyint(data['DonorCandDist'], image, 'DonorCandDist', data['LineNbr'], rownbr,
-                                               'SA', data['TransID'])
-
-    # ConduitNm
-    data['ConduitNm'] = clean_sql_text(data['ConduitNm'])
-
-    # ConduitAddr1
-    data['ConduitAddr1'] = clean_sql_text(data['ConduitAddr1'])
-
-    # ConduitAddr2
-    data['ConduitAddr2'] = clean_sql_text(data['ConduitAddr2'])
-
-    # ConduitCity
-    data['ConduitCity'] = clean_sql_text(data['ConduitCity'])
-
-    # ConduitState
-    data['ConduitState'] = clean_sql_text(data['ConduitState'])
-
-    # ConduitZip
-    data['ConduitZip'] = clean_sql_text(data['ConduitZip'])
-
-    # MemoCd
-    data['MemoCd'] = convert_to_bit(clean_sql_text(data['MemoCd']))
-
-    # MemoTxt
-    data['MemoTxt'] = clean_sql_text(data['MemoTxt'])
-
-    # SIorSLRef
-    data['SIorSLRef'] = clean_sql_text(data['SIorSLRef'])
-
-    return data
-
+            parsed = (chunk, parse_report_chunk(chunk))
+    except BaseException:
+        workerstop.set()
+        error = 'Unable to parse ' + fecfile + ':\n' + traceback.format_exc()
+    if runprofile is None:
+        return error, errorlog.take_counts(), None, parsed
+    return error, errorlog.take_counts(), runprofile.take(), parsed
+
+
+def list_archive_reports():
+    # Returns the reports housed in each daily archive in ARCSVDIR that
+    # are not in the sync state store, written as the path of the
+    # archive followed by the name of the report. Returns a list of the
+    # reports along with a dictionary mapping each archive to its
+    # reports. Archives that can't be read are deleted so they can be
+    # downloaded again later.
+    fecfiles = []
+    archives = collections.OrderedDict()
+    for archive in sorted(glob.glob(os.path.join(ARCSVDIR, '*.zip'))):
+        try:
+            with zipfile.ZipFile(archive) as zip:
+                members = zip.namelist()
+        except (OSError, zipfile.BadZipFile):
+            print('Files contained in ' + archive + ' could not be read. The file has been deleted so it can be '
+                  'downloaded again later.')
+            os.remove(archive)
+            continue
+        archives[archive] = []
+        for member in members:
+            if member.endswith('.fec') and member.replace('.fec', '') not in syncstate:
+                archives[archive].append(os.path.join(archive, member))
+        fecfiles.extend(archives[archive])
+    return fecfiles, archives
+
+
+def load_report_index(indexfile):
+    # Returns the index of parsed reports saved by save_report_index or
+    # an empty index if the file does not exist
+    if not os.path.exists(indexfile):
+        return {}
+    with open(indexfile, 'rb') as inputfile:
+        return pickle.load(inputfile)
+
+
+def read_report_headers(datafile):
+    # Reads the file header and report header from the top of an open
+    # electronic filing. Headers in versions 1 and 2 are multiple lines
+    # enclosed by "/* Header" and "/* End Header"; they are joined with
+    # newlines. Returns both headers along with an iterator yielding the
+    # line number and text of each line of the filing, starting with the
+    # report header line, so data rows are read from the same handle.
+    lines = enumerate(datafile, 1)
+    filehdr = next(lines, (1, ''))[1]
 
-def check_row_data_sch_b(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
+    # If first line contains /* Header, it's an old style header
+    if filehdr.lower().find('/* header') != -1:
+        filehdr = filehdr.replace('/* Header', '').replace('/* header', '').replace('/* HEADER', '').strip()
+        for linenbr, line in lines:
+            if line.lower().find('/* end header') != -1:
+                break
+            filehdr = filehdr + '\n' + line.strip()
 
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
+    # Extract report header
+    rpthdr = next(lines, None)
+    if rpthdr is None:
+        return filehdr, '', lines
+    return filehdr, rpthdr[1], itertools.chain([rpthdr], lines)
+
+
+def read_report_keys(fecfile):
+    # Returns the ImageID of a report and the keys returned by
+    # build_report_keys. Only the headers are read. Reports whose headers
+    # can't be parsed have no keys, so they are never skipped; they are
+    # left for parse_report to handle.
+    imageid = int(os.path.basename(fecfile).replace('.fec', ''))
+    try:
+        with open_report(fecfile) as datafile:
+            filehdr, rpthdr, lines = read_report_headers(datafile)
+        rpthdrs = parse_report_headers(imageid, filehdr, rpthdr)
+    except Exception:
+        return imageid, []
+    if rpthdrs is None:
+        return imageid, []
+    delim, fullrpttype, rpttype, hdrver, hdrverkey, filehdrdata, rpthdrdata = rpthdrs
+    return imageid, build_report_keys(imageid, fullrpttype, rpttype, filehdrdata, rpthdrdata)
+
+
+def remove_chunk_shards(fecfile, outputfiles):
+    # Deletes the shard files written for the chunks of a split report
+    imageid = os.path.basename(fecfile).replace('.fec', '')
+    for key in outputfiles:
+        prefix, ext = os.path.splitext(outputfiles[key])
+        for shard in glob.glob(prefix + '_' + imageid + '_*' + ext):
+            os.remove(shard)
+
+
+def save_report_index(rptindex, rptkeys, indexfile):
+    # Adds the keys of each report in rptkeys that the sync state store
+    # shows was processed to the index of parsed reports, then saves the
+    # index
+    for fecfile in rptkeys:
+        imageid, keys = rptkeys[fecfile]
+        saved = syncstate.get(str(imageid))
+        if saved is None or saved[1] != 'processed':
+            continue
+        for key in keys:
+            if rptindex.get(key, 0) < imageid:
+                rptindex[key] = imageid
+    with open(indexfile, 'wb') as outputfile:
+        pickle.dump(rptindex, outputfile)
+
+
+def skip_superseded_reports(fecfiles, rptindex):
+    # Moves each report in fecfiles that has been superseded by a later
+    # amendment to the directory specified by RPTHOLDDIR without parsing
+    # it and logs it to SupersededReports.log. Returns the reports that
+    # still need to be parsed along with the keys of every report.
+    superseded, rptkeys = find_superseded_reports(fecfiles, rptindex)
+    for fecfile in sorted(superseded):
+        imageid = rptkeys[fecfile][0]
+        add_entry_to_error_log(RPTERRDIR + 'SupersededReports.log',
+                               str(imageid) + '\t' + str(superseded[fecfile]),
+                               {'image': str(imageid), 'supersededby': str(superseded[fecfile])})
+        move_report(fecfile, RPTHOLDDIR)
+    return [fecfile for fecfile in fecfiles if fecfile not in superseded], rptkeys
+
+
+def split_report(fecfile):
+    # Returns the ReportChunks a report larger than CHUNKSIZE is split
+    # into, or None if the report should be parsed whole. Each chunk
+    # ends at the first line break at least CHUNKSIZE bytes after it
+    # begins, and the line breaks in each chunk are counted to find the
+    # line number of the next chunk, the same way lines are counted when
+    # the report is read whole. The report is memory mapped rather than
+    # read. Only reports saved in RPTSVDIR are split, and only when the
+    # report header row, which is found by the first chunk, is the line
+    # just below the file header, as it is in every well-formed report.
+    archive, member = split_report_source(fecfile)
+    if archive is not None or CHUNKSIZE <= 0 or os.path.getsize(fecfile) <= CHUNKSIZE:
+        return None
+    imageid = int(member.replace('.fec', ''))
+    if imageid in BADREPORTS:
+        return None
+    with open_report(fecfile) as datafile:
+        filehdr, rpthdr, lines = read_report_headers(datafile)
+        rptlinenbr = next(lines, (0, ''))[0]
+    rpthdrs = parse_report_headers(imageid, filehdr, rpthdr)
+    if rpthdrs is None:
+        return None
+    tokens = LineTokenizer(rpthdrs[0]).tokenize(rpthdr)
+    if tokens is None or tokens[1][0] != clean_sql_text(rpthdrs[6]['FormTp'], 'nullstring', "'").strip(" '"):
+        return None
+
+    chunks = []
+    with open(fecfile, 'rb') as source:
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = 0
+            linenbr = 1
+            while start < len(data):
+                end = data.find(b'\n', start + CHUNKSIZE) + 1
+                if end == 0:
+                    end = len(data)
+                chunks.append(ReportChunk(fecfile, len(chunks), start, end, linenbr, rpthdrs))
+                chunk = data[start:end]
+                linenbr += chunk.count(b'\n') + chunk.count(b'\r') - chunk.count(b'\r\n')
+                start = end
+
+    # The report header row must fall in the first chunk
+    if len(chunks) < 2 or chunks[1].linenbr <= rptlinenbr:
+        return None
+    return chunks
+
+
+def split_report_source(fecfile):
+    # Returns the archive housing a report and the name of the report
+    # within the archive. Reports that aren't housed in an archive are
+    # returned with None in place of the archive.
+    archive = os.path.dirname(fecfile)
+    if archive.lower().endswith('.zip'):
+        return archive, os.path.basename(fecfile)
+    return None, os.path.basename(fecfile)
+
+
+def write_error_counts(counts, filestamp):
+    # Writes the number of error log entries for each log, form type
+    # and field name to a timestamped file in RPTERRDIR
+    if len(counts) == 0:
+        return
+    with open(RPTERRDIR + 'ErrorCounts_' + filestamp + '.log', 'w') as output:
+        for key in sorted(counts):
+            output.write('\t'.join(key) + '\t' + str(counts[key]) + '\n')
+
+
+def write_output_headers(outputfiles):
+    # Writes column headers to each text data file. The "Other Data"
+    # file does not have headers, and Parquet files house their own
+    # column names.
+    for key in outputprefixes:
+        if not outputfiles.get(key, '').endswith('.txt'):
+            continue
+        with open(outputfiles[key], 'w') as outputfile:
+            if key == 'F1S':
+                outputfile.write('ImageID' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(map(str, outputhdrs[key])) + '\r')
+            else:
+                outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
+                    map(str, outputhdrs[key])) + '\r')
+
+
+def write_profile(summary, filestamp):
+    # Saves the run summary built by RunProfile.summary as JSON to a
+    # timestamped file in RPTERRDIR and prints it as tables: the time
+    # spent in each stage, the rows, bytes and time for each form type,
+    # the functions taking the most time and the slowest reports
+    with open(RPTERRDIR + 'Profile_' + filestamp + '.json', 'w') as output:
+        json.dump(summary, output, indent=2)
+
+    stages = collections.Counter()
+    stagecalls = collections.Counter()
+    formtypes = collections.defaultdict(collections.Counter)
+    for entry in summary['stages']:
+        stages[entry['name']] += entry['seconds']
+        stagecalls[entry['name']] += entry['calls']
+        if entry['formtype'] != '':
+            formtypes[entry['formtype']][entry['name']] += entry['seconds']
+    totalrows = sum(summary['rows'].values())
+    print('Parsed ' + str(summary['reports']) + ' reports (' + str(summary['bytesread']) + ' bytes, ' +
+          str(totalrows) + ' rows) in ' + str(summary['seconds']) + ' seconds, ' +
+          str(int(totalrows / max(summary['seconds'], 0.001))) + ' rows/sec')
+
+    print('')
+    print('%-10s %12s %12s %8s' % ('Stage', 'Seconds', 'Calls', '% Time'))
+    total = max(sum(stages.values()), 0.000001)
+    for name, seconds in stages.most_common():
+        print('%-10s %12.3f %12d %7.1f%%' % (name, seconds, stagecalls[name], 100 * seconds / total))
+
+    print('')
+    print('%-10s %12s %14s %12s %12s %10s' % ('Form type', 'Rows', 'Bytes written', 'Clean sec', 'Write sec',
+                                              'us/row'))
+    for key in sorted(summary['rows'], key=lambda x: -summary['rows'][x]):
+        rows = summary['rows'][key]
+        seconds = formtypes[key]
+        print('%-10s %12d %14d %12.3f %12.3f %10.1f' % (key, rows, summary['byteswritten'].get(key, 0),
+                                                       seconds['clean'], seconds['write'],
+                                                       1000000 * (seconds['clean'] + seconds['write']) / rows))
+
+    if len(summary['functions']) > 0:
+        print('')
+        print('%-24s %-10s %12s %12s' % ('Function', 'Form type', 'Seconds', 'Calls'))
+        for entry in sorted(summary['functions'], key=lambda x: -x['seconds'])[:PROFILETOPN]:
+            print('%-24s %-10s %12.3f %12d' % (entry['name'], entry['formtype'], entry['seconds'], entry['calls']))
+
+    if len(summary['slowest']) > 0:
+        print('')
+        print('%-20s %12s %14s %12s  %s' % ('Report', 'Seconds', 'Bytes', 'Rows', 'Slowest stage'))
+        for report in summary['slowest']:
+            stage = max(report['stages'], key=report['stages'].get) if report['stages'] else ''
+            print('%-20s %12.3f %14d %12d  %s' % (report['report'], report['seconds'], report['bytes'],
+                                                 report['rows'], stage))
 
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
 
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
+##############################################
 
-    # BkRefSchdNm
-    data['BkRefSchdNm'] = clean_sql_text(data['BkRefSchdNm'])
+# Build list of supported report types
+rpttypes = build_list_of_supported_report_types()
 
-    # EntTp
-    data['EntTp'] = clean_sql_text(data['EntTp'])
+# Append full name fields to the headers used to parse each row
+parsedhdrs = {}
+for key in outputhdrs:
+    parsedhdrs[key] = outputhdrs[key] + fullnamehdrs.get(key, [])
+
+# Compile the map used to match each row's columns to output headers
+hdrmap = build_header_map(filehdrs, parsedhdrs)
+
+# Compile the functions used to clean each type and version of child row
+rowcleaners = build_row_cleaners(filehdrs)
+
+# Build the handler for each type and version of child row
+rowhandlers = build_row_handlers(hdrmap, rowcleaners)
+
+# Form types sorted longest first, so each row is matched to the
+# longest form type its row type code begins with
+rowformtypes = sorted(outputhdrs, key=len, reverse=True)
+
+# Buffer entries written to the error logs
+errorlog = ErrorLog()
+
+# Store used to load report headers. A local store is opened by each
+# process that parses reports.
+hdrstore = HeaderStore()
+
+# Sync state store shared with download_reports. A connection is opened
+# by each process that parses reports.
+syncstate = None
+
+# Daily archives opened to stream reports, keyed by path
+openarchives = {}
+
+# Sync state store location for each directory reports are moved to.
+# Reports moved anywhere else are dropped from the store.
+synclocations = {RPTPROCDIR: 'processed', RPTHOLDDIR: 'hold'}
+
+# Stage each function is timed under when reports are parsed with the
+# --profile argument. Reading lines, splitting lines, cleaning rows and
+# writing rows are timed by the RunProfile wrappers.
+profiledstages = {'check_rpt_hdrs_f1': 'headers',
+                  'check_rpt_hdrs_f3': 'headers',
+                  'check_rpt_hdrs_f3l': 'headers',
+                  'check_rpt_hdrs_f3p': 'headers',
+                  'check_rpt_hdrs_f3x': 'headers',
+                  'get_row_handler': 'classify',
+                  'load_rpt_hdrs': 'headers',
+                  'move_report': 'move',
+                  'parse_report_headers': 'headers'}
+
+# Functions called while parsing that are also timed when profiling.
+# Their times are included in the times of the stages that call them.
+profiledfunctions = ['add_entry_to_error_log', 'ck_curr_val', 'clean_sql_text', 'convert_to_bit', 'convert_to_date',
+                     'convert_to_tinyint', 'parse_full_name']
+
+# Measurements recorded by each process that parses reports when
+# profiling
+runprofile = None
+
+# Timestamp and format of the data files written by a worker process
+workerstamp = None
+workerformat = 'text'
+
+# Run manifest written when reports are parsed with the --journal or
+# --resume argument
+runjournal = None
+
+# Functions used to convert text values to each Parquet data type
+parquet_converters = {'int32': convert_parquet_int,
+                      'uint8': convert_parquet_int,
+                      'string': str,
+                      'date32[day]': convert_parquet_date,
+                      'decimal128(19, 4)': convert_parquet_currency,
+                      'bool': lambda val: val == '1'}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parse electronically filed campaign finance reports.')
+    parser.add_argument('--workers', type=int, default=NUMPROC,
+                        help='number of processes used to parse reports (default: %(default)s)')
+    parser.add_argument('--format', dest='outputformat', choices=['text', 'parquet', 'sqlite'], default=OUTPUTFORMAT,
+                        help='format of the data files (default: %(default)s)')
+    parser.add_argument('--header-store', dest='hdrstore', choices=['sqlserver', 'sqlite'], default=HDRSTORE,
+                        help='where report headers are loaded (default: %(default)s)')
+    parser.add_argument('--skip-superseded', action='store_true',
+                        help='move reports superseded by a later amendment to RPTHOLDDIR without parsing them')
+    parser.add_argument('--profile', action='store_true',
+                        help='time each stage of parsing and write a run summary to RPTERRDIR')
+    parser.add_argument('--journal', action='store_true',
+                        help='record each parsed report in a run manifest so an interrupted run can be resumed')
+    parser.add_argument('--resume', action='store_true',
+                        help='resume the most recent journaled run that did not finish')
+    args = parser.parse_args()
+    if args.outputformat == 'parquet' and pyarrow is None:
+        parser.error('pyarrow is required to write Parquet data files.')
+    if args.outputformat == 'sqlite' and args.hdrstore != 'sqlite':
+        parser.error('--format sqlite requires --header-store sqlite.')
+    if (args.journal or args.resume) and (args.workers > 1 or args.outputformat != 'text'):
+        parser.error('--journal and --resume require --workers 1 and --format text.')
+
+    # Create timestamp to append to output files. A resumed run keeps
+    # the timestamp of the run it resumes.
+    if args.resume:
+        filestamp = find_resumable_run()
+        if filestamp is None:
+            parser.error('no journaled run to resume in ' + RPTOUTDIR)
+    else:
+        filestamp = create_file_timestamp()
+
+    # Record measurements for the run summary if requested
+    runstart = time.perf_counter()
+    if args.profile:
+        runprofile = RunProfile()
+
+    # Build files to house data output and write headers. When a run is
+    # resumed, the rows written for a report that wasn't recorded in the
+    # run manifest are removed from the data files instead. Error log
+    # entries are written only as reports are recorded.
+    outputfiles = build_output_file_list(filestamp, '', args.outputformat)
+    if args.journal or args.resume:
+        runjournal = RunJournal(RPTOUTDIR + 'Manifest_' + filestamp + '.jsonl', outputfiles)
+        errorlog.buffersize = float('inf')
+    if runjournal is not None and len(runjournal.sizes) > 0:
+        runjournal.restore()
+    else:
+        write_output_headers(outputfiles)
+
+    # Open the sync state store, building it from the report
+    # directories if download_reports hasn't built it yet
+    syncstate = SyncState()
+    if len(syncstate) == 0:
+        syncstate.rebuild()
+
+    # Build list of reports to parse, including reports housed in the
+    # daily archives in ARCSVDIR, stopping at FILELIMIT
+    archivefiles, archives = list_archive_reports()
+    fecfiles = (glob.glob(os.path.join(RPTSVDIR, '*.fec')) + archivefiles)[:FILELIMIT]
+
+    # Skip reports superseded by a later amendment in this batch or in
+    # the index of reports parsed by earlier runs
+    if args.skip_superseded:
+        rptindex = load_report_index(RPTINDEXFILE)
+        fecfiles, rptkeys = skip_superseded_reports(fecfiles, rptindex)
+
+    # Record the start of a journaled run. Reports recorded before a
+    # resumed run was interrupted aren't parsed again, but any that
+    # weren't moved yet are moved now.
+    if runjournal is not None:
+        if args.skip_superseded:
+            rptkeys.update(runjournal.rptkeys)
+            runjournal.rptkeys = rptkeys
+        remaining = []
+        for fecfile in fecfiles:
+            imageid = int(os.path.basename(fecfile).replace('.fec', ''))
+            if imageid in runjournal.done:
+                move_report(fecfile, runjournal.done[imageid])
+            else:
+                remaining.append(fecfile)
+        fecfiles = remaining
+        runjournal.checkpoint({'run': filestamp})
+
+    # Iterate through each file
+    if args.workers > 1:
+        # Each worker parses whole reports and writes its own shard
+        # files, which are merged into the data files at the end. The
+        # header store's tables and any child tables are created and any
+        # archives opened to read report headers are closed before the
+        # workers start.
+        close_archives()
+        stopflag = multiprocessing.Event()
+        hdrstore = create_header_store(args.hdrstore)
+        if args.outputformat == 'sqlite':
+            create_child_tables(hdrstore.conn)
+        hdrstore.close()
+
+        # Split reports larger than CHUNKSIZE into chunks parsed by
+        # different workers. Child rows loaded into SQLite are committed
+        # with their report header, so those reports are parsed whole.
+        # Chunks are queued first so the largest reports don't hold up
+        # the end of the run.
+        tasks = []
+        chunks = {}
+        for fecfile in fecfiles:
+            reportchunks = None
+            if args.outputformat != 'sqlite':
+                reportchunks = split_report(fecfile)
+            if reportchunks is None:
+                tasks.append((fecfile, None))
+            else:
+                chunks[fecfile] = [len(reportchunks), None]
+                tasks[:0] = [(fecfile, x) for x in reportchunks]
+        pool = multiprocessing.Pool(processes=args.workers, initializer=init_worker,
+                                    initargs=(filestamp, stopflag, args.outputformat, args.hdrstore, args.profile))
+        errors = []
+        for error, counts, measurements, parsed in pool.imap_unordered(parse_report_worker, tasks):
+            if error is not None:
+                errors.append(error)
+            if counts is not None:
+                errorlog.counts.update(counts)
+            if measurements is not None:
+                runprofile.merge(measurements)
+            if parsed is not None:
+                finish_report_chunk(chunks, parsed[0], parsed[1], outputfiles)
+        pool.close()
+        pool.join()
+
+        # Rows of split reports with chunks left unparsed after an error
+        # are not written to the data files
+        for fecfile in chunks:
+            remove_chunk_shards(fecfile, outputfiles)
+        merge_output_shards(outputfiles, filestamp)
+        finish_archives(archives)
+        if args.skip_superseded:
+            save_report_index(rptindex, rptkeys, RPTINDEXFILE)
+        errorlog.close()
+        write_error_counts(errorlog.counts, filestamp)
+        if len(errors) > 0:
+            sys.exit('\n'.join(errors))
+    else:
+        # A resumed run removes the header of a report that was being
+        # parsed when the run it resumes was interrupted
+        hdrstore = create_header_store(args.hdrstore)
+        if runjournal is not None and runjournal.pending is not None:
+            hdrstore.remove_rpt_hdr(runjournal.pending)
+        writer = create_output_writer(outputfiles, args.outputformat, hdrstore)
+        if args.profile:
+            writer = install_profile(runprofile, writer)
+        try:
+            for fecfile in fecfiles:
+                parse_report(fecfile, writer)
+        finally:
+            writer.close()
+            hdrstore.close()
+            finish_archives(archives)
+            if args.skip_superseded:
+                save_report_index(rptindex, rptkeys, RPTINDEXFILE)
+
+            # Entries logged for a report that wasn't recorded in the
+            # run manifest are logged again when the run is resumed
+            if runjournal is not None:
+                errorlog.discard()
+                errorlog.counts.update(runjournal.counts)
+            errorlog.close()
+            write_error_counts(errorlog.counts, filestamp)
+        if runjournal is not None:
+            runjournal.finish()
+            runjournal.close()
+
+    # Save and print the run summary
+    if args.profile:
+        write_profile(runprofile.summary(outputfiles, time.perf_counter() - runstart), filestamp)
+
+    # Check the integrity of the child rows loaded into SQLite
+    if args.outputformat == 'sqlite':
+        conn = sqlite3.connect(HDRDBFILE)
+        for problem in check_child_rows(conn):
+            print(problem)
+        conn.close()
+
+    # Run stored procedure to deactivate overlapping reports
+    # not covered by database triggers
+    try:
+        sql = 'EXEC dbo.usp_DeactivateOverlappingReports'
 
-    # PayeeOrgNm
-    data['PayeeOrgNm'] = clean_sql_text(data['PayeeOrgNm'])
+        # Create SQL Server connection
+        conn = pyodbc.connect(DBCONNSTR)
+        cursor = conn.cursor()
 
-    # PayeeFullName
-    if data['PayeeFullName'] != '':
-        if data['PayeeLName'] != '' or data['PayeeFName'] != '' or data['PayeeMName'] != '' or data['PayeePfx'] != '' or \
-                        data['PayeeSfx'] != '':
-            AddEntryToErrorLog('Payee full name (' + data[
-                'PayeeFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['PayeeFullName'], namedelim)
-            data['PayeeLName'] = name[0]
-            data['PayeeFName'] = name[1]
-            data['PayeeMName'] = name[2]
-            data['PayeePfx'] = name[3]
-            data['PayeeSfx'] = name[4]
-        else:
-            data['PayeeLName'] = data['PayeeFullName']
-
-    # PayeeLName
-    data['PayeeLName'] = clean_sql_text(data['PayeeLName'])
-
-    # PayeeFName
-    data['PayeeFName'] = clean_sql_text(data['PayeeFName'])
-
-    # PayeeMName
-    data['PayeeMName'] = clean_sql_text(data['PayeeMName'])
-
-    # PayeePfx
-    data['PayeePfx'] = clean_sql_text(data['PayeePfx'])
-
-    # PayeeSfx
-    data['PayeeSfx'] = clean_sql_text(data['PayeeSfx'])
-
-    # PayeeAddr1
-    data['PayeeAddr1'] = clean_sql_text(data['PayeeAddr1'])
-
-    # PayeeAddr2
-    data['PayeeAddr2'] = clean_sql_text(data['PayeeAddr2'])
-
-    # PayeeCity
-    data['PayeeCity'] = clean_sql_text(data['PayeeCity'])
-
-    # PayeeState
-    data['PayeeState'] = clean_sql_text(data['PayeeState'])
-
-    # PayeeZip
-    data['PayeeZip'] = clean_sql_text(data['PayeeZip'])
-
-    # ElecCd
-    data['ElecCd'] = clean_sql_text(data['ElecCd'])
-
-    # ElecDesc
-    data['ElecDesc'] = clean_sql_text(data['ElecDesc'])
-
-    # ExpDt
-    data['ExpDt'] = convert_to_date(data['ExpDt'], dateformat, image, 'ExpDt', data['LineNbr'], rownbr, 'SB',
-                                    data['TransID'])
-
-    # ExpAmt
-    data['ExpAmt'] = ck_curr_val(data['ExpAmt'], image, 'ExpAmt', data['LineNbr'], rownbr)
-
-    # SemiAnnRefBundAmt
-    data['SemiAnnRefBundAmt'] = ck_curr_val(data['SemiAnnRefBundAmt'], image, 'SemiAnnRefBundAmt', data['LineNbr'],
-                                            rownbr)
-
-    # ExpPurpCd
-    data['ExpPurpCd'] = clean_sql_text(data['ExpPurpCd'])
-
-    # ExpPurpDesc
-    data['ExpPurpDesc'] = clean_sql_text(data['ExpPurpDesc'])
-
-    # ExpCatCd
-    data['ExpCatCd'] = clean_sql_text(data['ExpCatCd'])
-
-    # BenCommID
-    data['BenCommID'] = clean_sql_text(data['BenCommID'])
-
-    # BenCommNm
-    data['BenCommNm'] = clean_sql_text(data['BenCommNm'])
-
-    # BenCandID
-    data['BenCandID'] = clean_sql_text(data['BenCandID'])
-
-    # BenCandFullName
-    if data['BenCandFullName'] != '':
-        if data['BenCandLName'] != '' or data['BenCandFName'] != '' or data['BenCandMName'] != '' or data[
-            'BenCandPfx'] != '' or data['BenCandSfx'] != '':
-            AddEntryToErrorLog('Beneficiary candidate full name (' + data[
-                'BenCandFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['BenCandFullName'], namedelim)
-            data['BenCandLName'] = name[0]
-            data['BenCandFName'] = name[1]
-            data['BenCandMName'] = name[2]
-            data['BenCandPfx'] = name[3]
-            data['BenCandSfx'] = name[4]
-        else:
-            data['BenCandLName'] = data['BenCandFullName']
-
-    # BenCandLName
-    data['BenCandLName'] = clean_sql_text(data['BenCandLName'])
-
-    # BenCandFName
-    data['BenCandFName'] = clean_sql_text(data['BenCandFName'])
-
-    # BenCandMName
-    data['BenCandMName'] = clean_sql_text(data['BenCandMName'])
-
-    # BenCandPfx
-    data['BenCandPfx'] = clean_sql_text(data['BenCandPfx'])
-
-    # BenCandSfx
-    data['BenCandSfx'] = clean_sql_text(data['BenCandSfx'])
-
-    # BenCandOfc
-    data['BenCandOfc'] = clean_sql_text(data['BenCandOfc'])
-
-    # BenCandState
-    data['BenCandState'] = clean_sql_text(data['BenCandState'])
-
-    # BenCandDist
-    # Sometimes this column just contains a second copy of the state abbreviation
-    # or NA
-    if data['BenCandDist'] == data['BenCandState']:
-        try:
-            float(data['BenCandDist'])
-        except:
-            data['BenCandDist'] = None
-    elif data['BenCandDist'] == 'NA' or data['BenCandDist'] == '**':
-        data['BenCandDist'] = None
-    data['BenCandDist'] = convert_to_tinyint(data['BenCandDist'], image, 'BenCandDist', data['LineNbr'], rownbr, 'SB',
-                                             data['TransID'])
-
-    # ConduitNm
-    data['ConduitNm'] = clean_sql_text(data['ConduitNm'])
-
-    # ConduitAddr1
-    data['ConduitAddr1'] = clean_sql_text(data['ConduitAddr1'])
-
-    # ConduitAddr2
-    data['ConduitAddr2'] = clean_sql_text(data['ConduitAddr2'])
-
-    # ConduitCity
-    data['ConduitCity'] = clean_sql_text(data['ConduitCity'])
-
-    # ConduitState
-    data['ConduitState'] = clean_sql_text(data['ConduitState'])
-
-    # ConduitZip
-    data['ConduitZip'] = clean_sql_text(data['ConduitZip'])
-
-    # MemoCd
-    data['MemoCd'] = convert_to_bit(clean_sql_text(data['MemoCd']))
-
-    # MemoTxt
-    data['MemoTxt'] = clean_sql_text(data['MemoTxt'])
-
-    # SIorSLRef
-    data['SIorSLRef'] = clean_sql_text(data['SIorSLRef'])
-
-    return data
-
-
-def check_row_data_sch_c(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # RctLnNbr
-    data['RctLnNbr'] = clean_sql_text(data['RctLnNbr'])
-
-    # EntTp
-    data['EntTp'] = clean_sql_text(data['EntTp'])
-
-    # LenderOrgName
-    data['LenderOrgName'] = clean_sql_text(data['LenderOrgName'])
-
-    # LenderLName
-    data['LenderLName'] = clean_sql_text(data['LenderLName'])
-
-    # LenderFName
-    data['LenderFName'] = clean_sql_text(data['LenderFName'])
-
-    # LenderMName
-    data['LenderMName'] = clean_sql_text(data['LenderMName'])
-
-    # LenderPfx
-    data['LenderPfx'] = clean_sql_text(data['LenderPfx'])
-
-    # LenderSfx
-    data['LenderSfx'] = clean_sql_text(data['LenderSfx'])
-
-    # LenderAddr1
-    data['LenderAddr1'] = clean_sql_text(data['LenderAddr1'])
-
-    # LenderAddr2
-    data['LenderAddr2'] = clean_sql_text(data['LenderAddr2'])
-
-    # LenderCity
-    data['LenderCity'] = clean_sql_text(data['LenderCity'])
-
-    # LenderState
-    data['LenderState'] = clean_sql_text(data['LenderState'])
-
-    # LenderZip
-    data['LenderZip'] = clean_sql_text(data['LenderZip'])
-
-    # ElecCd
-    data['ElecCd'] = clean_sql_text(data['ElecCd'])
-
-    # ElecDesc
-    data['ElecDesc'] = clean_sql_text(data['ElecDesc'])
-
-    # LoanAmt
-    data['LoanAmt'] = ck_curr_val(data['LoanAmt'], image, 'LoanAmt', data['LineNbr'], rownbr)
-
-    # PymtToDt
-    data['PymtToDt'] = ck_curr_val(data['PymtToDt'], image, 'PymtToDt', data['LineNbr'], rownbr)
-
-    # LoanBlnc
-    data['LoanBlnc'] = ck_curr_val(data['LoanBlnc'], image, 'LoanBlnc', data['LineNbr'], rownbr)
-
-    # IncurredDt
-    data['IncurredDt'] = convert_to_date(data['IncurredDt'], dateformat, image, 'IncurredDt', data['LineNbr'], rownbr,
-                                         'SC', data['TransID'])
-
-    # DueDt
-    data['DueDt'] = convert_to_date(data['DueDt'], dateformat, image, 'IncurredDt', data['LineNbr'], rownbr, 'SC',
-                                    data['TransID'])
-
-    # IntRt
-    data['IntRt'] = clean_sql_text(data['IntRt'])
-
-    # flgSecured
-    data['flgSecured'] = convert_to_bit(clean_sql_text(data['flgSecured']))
-
-    # flgPersFunds
-    data['flgPersFunds'] = convert_to_bit(clean_sql_text(data['flgPersFunds']))
-
-    # LenderCommID
-    data['LenderCommID'] = clean_sql_text(data['LenderCommID'])
-
-    # LenderCandID
-    data['LenderCandID'] = clean_sql_text(data['LenderCandID'])
-
-    # LenderCandLName
-    data['LenderCandLName'] = clean_sql_text(data['LenderCandLName'])
-
-    # LenderCandFName
-    data['LenderCandFName'] = clean_sql_text(data['LenderCandFName'])
-
-    # LenderCandMName
-    data['LenderCandMName'] = clean_sql_text(data['LenderCandMName'])
-
-    # LenderCandPfx
-    data['LenderCandPfx'] = clean_sql_text(data['LenderCandPfx'])
-
-    # LenderCandSfx
-    data['LenderCandSfx'] = clean_sql_text(data['LenderCandSfx'])
-
-    # LenderCandOfc
-    data['LenderCandOfc'] = clean_sql_text(data['LenderCandOfc'])
-
-    # LenderCandState
-    data['LenderCandState'] = clean_sql_text(data['LenderCandState'])
-
-    # LenderCandDist
-    data['LenderCandDist'] = convert_to_tinyint(data['LenderCandDist'], image, 'LenderCandDist', data['LineNbr'],
-                                                rownbr, 'SC', data['TransID'])
-
-    # MemoCd
-    data['MemoCd'] = convert_to_bit(clean_sql_text(data['MemoCd']))
-
-    # MemoTxt
-    data['MemoTxt'] = clean_sql_text(data['MemoTxt'])
-
-    return data
-
-
-def check_row_data_sch_c1(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
-
-    # Lender
-    data['Lender'] = clean_sql_text(data['Lender'])
-
-    # LenderAddr1
-    data['LenderAddr1'] = clean_sql_text(data['LenderAddr1'])
-
-    # LenderAddr2
-    data['LenderAddr2'] = clean_sql_text(data['LenderAddr2'])
-
-    # LenderCity
-    data['LenderCity'] = clean_sql_text(data['LenderCity'])
-
-    # LenderState
-    data['LenderState'] = clean_sql_text(data['LenderState'])
-
-    # LenderZip
-    data['LenderZip'] = clean_sql_text(data['LenderZip'])
-
-    # LoanAmt
-    data['LoanAmt'] = ck_curr_val(data['LoanAmt'], image, 'LoanAmt', data['LineNbr'], rownbr)
-
-    # IntRt
-    data['IntRt'] = clean_sql_text(data['IntRt'])
-
-    # IncurredDt
-    data['IncurredDt'] = convert_to_date(data['IncurredDt'], dateformat, image, 'IncurredDt', data['LineNbr'], rownbr,
-                                         'SC1', data['TransID'])
-
-    # DueDt
-    data['DueDt'] = convert_to_date(data['DueDt'], dateformat, image, 'DueDt', data['LineNbr'], rownbr, 'SC1',
-                                    data['TransID'])
-
-    # flgLoanRestructured
-    data['flgLoanRestructured'] = convert_to_bit(clean_sql_text(data['flgLoanRestructured']))
-
-    # OrigLoanDt
-    data['OrigLoanDt'] = convert_to_date(data['OrigLoanDt'], dateformat, image, 'OrigLoanDt', data['LineNbr'], rownbr,
-                                         'SC1', data['TransID'])
-
-    # CrdtAmtThisDraw
-    data['CrdtAmtThisDraw'] = ck_curr_val(data['CrdtAmtThisDraw'], image, 'CrdtAmtThisDraw', data['LineNbr'], rownbr)
-
-    # TotBlnc
-    data['TotBlnc'] = ck_curr_val(data['TotBlnc'], image, 'TotBlnc', data['LineNbr'], rownbr)
-
-    # flgOthersLiable
-    data['flgOthersLiable'] = convert_to_bit(clean_sql_text(data['flgOthersLiable']))
-
-    # flgCollateral
-    data['flgCollateral'] = convert_to_bit(clean_sql_text(data['flgCollateral']))
-
-    # CollateralDesc
-    data['CollateralDesc'] = clean_sql_text(data['CollateralDesc'])
-
-    # CollateralVal
-    data['CollateralVal'] = ck_curr_val(data['CollateralVal'], image, 'CollateralVal', data['LineNbr'], rownbr)
-
-    # flgPerfectedInt
-    data['flgPerfectedInt'] = convert_to_bit(clean_sql_text(data['flgPerfectedInt']))
-
-    # flgFutIncPledged
-    data['flgFutIncPledged'] = convert_to_bit(clean_sql_text(data['flgFutIncPledged']))
-
-    # FutIncDesc
-    data['FutIncDesc'] = clean_sql_text(data['FutIncDesc'])
-
-    # FutIncEstVal
-    data['FutIncEstVal'] = ck_curr_val(data['FutIncEstVal'], image, 'FutIncEstVal', data['LineNbr'], rownbr)
-
-    # DepAcctEstDt
-    data['DepAcctEstDt'] = convert_to_date(data['DepAcctEstDt'], dateformat, image, 'DepAcctEstDt', data['LineNbr'],
-                                           rownbr, 'SC1', data['TransID'])
-
-    # AcctLocName
-    data['AcctLocName'] = clean_sql_text(data['AcctLocName'])
-
-    # AcctLocAddr1
-    data['AcctLocAddr1'] = clean_sql_text(data['AcctLocAddr1'])
-
-    # AcctLocAddr2
-    data['AcctLocAddr2'] = clean_sql_text(data['AcctLocAddr2'])
-
-    # AcctLocCity
-    data['AcctLocCity'] = clean_sql_text(data['AcctLocCity'])
-
-    # AcctLocState
-    data['AcctLocState'] = clean_sql_text(data['AcctLocState'])
-
-    # AcctLocZip
-    data['AcctLocZip'] = clean_sql_text(data['AcctLocZip'])
-
-    # DepAcctAuthDt
-    data['DepAcctAuthDt'] = convert_to_date(data['DepAcctAuthDt'], dateformat, image, 'DepAcctAuthDt', data['LineNbr'],
-                                            rownbr, 'SC1', data['TransID'])
-
-    # LoanBasisDesc
-    data['LoanBasisDesc'] = clean_sql_text(data['LoanBasisDesc'])
-
-    # TrsFullName
-    if data['TrsFullName'] != '':
-        if data['TrsLName'] != '' or data['TrsFName'] != '' or data['TrsMName'] != '' or data['TrsPfx'] != '' or data[
-            'TrsSfx'] != '':
-            AddEntryToErrorLog('Treasurer full name (' + data[
-                'TrsFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            treas = parse_full_name(data['TrsFullName'], namedelim)
-            data['TrsLName'] = treas[0]
-            data['TrsFName'] = treas[1]
-            data['TrsMName'] = treas[2]
-            data['TrsPfx'] = treas[3]
-            data['TrsSfx'] = treas[4]
-        else:
-            data['TrsLName'] = data['TrsFullName']
-
-    # TrsLName
-    data['TrsLName'] = clean_sql_text(data['TrsLName'])
-
-    # TrsFName
-    data['TrsFName'] = clean_sql_text(data['TrsFName'])
-
-    # TrsMName
-    data['TrsMName'] = clean_sql_text(data['TrsMName'])
-
-    # TrsPfx
-    data['TrsPfx'] = clean_sql_text(data['TrsPfx'])
-
-    # TrsSfx
-    data['TrsSfx'] = clean_sql_text(data['TrsSfx'])
-
-    # TrsSignDt
-    data['TrsSignDt'] = convert_to_date(data['TrsSignDt'], dateformat, image, 'TrsSignDt', data['LineNbr'], rownbr,
-                                        'SC1', data['TransID'])
-
-    # LendRepFullName
-    if data['LendRepFullName'] != '':
-        if data['LendRepLName'] != '' or data['LendRepFName'] != '' or data['LendRepMName'] != '' or data[
-            'LendRepPfx'] != '' or data['LendRepSfx'] != '':
-            AddEntryToErrorLog('Treasurer full name (' + data[
-                'LendRepFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            treas = parse_full_name(data['LendRepFullName'], namedelim)
-            data['LendRepLName'] = treas[0]
-            data['LendRepFName'] = treas[1]
-            data['LendRepMName'] = treas[2]
-            data['LendRepPfx'] = treas[3]
-            data['LendRepSfx'] = treas[4]
-        else:
-            data['LendRepLName'] = data['LendRepFullName']
-
-    # LendRepLName
-    data['LendRepLName'] = clean_sql_text(data['LendRepLName'])
-
-    # LendRepFName
-    data['LendRepFName'] = clean_sql_text(data['LendRepFName'])
-
-    # LendRepMName
-    data['LendRepMName'] = clean_sql_text(data['LendRepMName'])
-
-    # LendRepPfx
-    data['LendRepPfx'] = clean_sql_text(data['LendRepPfx'])
-
-    # LendRepSfx
-    data['LendRepSfx'] = clean_sql_text(data['LendRepSfx'])
-
-    # LendRepTitle
-    data['LendRepTitle'] = clean_sql_text(data['LendRepTitle'])
-
-    # LendRepSignDt
-    data['LendRepSignDt'] = convert_to_date(data['LendRepSignDt'], dateformat, image, 'LendRepSignDt', data['LineNbr'],
-                                            rownbr, 'SC1', data['TransID'])
-
-    return data
-
-
-def check_row_data_sch_c2(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
-
-    # GuarFullName
-    if data['GuarFullName'] != '':
-        if data['GuarLName'] != '' or data['GuarFName'] != '' or data['GuarMName'] != '' or data['GuarPfx'] != '' or \
-                        data['GuarSfx'] != '':
-            AddEntryToErrorLog('Treasurer full name (' + data[
-                'GuarFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            guar = parse_full_name(data['GuarFullName'], namedelim)
-            data['GuarLName'] = guar[0]
-            data['GuarFName'] = guar[1]
-            data['GuarMName'] = guar[2]
-            data['GuarPfx'] = guar[3]
-            data['GuarSfx'] = guar[4]
-        else:
-            data['GuarLName'] = data['GuarFullName']
-
-    # GuarLName
-    data['GuarLName'] = clean_sql_text(data['GuarLName'])
-
-    # GuarFName
-    data['GuarFName'] = clean_sql_text(data['GuarFName'])
-
-    # GuarMName
-    data['GuarMName'] = clean_sql_text(data['GuarMName'])
-
-    # GuarPfx
-    data['GuarPfx'] = clean_sql_text(data['GuarPfx'])
-
-    # GuarSfx
-    data['GuarSfx'] = clean_sql_text(data['GuarSfx'])
-
-    # GuarAddr1
-    data['GuarAddr1'] = clean_sql_text(data['GuarAddr1'])
-
-    # GuarAddr2
-    data['GuarAddr2'] = clean_sql_text(data['GuarAddr2'])
-
-    # GuarCity
-    data['GuarCity'] = clean_sql_text(data['GuarCity'])
-
-    # GuarState
-    data['GuarState'] = clean_sql_text(data['GuarState'])
-
-    # GuarZip
-    data['GuarZip'] = clean_sql_text(data['GuarZip'])
-
-    # GuarEmp
-    data['GuarEmp'] = clean_sql_text(data['GuarEmp'])
-
-    # GuarOcc
-    data['GuarOcc'] = clean_sql_text(data['GuarOcc'])
-
-    # GuarAmt
-    data['GuarAmt'] = ck_curr_val(data['GuarAmt'], image, 'GuarAmt', data['LineNbr'], rownbr)
-
-    return data
-
-
-def check_row_data_sch_d(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # EntTp
-    data['EntTp'] = clean_sql_text(data['EntTp'])
-
-    # CreditorOrgName
-    data['CreditorOrgName'] = clean_sql_text(data['CreditorOrgName'])
-
-    # CreditorLName
-    data['CreditorLName'] = clean_sql_text(data['CreditorLName'])
-
-    # CreditorFName
-    data['CreditorFName'] = clean_sql_text(data['CreditorFName'])
-
-    # CreditorMName
-    data['CreditorMName'] = clean_sql_text(data['CreditorMName'])
-
-    # CreditorPfx
-    data['CreditorPfx'] = clean_sql_text(data['CreditorPfx'])
-
-    # CreditorSfx
-    data['CreditorSfx'] = clean_sql_text(data['CreditorSfx'])
-
-    # CreditorAddr1
-    data['CreditorAddr1'] = clean_sql_text(data['CreditorAddr1'])
-
-    # CreditorAddr2
-    data['CreditorAddr2'] = clean_sql_text(data['CreditorAddr2'])
-
-    # CreditorCity
-    data['CreditorCity'] = clean_sql_text(data['CreditorCity'])
-
-    # CreditorState
-    data['CreditorState'] = clean_sql_text(data['CreditorState'])
-
-    # CreditorZip
-    data['CreditorZip'] = clean_sql_text(data['CreditorZip'])
-
-    # DebtPurp
-    data['DebtPurp'] = clean_sql_text(data['DebtPurp'])
-
-    # BegBlnc_P
-    data['BegBlnc_P'] = ck_curr_val(data['BegBlnc_P'], image, 'BegBlnc_P', data['LineNbr'], rownbr)
-
-    # IncurAmt_P
-    data['IncurAmt_P'] = ck_curr_val(data['IncurAmt_P'], image, 'IncurAmt_P', data['LineNbr'], rownbr)
-
-    # PymtAmt_P
-    data['PymtAmt_P'] = ck_curr_val(data['PymtAmt_P'], image, 'PymtAmt_P', data['LineNbr'], rownbr)
-
-    # BalClose_P
-    data['BalClose_P'] = ck_curr_val(data['BalClose_P'], image, 'BalClose_P', data['LineNbr'], rownbr)
-
-    # CreditorCommID
-    data['CreditorCommID'] = clean_sql_text(data['CreditorCommID'])
-
-    # CreditorCandID
-    data['CreditorCandID'] = clean_sql_text(data['CreditorCandID'])
-
-    # CreditorCandFullName
-    data['CreditorCandFullName'] = clean_sql_text(data['CreditorCandFullName'])
-
-    # CreditorCandOfc
-    data['CreditorCandOfc'] = clean_sql_text(data['CreditorCandOfc'])
-
-    # CreditorCandState
-    data['CreditorCandState'] = clean_sql_text(data['CreditorCandState'])
-
-    # CreditorCandDist
-    data['CreditorCandDist'] = convert_to_tinyint(data['CreditorCandDist'], image, 'CreditorCandDist', data['LineNbr'],
-                                                  rownbr, 'SD', data['TransID'])
-
-    # ConduitName
-    data['ConduitName'] = clean_sql_text(data['ConduitName'])
-
-    # ConduitAddr1
-    data['ConduitAddr1'] = clean_sql_text(data['ConduitAddr1'])
-
-    # ConduitAddr2
-    data['ConduitAddr2'] = clean_sql_text(data['ConduitAddr2'])
-
-    # ConduitCity
-    data['ConduitCity'] = clean_sql_text(data['ConduitCity'])
-
-    # ConduitState
-    data['ConduitState'] = clean_sql_text(data['ConduitState'])
-
-    # ConduitZip
-    data['ConduitZip'] = clean_sql_text(data['ConduitZip'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    return data
-
-
-def check_row_data_sch_e(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
-
-    # BkRefSchdNm
-    data['BkRefSchdNm'] = clean_sql_text(data['BkRefSchdNm'])
-
-    # EntTp
-    data['EntTp'] = clean_sql_text(data['EntTp'])
-
-    # PayeeOrgNm
-    data['PayeeOrgNm'] = clean_sql_text(data['PayeeOrgNm'])
-
-    # PayeeFullName
-    if data['PayeeFullName'] != '':
-        if data['PayeeLName'] != '' or data['PayeeFName'] != '' or data['PayeeMName'] != '' or data['PayeePfx'] != '' or \
-                        data['PayeeSfx'] != '':
-            AddEntryToErrorLog('Payee full name (' + data[
-                'PayeeFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['PayeeFullName'], namedelim)
-            data['PayeeLName'] = name[0]
-            data['PayeeFName'] = name[1]
-            data['PayeeMName'] = name[2]
-            data['PayeePfx'] = name[3]
-            data['PayeeSfx'] = name[4]
-        else:
-            data['PayeeLName'] = data['PayeeFullName']
-
-    # PayeeLName
-    data['PayeeLName'] = clean_sql_text(data['PayeeLName'])
-
-    # PayeeFName
-    data['PayeeFName'] = clean_sql_text(data['PayeeFName'])
-
-    # PayeeMName
-    data['PayeeMName'] = clean_sql_text(data['PayeeMName'])
-
-    # PayeePfx
-    data['PayeePfx'] = clean_sql_text(data['PayeePfx'])
-
-    # PayeeSfx
-    data['PayeeSfx'] = clean_sql_text(data['PayeeSfx'])
-
-    # PayeeAddr1
-    data['PayeeAddr1'] = clean_sql_text(data['PayeeAddr1'])
-
-    # PayeeAddr2
-    data['PayeeAddr2'] = clean_sql_text(data['PayeeAddr2'])
-
-    # PayeeCity
-    data['PayeeCity'] = clean_sql_text(data['PayeeCity'])
-
-    # PayeeStAbbr
-    data['PayeeStAbbr'] = clean_sql_text(data['PayeeStAbbr'])
-
-    # PayeeZip
-    data['PayeeZip'] = clean_sql_text(data['PayeeZip'])
-
-    # ElecCd
-    data['ElecCd'] = clean_sql_text(data['ElecCd'])
-
-    # ElecDesc
-    data['ElecDesc'] = clean_sql_text(data['ElecDesc'])
-
-    # DissmntnDt
-    data['DissmntnDt'] = convert_to_date(data['DissmntnDt'], dateformat, image, 'DissmntnDt', data['LineNbr'], rownbr,
-                                         'SE', data['TransID'])
-
-    # ExpDt
-    data['ExpDt'] = convert_to_date(data['ExpDt'], dateformat, image, 'ExpDt', data['LineNbr'], rownbr, 'SE',
-                                    data['TransID'])
-
-    # ExpAmt
-    data['ExpAmt'] = ck_curr_val(data['ExpAmt'], image, 'ExpAmt', data['LineNbr'], rownbr)
-
-    # ExpAgg
-    data['ExpAgg'] = ck_curr_val(data['ExpAgg'], image, 'ExpAgg', data['LineNbr'], rownbr)
-
-    # ExpPurpDesc
-    data['ExpPurpDesc'] = clean_sql_text(data['ExpPurpDesc'])
-
-    # ExpCatCd
-    data['ExpCatCd'] = clean_sql_text(data['ExpCatCd'])
-
-    # PayeeCommID
-    data['PayeeCommID'] = clean_sql_text(data['PayeeCommID'])
-
-    # SupOppCd
-    data['SupOppCd'] = clean_sql_text(data['SupOppCd'])
-
-    # SupOppCandID
-    data['SupOppCandID'] = clean_sql_text(data['SupOppCandID'])
-
-    # SupOppCandFullName
-    if data['SupOppCandFullName'] != '':
-        if data['SupOppCandLName'] != '' or data['SupOppCandFName'] != '' or data['SupOppCandMName'] != '' or data[
-            'SupOppCandPfx'] != '' or data['SupOppCandSfx'] != '':
-            AddEntryToErrorLog('Sup/Opp candidate full name (' + data[
-                'SupOppCandFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['SupOppCandFullName'], namedelim)
-            data['SupOppCandLName'] = name[0]
-            data['SupOppCandFName'] = name[1]
-            data['SupOppCandMName'] = name[2]
-            data['SupOppCandPfx'] = name[3]
-            data['SupOppCandSfx'] = name[4]
-        else:
-            data['SupOppCandLName'] = data['SupOppCandFullName']
-
-    # SupOppCandLName
-    data['SupOppCandLName'] = clean_sql_text(data['SupOppCandLName'])
-
-    # SupOppCandFName
-    data['SupOppCandFName'] = clean_sql_text(data['SupOppCandFName'])
-
-    # SupOppCandMName
-    data['SupOppCandMName'] = clean_sql_text(data['SupOppCandMName'])
-
-    # SupOppCandPfx
-    data['SupOppCandPfx'] = clean_sql_text(data['SupOppCandPfx'])
-
-    # SupOppCandSfx
-    data['SupOppCandSfx'] = clean_sql_text(data['SupOppCandSfx'])
-
-    # SupOppCandOfc
-    data['SupOppCandOfc'] = clean_sql_text(data['SupOppCandOfc'])
-
-    # SupOppCandStAbbr
-    data['SupOppCandStAbbr'] = clean_sql_text(data['SupOppCandStAbbr'])
-
-    # SupOppCandDist
-    data['SupOppCandDist'] = convert_to_tinyint(data['SupOppCandDist'], image, 'SupOppCandDist', data['LineNbr'],
-                                                rownbr, 'SE', data['TransID'])
-
-    # CompFullName
-    if data['CompFullName'] != '':
-        if data['CompLName'] != '' or data['CompFName'] != '' or data['CompMName'] != '' or data['CompPfx'] != '' or \
-                        data['CompSfx'] != '':
-            AddEntryToErrorLog('Form completed by full name (' + data[
-                'CompFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['CompFullName'], namedelim)
-            data['CompLName'] = name[0]
-            data['CompFName'] = name[1]
-            data['CompMName'] = name[2]
-            data['CompPfx'] = name[3]
-            data['CompSfx'] = name[4]
-        else:
-            data['CompLName'] = data['CompFullName']
-
-    # CompLName
-    data['CompLName'] = clean_sql_text(data['CompLName'])
-
-    # CompFName
-    data['CompFName'] = clean_sql_text(data['CompFName'])
-
-    # CompMName
-    data['CompMName'] = clean_sql_text(data['CompMName'])
-
-    # CompPfx
-    data['CompPfx'] = clean_sql_text(data['CompPfx'])
-
-    # CompSfx
-    data['CompSfx'] = clean_sql_text(data['CompSfx'])
-
-    # SignDt
-    data['SignDt'] = convert_to_date(data['SignDt'], dateformat, image, 'SignDt', data['LineNbr'], rownbr, 'SE',
-                                     data['TransID'])
-
-    # MemoCd
-    data['MemoCd'] = convert_to_bit(clean_sql_text(data['MemoCd']))
-
-    # MemoTxt
-    data['MemoTxt'] = clean_sql_text(data['MemoTxt'])
-
-    return data
-
-
-def check_row_data_sch_f(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
-
-    # BkRefSchdNm
-    data['BkRefSchdNm'] = clean_sql_text(data['BkRefSchdNm'])
-
-    # flgDesigCoordExp
-    data['flgDesigCoordExp'] = convert_to_bit(convert_to_bit(clean_sql_text(data['flgDesigCoordExp'])))
-
-    # DesigCommID
-    data['DesigCommID'] = clean_sql_text(data['DesigCommID'])
-
-    # DesigCommNm
-    data['DesigCommNm'] = clean_sql_text(data['DesigCommNm'])
-
-    # SubordCommID
-    data['SubordCommID'] = clean_sql_text(data['SubordCommID'])
-
-    # SubordCommNm
-    data['SubordCommNm'] = clean_sql_text(data['SubordCommNm'])
-
-    # SubordAddr1
-    data['SubordAddr1'] = clean_sql_text(data['SubordAddr1'])
-
-    # SubordAddr2
-    data['SubordAddr2'] = clean_sql_text(data['SubordAddr2'])
-
-    # SubordCity
-    data['SubordCity'] = clean_sql_text(data['SubordCity'])
-
-    # SubordStAbbr
-    data['SubordStAbbr'] = clean_sql_text(data['SubordStAbbr'])
-
-    # SubordZip
-    data['SubordZip'] = clean_sql_text(data['SubordZip'])
-
-    # EntTp
-    data['EntTp'] = clean_sql_text(data['EntTp'])
-
-    # PayeeOrgNm
-    data['PayeeOrgNm'] = clean_sql_text(data['PayeeOrgNm'])
-
-    # PayeeFullName
-    if data['PayeeFullName'] != '':
-        if data['PayeeLName'] != '' or data['PayeeFName'] != '' or data['PayeeMName'] != '' or data['PayeePfx'] != '' or \
-                        data['PayeeSfx'] != '':
-            AddEntryToErrorLog('Payee full name (' + data[
-                'PayeeFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['PayeeFullName'], namedelim)
-            data['PayeeLName'] = name[0]
-            data['PayeeFName'] = name[1]
-            data['PayeeMName'] = name[2]
-            data['PayeePfx'] = name[3]
-            data['PayeeSfx'] = name[4]
-        else:
-            data['PayeeLName'] = data['PayeeFullName']
-
-    # PayeeLName
-    data['PayeeLName'] = clean_sql_text(data['PayeeLName'])
-
-    # PayeeFName
-    data['PayeeFName'] = clean_sql_text(data['PayeeFName'])
-
-    # PayeeMName
-    data['PayeeMName'] = clean_sql_text(data['PayeeMName'])
-
-    # PayeePfx
-    data['PayeePfx'] = clean_sql_text(data['PayeePfx'])
-
-    # PayeeSfx
-    data['PayeeSfx'] = clean_sql_text(data['PayeeSfx'])
-
-    # PayeeAddr1
-    data['PayeeAddr1'] = clean_sql_text(data['PayeeAddr1'])
-
-    # PayeeAddr2
-    data['PayeeAddr2'] = clean_sql_text(data['PayeeAddr2'])
-
-    # PayeeCity
-    data['PayeeCity'] = clean_sql_text(data['PayeeCity'])
-
-    # PayeeStAbbr
-    data['PayeeStAbbr'] = clean_sql_text(data['PayeeStAbbr'])
-
-    # PayeeZip
-    data['PayeeZip'] = clean_sql_text(data['PayeeZip'])
-
-    # ExpDt
-    data['ExpDt'] = convert_to_date(data['ExpDt'], dateformat, image, 'ExpDt', data['LineNbr'], rownbr, 'SF',
-                                    data['TransID'])
-
-    # ExpAmt
-    data['ExpAmt'] = ck_curr_val(data['ExpAmt'], image, 'ExpAmt', data['LineNbr'], rownbr)
-
-    # ExpAgg
-    data['ExpAgg'] = ck_curr_val(data['ExpAgg'], image, 'ExpAgg', data['LineNbr'], rownbr)
-
-    # ExpPurpCd
-    data['ExpPurpCd'] = clean_sql_text(data['ExpPurpCd'])
-
-    # ExpPurpDesc
-    data['ExpPurpDesc'] = clean_sql_text(data['ExpPurpDesc'])
-
-    # ExpCatCd
-    data['ExpCatCd'] = clean_sql_text(data['ExpCatCd'])
-
-    # PayeeCommID
-    data['PayeeCommID'] = clean_sql_text(data['PayeeCommID'])
-
-    # PayeeCandID
-    data['PayeeCandID'] = clean_sql_text(data['PayeeCandID'])
-
-    # PayeeCandFullName
-    if data['PayeeCandFullName'] != '':
-        if data['PayeeCandLName'] != '' or data['PayeeCandFName'] != '' or data['PayeeCandMName'] != '' or data[
-            'PayeeCandPfx'] != '' or data['PayeeCandSfx'] != '':
-            AddEntryToErrorLog('Payee candidate full name (' + data[
-                'PayeeCandFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['PayeeCandFullName'], namedelim)
-            data['PayeeCandLName'] = name[0]
-            data['PayeeCandFName'] = name[1]
-            data['PayeeCandMName'] = name[2]
-            data['PayeeCandPfx'] = name[3]
-            data['PayeeCandSfx'] = name[4]
-        else:
-            data['PayeeCandLName'] = data['PayeeCandFullName']
-
-    # PayeeCandLName
-    data['PayeeCandLName'] = clean_sql_text(data['PayeeCandLName'])
-
-    # PayeeCandFName
-    data['PayeeCandFName'] = clean_sql_text(data['PayeeCandFName'])
-
-    # PayeeCandMName
-    data['PayeeCandMName'] = clean_sql_text(data['PayeeCandMName'])
-
-    # PayeeCandPfx
-    data['PayeeCandPfx'] = clean_sql_text(data['PayeeCandPfx'])
-
-    # PayeeCandSfx
-    data['PayeeCandSfx'] = clean_sql_text(data['PayeeCandSfx'])
-
-    # PayeeCandOfc
-    data['PayeeCandOfc'] = clean_sql_text(data['PayeeCandOfc'])
-
-    # PayeeCandStAbbr
-    data['PayeeCandStAbbr'] = clean_sql_text(data['PayeeCandStAbbr'])
-
-    # PayeeCandDist
-    data['PayeeCandDist'] = convert_to_tinyint(data['PayeeCandDist'], image, 'PayeeCandDist', data['LineNbr'], rownbr,
-                                               'SF', data['TransID'])
-
-    # MemoCd
-    data['MemoCd'] = convert_to_bit(clean_sql_text(data['MemoCd']))
-
-    # MemoTxt
-    data['MemoTxt'] = clean_sql_text(data['MemoTxt'])
-
-    return data
-
-
-def check_row_data_sch_h1(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # flgStLocFxPctPresOnly
-    data['flgStLocFxPctPresOnly'] = convert_to_bit(clean_sql_text(data['flgStLocFxPctPresOnly']))
-
-    # flgStLocFxPctPresAndSen
-    data['flgStLocFxPctPresAndSen'] = convert_to_bit(clean_sql_text(data['flgStLocFxPctPresAndSen']))
-
-    # flgStLocFxPctSenOnly
-    data['flgStLocFxPctSenOnly'] = convert_to_bit(clean_sql_text(data['flgStLocFxPctSenOnly']))
-
-    # flgStLocFxPctNonPresNonSen
-    data['flgStLocFxPctNonPresNonSen'] = convert_to_bit(clean_sql_text(data['flgStLocFxPctNonPresNonSen']))
-
-    # flgFlatMin50PctFed
-    data['flgFlatMin50PctFed'] = convert_to_bit(clean_sql_text(data['flgFlatMin50PctFed']))
-
-    # FedPct
-    data['FedPct'] = ck_curr_val(data['FedPct'], image, 'FedPct', data['LineNbr'], rownbr)
-
-    # NonFedPct
-    data['NonFedPct'] = ck_curr_val(data['NonFedPct'], image, 'NonFedPct', data['LineNbr'], rownbr)
-
-    # flgAdmRatio
-    data['flgAdmRatio'] = convert_to_bit(clean_sql_text(data['flgAdmRatio']))
-
-    # flgGenericVoterDrvRatio
-    data['flgGenericVoterDrvRatio'] = convert_to_bit(clean_sql_text(data['flgGenericVoterDrvRatio']))
-
-    # flgPubCommunRefPrtyRatio
-    data['flgPubCommunRefPrtyRatio'] = convert_to_bit(clean_sql_text(data['flgPubCommunRefPrtyRatio']))
-
-    return data
-
-
-def check_row_data_sch_h2(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # EventNm
-    data['EventNm'] = clean_sql_text(data['EventNm'])
-
-    # flgDirFndrsg
-    data['flgDirFndrsg'] = convert_to_bit(clean_sql_text(data['flgDirFndrsg']))
-
-    # flgDirCandSup
-    data['flgDirCandSup'] = convert_to_bit(clean_sql_text(data['flgDirCandSup']))
-
-    # RatioCd
-    data['RatioCd'] = clean_sql_text(data['RatioCd'])
-
-    # FedPct
-    data['FedPct'] = ck_curr_val(data['FedPct'], image, 'FedPct', data['LineNbr'], rownbr)
-
-    # NonFedPct
-    data['NonFedPct'] = ck_curr_val(data['NonFedPct'], image, 'NonFedPct', data['LineNbr'], rownbr)
-
-    return data
-
-
-def check_row_data_sch_h3(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
-
-    # AcctNm
-    data['AcctNm'] = clean_sql_text(data['AcctNm'])
-
-    # EventTp
-    data['EventTp'] = clean_sql_text(data['EventTp'])
-
-    # EventNm
-    data['EventNm'] = clean_sql_text(data['EventNm'])
-
-    # RcptDt
-    data['RcptDt'] = convert_to_date(data['RcptDt'], dateformat, image, 'RcptDt', data['LineNbr'], rownbr, 'H3',
-                                     data['TransID'])
-
-    # TotAmtTrans
-    data['TotAmtTrans'] = ck_curr_val(data['TotAmtTrans'], image, 'TotAmtTrans', data['LineNbr'], rownbr)
-
-    # TransAmt
-    data['TransAmt'] = ck_curr_val(data['TransAmt'], image, 'TransAmt', data['LineNbr'], rownbr)
-
-    return data
-
-
-def check_row_data_sch_h4(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
-
-    # BkRefSchdNm
-    data['BkRefSchdNm'] = clean_sql_text(data['BkRefSchdNm'])
-
-    # EntTp
-    data['EntTp'] = clean_sql_text(data['EntTp'])
-
-    # PayeeOrgNm
-    data['PayeeOrgNm'] = clean_sql_text(data['PayeeOrgNm'])
-
-    # PayeeFullName
-    if data['PayeeFullName'] != '':
-        if data['PayeeLName'] != '' or data['PayeeFName'] != '' or data['PayeeMName'] != '' or data['PayeePfx'] != '' or \
-                        data['PayeeSfx'] != '':
-            AddEntryToErrorLog('Payee full name (' + data[
-                'PayeeFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['PayeeFullName'], namedelim)
-            data['PayeeLName'] = name[0]
-            data['PayeeFName'] = name[1]
-            data['PayeeMName'] = name[2]
-            data['PayeePfx'] = name[3]
-            data['PayeeSfx'] = name[4]
-        else:
-            data['PayeeLName'] = data['PayeeFullName']
-
-    # PayeeLName
-    data['PayeeLName'] = clean_sql_text(data['PayeeLName'])
-
-    # PayeeFName
-    data['PayeeFName'] = clean_sql_text(data['PayeeFName'])
-
-    # PayeeMName
-    data['PayeeMName'] = clean_sql_text(data['PayeeMName'])
-
-    # PayeePfx
-    data['PayeePfx'] = clean_sql_text(data['PayeePfx'])
-
-    # PayeeSfx
-    data['PayeeSfx'] = clean_sql_text(data['PayeeSfx'])
-
-    # PayeeAddr1
-    data['PayeeAddr1'] = clean_sql_text(data['PayeeAddr1'])
-
-    # PayeeAddr2
-    data['PayeeAddr2'] = clean_sql_text(data['PayeeAddr2'])
-
-    # PayeeCity
-    data['PayeeCity'] = clean_sql_text(data['PayeeCity'])
-
-    # PayeeStAbbr
-    data['PayeeStAbbr'] = clean_sql_text(data['PayeeStAbbr'])
-
-    # PayeeZip
-    data['PayeeZip'] = clean_sql_text(data['PayeeZip'])
-
-    # EventNm
-    data['EventNm'] = clean_sql_text(data['EventNm'])
-
-    # ExpDt
-    data['ExpDt'] = convert_to_date(data['ExpDt'], dateformat, image, 'ExpDt', data['LineNbr'], rownbr, 'H4',
-                                    data['TransID'])
-
-    # ExpAmt
-    data['ExpAmt'] = ck_curr_val(data['ExpAmt'], image, 'ExpAmt', data['LineNbr'], rownbr)
-
-    # FedAmt
-    data['FedAmt'] = ck_curr_val(data['FedAmt'], image, 'FedAmt', data['LineNbr'], rownbr)
-
-    # NonFedAmt
-    data['NonFedAmt'] = ck_curr_val(data['NonFedAmt'], image, 'NonFedAmt', data['LineNbr'], rownbr)
-
-    # EventAgg
-    data['EventAgg'] = ck_curr_val(data['EventAgg'], image, 'EventAgg', data['LineNbr'], rownbr)
-
-    # ExpPurpCd
-    data['ExpPurpCd'] = clean_sql_text(data['ExpPurpCd'])
-
-    # ExpPurpDesc
-    data['ExpPurpDesc'] = clean_sql_text(data['ExpPurpDesc'])
-
-    # ExpCatCd
-    data['ExpCatCd'] = clean_sql_text(data['ExpCatCd'])
-
-    # flgAdminActivity
-    data['flgAdminActivity'] = convert_to_bit(clean_sql_text(data['flgAdminActivity']))
-
-    # flgDirectFndrsg
-    data['flgDirectFndrsg'] = convert_to_bit(clean_sql_text(data['flgDirectFndrsg']))
-
-    # flgExempt
-    data['flgExempt'] = convert_to_bit(clean_sql_text(data['flgExempt']))
-
-    # flgGenVtrDrv
-    data['flgGenVtrDrv'] = convert_to_bit(clean_sql_text(data['flgGenVtrDrv']))
-
-    # flgDirCandSup
-    data['flgDirCandSup'] = convert_to_bit(clean_sql_text(data['flgDirCandSup']))
-
-    # flgPubCommun
-    data['flgPubCommun'] = convert_to_bit(clean_sql_text(data['flgPubCommun']))
-
-    # MemoCd
-    data['MemoCd'] = convert_to_bit(clean_sql_text(data['MemoCd']))
-
-    # MemoTxt
-    data['MemoTxt'] = clean_sql_text(data['MemoTxt'])
-
-    return data
-
-
-def check_row_data_sch_h5(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # AcctNm
-    data['AcctNm'] = clean_sql_text(data['AcctNm'])
-
-    # RcptDt
-    data['RcptDt'] = convert_to_date(data['RcptDt'], dateformat, image, 'RcptDt', data['LineNbr'], rownbr, 'H5',
-                                     data['TransID'])
-
-    # TotAmt
-    data['TotAmt'] = ck_curr_val(data['TotAmt'], image, 'TotAmt', data['LineNbr'], rownbr)
-
-    # VotRegnAmt
-    data['VotRegnAmt'] = ck_curr_val(data['VotRegnAmt'], image, 'VotRegnAmt', data['LineNbr'], rownbr)
-
-    # VotIDAmt
-    data['VotIDAmt'] = ck_curr_val(data['VotIDAmt'], image, 'VotIDAmt', data['LineNbr'], rownbr)
-
-    # GOTVAmt
-    data['GOTVAmt'] = ck_curr_val(data['GOTVAmt'], image, 'GOTVAmt', data['LineNbr'], rownbr)
-
-    # GenCampAmt
-    data['GenCampAmt'] = ck_curr_val(data['GenCampAmt'], image, 'GenCampAmt', data['LineNbr'], rownbr)
-
-    return data
-
-
-def check_row_data_sch_h6(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
-
-    # BkRefSchdNm
-    data['BkRefSchdNm'] = clean_sql_text(data['BkRefSchdNm'])
-
-    # EntTp
-    data['EntTp'] = clean_sql_text(data['EntTp'])
-
-    # PayeeOrgNm
-    data['PayeeOrgNm'] = clean_sql_text(data['PayeeOrgNm'])
-
-    # PayeeFullName
-    if data['PayeeFullName'] != '':
-        if data['PayeeLName'] != '' or data['PayeeFName'] != '' or data['PayeeMName'] != '' or data['PayeePfx'] != '' or \
-                        data['PayeeSfx'] != '':
-            AddEntryToErrorLog('Payee full name (' + data[
-                'PayeeFullName'] + ') could not be parsed for ' + imageid + ' because that would overwrite existing data. This script will attempt to add this data row to the database, but the full name field will be ignored.')
-        elif namedelim != '':
-            name = parse_full_name(data['PayeeFullName'], namedelim)
-            data['PayeeLName'] = name[0]
-            data['PayeeFName'] = name[1]
-            data['PayeeMName'] = name[2]
-            data['PayeePfx'] = name[3]
-            data['PayeeSfx'] = name[4]
-        else:
-            data['PayeeLName'] = data['PayeeFullName']
-
-    # PayeeLName
-    data['PayeeLName'] = clean_sql_text(data['PayeeLName'])
-
-    # PayeeFName
-    data['PayeeFName'] = clean_sql_text(data['PayeeFName'])
-
-    # PayeeMName
-    data['PayeeMName'] = clean_sql_text(data['PayeeMName'])
-
-    # PayeePfx
-    data['PayeePfx'] = clean_sql_text(data['PayeePfx'])
-
-    # PayeeSfx
-    data['PayeeSfx'] = clean_sql_text(data['PayeeSfx'])
-
-    # PayeeAddr1
-    data['PayeeAddr1'] = clean_sql_text(data['PayeeAddr1'])
-
-    # PayeeAddr2
-    data['PayeeAddr2'] = clean_sql_text(data['PayeeAddr2'])
-
-    # PayeeCity
-    data['PayeeCity'] = clean_sql_text(data['PayeeCity'])
-
-    # PayeeStAbbr
-    data['PayeeStAbbr'] = clean_sql_text(data['PayeeStAbbr'])
-
-    # PayeeZip
-    data['PayeeZip'] = clean_sql_text(data['PayeeZip'])
-
-    # EventNm
-    data['EventNm'] = clean_sql_text(data['EventNm'])
-
-    # ExpDt
-    data['ExpDt'] = convert_to_date(data['ExpDt'], dateformat, image, 'ExpDt', data['LineNbr'], rownbr, 'H6',
-                                    data['TransID'])
-
-    # TotExpAmt
-    data['TotExpAmt'] = ck_curr_val(data['TotExpAmt'], image, 'TotExpAmt', data['LineNbr'], rownbr)
-
-    # FedAmt
-    data['FedAmt'] = ck_curr_val(data['FedAmt'], image, 'FedAmt', data['LineNbr'], rownbr)
-
-    # LevinAmt
-    data['LevinAmt'] = ck_curr_val(data['LevinAmt'], image, 'LevinAmt', data['LineNbr'], rownbr)
-
-    # ExpAgg
-    data['ExpAgg'] = ck_curr_val(data['ExpAgg'], image, 'ExpAgg', data['LineNbr'], rownbr)
-
-    # ExpPurpCd
-    data['ExpPurpCd'] = clean_sql_text(data['ExpPurpCd'])
-
-    # ExpPurpDesc
-    data['ExpPurpDesc'] = clean_sql_text(data['ExpPurpDesc'])
-
-    # ExpCatCd
-    data['ExpCatCd'] = clean_sql_text(data['ExpCatCd'])
-
-    # flgActVotRegn
-    data['flgActVotRegn'] = convert_to_bit(clean_sql_text(data['flgActVotRegn']))
-
-    # flgActGOTV
-    data['flgActGOTV'] = convert_to_bit(clean_sql_text(data['flgActGOTV']))
-
-    # flgActVotID
-    data['flgActVotID'] = convert_to_bit(clean_sql_text(data['flgActVotID']))
-
-    # flgActGenCamp
-    data['flgActGenCamp'] = convert_to_bit(clean_sql_text(data['flgActGenCamp']))
-
-    # MemoCd
-    data['MemoCd'] = convert_to_bit(clean_sql_text(data['MemoCd']))
-
-    # MemoTxt
-    data['MemoTxt'] = clean_sql_text(data['MemoTxt'])
-
-    return data
-
-
-def check_row_data_sch_i(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # RecIDNbr
-    data['RecIDNbr'] = clean_sql_text(data['RecIDNbr'])
-
-    # AcctNm
-    data['AcctNm'] = clean_sql_text(data['AcctNm'])
-
-    # BankAcctID
-    data['BankAcctID'] = clean_sql_text(data['BankAcctID'])
-
-    # CovgFmDt
-    data['CovgFmDt'] = convert_to_date(data['CovgFmDt'], dateformat, image, 'CovgFmDt', data['LineNbr'], rownbr, 'SI',
-                                       data['TransID'])
-
-    # CovgToDt
-    data['CovgToDt'] = convert_to_date(data['CovgToDt'], dateformat, image, 'CovgToDt', data['LineNbr'], rownbr, 'SI',
-                                       data['TransID'])
-
-    # TotRcpts
-    data['TotRcpts'] = ck_curr_val(data['TotRcpts'], image, 'TotRcpts', data['LineNbr'], rownbr)
-
-    # TransToFed
-    data['TransToFed'] = ck_curr_val(data['TransToFed'], image, 'TransToFed', data['LineNbr'], rownbr)
-
-    # TransToStAndLoc
-    data['TransToStAndLoc'] = ck_curr_val(data['TransToStAndLoc'], image, 'TransToStAndLoc', data['LineNbr'], rownbr)
-
-    # DirStLocCandSup
-    data['DirStLocCandSup'] = ck_curr_val(data['DirStLocCandSup'], image, 'DirStLocCandSup', data['LineNbr'], rownbr)
-
-    # OthDisb
-    data['OthDisb'] = ck_curr_val(data['OthDisb'], image, 'OthDisb', data['LineNbr'], rownbr)
-
-    # TotDisb
-    data['TotDisb'] = ck_curr_val(data['TotDisb'], image, 'TotDisb', data['LineNbr'], rownbr)
-
-    # BegCOH
-    data['BegCOH'] = ck_curr_val(data['BegCOH'], image, 'BegCOH', data['LineNbr'], rownbr)
-
-    # Rcpts
-    data['Rcpts'] = ck_curr_val(data['Rcpts'], image, 'Rcpts', data['LineNbr'], rownbr)
-
-    # Subtotal
-    data['Subtotal'] = ck_curr_val(data['Subtotal'], image, 'Subtotal', data['LineNbr'], rownbr)
-
-    # Disb
-    data['Disb'] = ck_curr_val(data['Disb'], image, 'Disb', data['LineNbr'], rownbr)
-
-    # EndCOH
-    data['EndCOH'] = ck_curr_val(data['EndCOH'], image, 'EndCOH', data['LineNbr'], rownbr)
-
-    # TotRcpts2
-    data['TotRcpts2'] = ck_curr_val(data['TotRcpts2'], image, 'TotRcpts2', data['LineNbr'], rownbr)
-
-    # TransToFed2
-    data['TransToFed2'] = ck_curr_val(data['TransToFed2'], image, 'TransToFed2', data['LineNbr'], rownbr)
-
-    # TransToStAndLoc2
-    data['TransToStAndLoc2'] = ck_curr_val(data['TransToStAndLoc2'], image, 'TransToStAndLoc2', data['LineNbr'], rownbr)
-
-    # DirStLocCandSup2
-    data['DirStLocCandSup2'] = ck_curr_val(data['DirStLocCandSup2'], image, 'DirStLocCandSup2', data['LineNbr'], rownbr)
-
-    # OthDisb2
-    data['OthDisb2'] = ck_curr_val(data['OthDisb2'], image, 'OthDisb2', data['LineNbr'], rownbr)
-
-    # TotDisb2
-    data['TotDisb2'] = ck_curr_val(data['TotDisb2'], image, 'TotDisb2', data['LineNbr'], rownbr)
-
-    # BegCOH
-    data['BegCOH2'] = ck_curr_val(data['BegCOH2'], image, 'BegCOH2', data['LineNbr'], rownbr)
-
-    # Rcpts2
-    data['Rcpts2'] = ck_curr_val(data['Rcpts2'], image, 'Rcpts2', data['LineNbr'], rownbr)
-
-    # Subtotal2
-    data['Subtotal2'] = ck_curr_val(data['Subtotal2'], image, 'Subtotal2', data['LineNbr'], rownbr)
-
-    # Disb2
-    data['Disb2'] = ck_curr_val(data['Disb2'], image, 'Disb2', data['LineNbr'], rownbr)
-
-    # EndCOH2
-    data['EndCOH2'] = ck_curr_val(data['EndCOH2'], image, 'EndCOH2', data['LineNbr'], rownbr)
-
-    return data
-
-
-def check_row_data_sch_l(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # RecordID
-    data['RecordID'] = clean_sql_text(data['RecordID'])
-
-    # AcctNm
-    data['AcctNm'] = clean_sql_text(data['AcctNm'])
-
-    # CovgFmDt
-    data['CovgFmDt'] = convert_to_date(data['CovgFmDt'], dateformat, image, 'CovgFmDt', data['LineNbr'], rownbr, 'SL',
-                                       data['TransID'])
-
-    # CovgToDt
-    data['CovgToDt'] = convert_to_date(data['CovgToDt'], dateformat, image, 'CovgToDt', data['LineNbr'], rownbr, 'SL',
-                                       data['TransID'])
-
-    # IndRcptsItem_P
-    data['IndRcptsItem_P'] = ck_curr_val(data['IndRcptsItem_P'], image, 'IndRcptsItem_P', data['LineNbr'], 0)
-
-    # IndRcptsUnitem_P
-    data['IndRcptsUnitem_P'] = ck_curr_val(data['IndRcptsUnitem_P'], image, 'IndRcptsUnitem_P', data['LineNbr'], 0)
-
-    # IndRcptsTot_P
-    data['IndRcptsTot_P'] = ck_curr_val(data['IndRcptsTot_P'], image, 'IndRcptsTot_P', data['LineNbr'], 0)
-
-    # OthRcpts_P
-    data['OthRcpts_P'] = ck_curr_val(data['OthRcpts_P'], image, 'OthRcpts_P', data['LineNbr'], 0)
-
-    # TotRcpts_P
-    data['TotRcpts_P'] = ck_curr_val(data['TotRcpts_P'], image, 'TotRcpts_P', data['LineNbr'], 0)
-
-    # TransVotReg_P
-    data['TransVotReg_P'] = ck_curr_val(data['TransVotReg_P'], image, 'TransVotReg_P', data['LineNbr'], 0)
-
-    # TransVotID_P
-    data['TransVotID_P'] = ck_curr_val(data['TransVotID_P'], image, 'TransVotID_P', data['LineNbr'], 0)
-
-    # TransGOTV_P
-    data['TransGOTV_P'] = ck_curr_val(data['TransGOTV_P'], image, 'TransGOTV_P', data['LineNbr'], 0)
-
-    # TransGenCamp_P
-    data['TransGenCamp_P'] = ck_curr_val(data['TransGenCamp_P'], image, 'TransGenCamp_P', data['LineNbr'], 0)
-
-    # TransTot_P
-    data['TransTot_P'] = ck_curr_val(data['TransTot_P'], image, 'TransTot_P', data['LineNbr'], 0)
-
-    # OthDisb_P
-    data['OthDisb_P'] = ck_curr_val(data['OthDisb_P'], image, 'OthDisb_P', data['LineNbr'], 0)
-
-    # TotDisb_P
-    data['TotDisb_P'] = ck_curr_val(data['TotDisb_P'], image, 'TotDisb_P', data['LineNbr'], 0)
-
-    # BegCOH_P
-    data['BegCOH_P'] = ck_curr_val(data['BegCOH_P'], image, 'BegCOH_P', data['LineNbr'], 0)
-
-    # Rcpts_P
-    data['Rcpts_P'] = ck_curr_val(data['Rcpts_P'], image, 'Rcpts_P', data['LineNbr'], 0)
-
-    # Subtotal_P
-    data['Subtotal_P'] = ck_curr_val(data['Subtotal_P'], image, 'Subtotal_P', data['LineNbr'], 0)
-
-    # Disb_P
-    data['Disb_P'] = ck_curr_val(data['Disb_P'], image, 'Disb_P', data['LineNbr'], 0)
-
-    # EndCOH_P
-    data['EndCOH_P'] = ck_curr_val(data['EndCOH_P'], image, 'EndCOH_P', data['LineNbr'], 0)
-
-    # IndRcptsItem_T
-    data['IndRcptsItem_T'] = ck_curr_val(data['IndRcptsItem_T'], image, 'IndRcptsItem_T', data['LineNbr'], 0)
-
-    # IndRcptsUnitem_T
-    data['IndRcptsUnitem_T'] = ck_curr_val(data['IndRcptsUnitem_T'], image, 'IndRcptsUnitem_T', data['LineNbr'], 0)
-
-    # IndRcptsTot_T
-    data['IndRcptsTot_T'] = ck_curr_val(data['IndRcptsTot_T'], image, 'IndRcptsTot_T', data['LineNbr'], 0)
-
-    # OthRcpts_T
-    data['OthRcpts_T'] = ck_curr_val(data['OthRcpts_T'], image, 'OthRcpts_T', data['LineNbr'], 0)
-
-    # TotRcpts_T
-    data['TotRcpts_T'] = ck_curr_val(data['TotRcpts_T'], image, 'TotRcpts_T', data['LineNbr'], 0)
-
-    # TransVotReg_T
-    data['TransVotReg_T'] = ck_curr_val(data['TransVotReg_T'], image, 'TransVotReg_T', data['LineNbr'], 0)
-
-    # TransVotID_T
-    data['TransVotID_T'] = ck_curr_val(data['TransVotID_T'], image, 'TransVotID_T', data['LineNbr'], 0)
-
-    # TransGOTV_T
-    data['TransGOTV_T'] = ck_curr_val(data['TransGOTV_T'], image, 'TransGOTV_T', data['LineNbr'], 0)
-
-    # TransGenCamp_T
-    data['TransGenCamp_T'] = ck_curr_val(data['TransGenCamp_T'], image, 'TransGenCamp_T', data['LineNbr'], 0)
-
-    # TransTot_T
-    data['TransTot_T'] = ck_curr_val(data['TransTot_T'], image, 'TransTot_T', data['LineNbr'], 0)
-
-    # OthDisb_T
-    data['OthDisb_T'] = ck_curr_val(data['OthDisb_T'], image, 'OthDisb_T', data['LineNbr'], 0)
-
-    # TotDisb_T
-    data['TotDisb_T'] = ck_curr_val(data['TotDisb_T'], image, 'TotDisb_T', data['LineNbr'], 0)
-
-    # BegCOH_T
-    data['BegCOH_T'] = ck_curr_val(data['BegCOH_T'], image, 'BegCOH_T', data['LineNbr'], 0)
-
-    # Rcpts_T
-    data['Rcpts_T'] = ck_curr_val(data['Rcpts_T'], image, 'Rcpts_T', data['LineNbr'], 0)
-
-    # Subtotal_T
-    data['Subtotal_T'] = ck_curr_val(data['Subtotal_T'], image, 'Subtotal_T', data['LineNbr'], 0)
-
-    # Disb_T
-    data['Disb_T'] = ck_curr_val(data['Disb_T'], image, 'Disb_T', data['LineNbr'], 0)
-
-    # EndCOH_T'
-    data['EndCOH_T'] = ck_curr_val(data['EndCOH_T'], image, 'EndCOH_T', data['LineNbr'], 0)
-
-    return data
-
-
-def check_row_data_text(data, image, rownbr, namedelim='', dateformat='CCYYMMDD'):
-    # LineNbr
-    data['LineNbr'] = clean_sql_text(data['LineNbr'])
-
-    # CommID
-    data['CommID'] = clean_sql_text(data['CommID'])
-
-    # TransID
-    data['TransID'] = clean_sql_text(data['TransID'])
-
-    # BkRefTransID
-    data['BkRefTransID'] = clean_sql_text(data['BkRefTransID'])
-
-    # BkRefSchdNm
-    data['BkRefSchdNm'] = clean_sql_text(data['BkRefSchdNm'])
-
-    # FullText
-    data['FullText'] = clean_sql_text(data['FullText'])
-
-    return data
-
-
-##############################################
-
-
-
-# Built list of supported report types
-rpttypes = build_list_of_supported_report_types()
-
-# Create timestamp to append to output files
-filestamp = create_file_timestamp()
-
-# Build files to house data output
-otherdatafile = RPTOUTDIR + 'OtherData_' + filestamp + '.txt'
-schedafile = RPTOUTDIR + 'SchedA_' + filestamp + '.txt'
-schedbfile = RPTOUTDIR + 'SchedB_' + filestamp + '.txt'
-schedcfile = RPTOUTDIR + 'SchedC_' + filestamp + '.txt'
-schedc1file = RPTOUTDIR + 'SchedC1_' + filestamp + '.txt'
-schedc2file = RPTOUTDIR + 'SchedC2_' + filestamp + '.txt'
-scheddfile = RPTOUTDIR + 'SchedD_' + filestamp + '.txt'
-schedefile = RPTOUTDIR + 'SchedE_' + filestamp + '.txt'
-schedffile = RPTOUTDIR + 'SchedF_' + filestamp + '.txt'
-schedh1file = RPTOUTDIR + 'SchedH1_' + filestamp + '.txt'
-schedh2file = RPTOUTDIR + 'SchedH2_' + filestamp + '.txt'
-schedh3file = RPTOUTDIR + 'SchedH3_' + filestamp + '.txt'
-schedh4file = RPTOUTDIR + 'SchedH4_' + filestamp + '.txt'
-schedh5file = RPTOUTDIR + 'SchedH5_' + filestamp + '.txt'
-schedh6file = RPTOUTDIR + 'SchedH6_' + filestamp + '.txt'
-schedifile = RPTOUTDIR + 'SchedI_' + filestamp + '.txt'
-schedlfile = RPTOUTDIR + 'SchedL_' + filestamp + '.txt'
-textfile = RPTOUTDIR + 'Text_' + filestamp + '.txt'
-f1sfile = RPTOUTDIR + 'F1S_' + filestamp + '.txt'
-
-# Write headers to data output files
-with open(schedafile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SA'])) + '\r')
-
-with open(schedbfile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SB'])) + '\r')
-
-with open(schedcfile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SC'])) + '\r')
-
-with open(schedc1file, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SC1'])) + '\r')
-
-with open(schedc2file, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SC2'])) + '\r')
-
-with open(scheddfile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SD'])) + '\r')
-
-with open(schedefile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SE'])) + '\r')
-
-with open(schedffile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SF'])) + '\r')
-
-with open(schedh1file, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['H1'])) + '\r')
-
-with open(schedh2file, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['H2'])) + '\r')
-
-with open(schedh3file, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['H3'])) + '\r')
-
-with open(schedh4file, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['H4'])) + '\r')
-
-with open(schedh5file, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['H5'])) + '\r')
-
-with open(schedh6file, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['H6'])) + '\r')
-
-with open(schedifile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SI'])) + '\r')
-
-with open(schedlfile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['SL'])) + '\r')
-
-with open(textfile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + 'PrtTp' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(
-        map(str, outputhdrs['TEXT'])) + '\r')
-
-with open(f1sfile, 'w') as outputfile:
-    outputfile.write('ImageID' + OUTPUTDELIMITER + OUTPUTDELIMITER.join(map(str, outputhdrs['F1S'])) + '\r')
-
-# Append full name fields to output headers
-outputhdrs['SA'].append('ContFullName')
-outputhdrs['SA'].append('DonorCandFullName')
-outputhdrs['SB'].append('PayeeFullName')
-outputhdrs['SB'].append('BenCandFullName')
-outputhdrs['SC'].append('LenderFullName')
-outputhdrs['SC'].append('LenderCandFullName')
-outputhdrs['SC1'].append('LendRepFullName')
-outputhdrs['SC1'].append('TrsFullName')
-outputhdrs['SC2'].append('GuarFullName')
-outputhdrs['SE'].append('PayeeFullName')
-outputhdrs['SE'].append('SupOppCandFullName')
-outputhdrs['SE'].append('CompFullName')
-outputhdrs['SF'].append('PayeeFullName')
-outputhdrs['SF'].append('PayeeCandFullName')
-outputhdrs['H4'].append('PayeeFullName')
-outputhdrs['H6'].append('PayeeFullName')
-outputhdrs['F1S'].append('AgtFullName')
-
-# Iterate through each file
-for fecfile in glob.glob(os.path.join(RPTSVDIR, '*.fec')):
-
-    # Iterate counter and break at desired file count
-    filectr += 1
-    if filectr > FILELIMIT:
-        break
-
-    # Store ImageID in variable
-    imageid = int(fecfile.replace(RPTSVDIR, '').replace('.fec', ''))
-
-    # Move file to hold directory if it's a known bad file
-    if imageid in BADREPORTS:
-        os.rename(fecfile, fecfile.replace(RPTSVDIR, RPTHOLDDIR))
-        continue
-
-    # Extract file header
-    filehdr = linecache.getline(fecfile, 1)
-
-    # Headers in versions 1 and 2 are multiple lines
-    # If first line contains /* Header, it's an old style header
-    x = 2
-    if filehdr.lower().find('/* header') != -1:
-        filehdr = filehdr.replace('/* Header', '').replace('/* header', '').replace('/* HEADER', '').strip()
-        flg = 0
-        while flg == 0:
-            y = linecache.getline(fecfile, x)
-            if y.lower().find('/* end header') == -1:
-                filehdr = filehdr + '\n' + y.strip()
-            else:
-                flg = 1
-            x += 1
-
-    # Extract report header
-    rpthdr = linecache.getline(fecfile, x)
-
-    # Clear linecache
-    linecache.clearcache()
-
-    # Change file delimiter to commas if ASCII-28 not found in report header
-    if not SRCDELIMITER in rpthdr:
-        SRCDELIMITER = ','
-
-    # Extract report type from report header
-    fullrpttype = rpthdr[:rpthdr.find(SRCDELIMITER)].lstrip(' "').rstrip(' "')
-    rpttype = fullrpttype.rstrip('ANT')
-
-    # If report type not supported, move file to Hold directory
-    # and proceed to next file; otherwise retrieve header version
-    if rpttype not in rpttypes:
-        os.rename(fecfile, fecfile.replace(RPTSVDIR, RPTHOLDDIR))
-        continue
-    else:
-        hdrver = ''
-        if filehdr.lower().find('fec_ver_#') != -1:  # FEC_VER_#, FEC_Ver_#
-            hdrver = filehdr[filehdr.lower().find('fec_ver_#') + 9:].lstrip(' =')
-            hdrver = float(hdrver[:hdrver.find('\n')].strip(' "'))
-        else:
-            hdrver = float(filehdr.split(SRCDELIMITER)[2].strip(' "'))
-
-    # Now that we know the form type and header version, we are going
-    # to build the header data row to insert into the database.
-
-    # First, fetch file headers. Custom code needed for versions 1 and 2.
-    filehdrdata = {'ImageID': imageid,
-                   'RecType': 'HDR',
-                   'EFType': 'FEC',
-                   'Ver': hdrver,
-                   'SftNm': '',
-                   'SftVer': '',
-                   'RptID': '',
-                   'RptNbr': '0',
-                   'HdrCmnt': '',
-                   'NmDelim': '',
-                   'DecNoDec': 'DEC',
-                   'DtFmt': 'CCYYMMDD'}
-
-    if hdrver < 3.0:
-        # Custom code for multiline headers (versions 1 and 2)
-        # Set default name delimiter to ^
-        filehdrdata['NmDelim'] = '^'
-        filehdr = filehdr.split('\n')
-        for hdr in filehdr:
-            line = hdr.strip()
-            if line.lower().startswith('soft_name'):
-                filehdrdata['SftNm'] = line[line.find('=') + 1:].strip(' "')
-            elif line.lower().startswith('soft_ver'):
-                filehdrdata['SftVer'] = line[line.find('=') + 1:].strip(' "')
-            elif line.lower().startswith('control'):
-                filehdrdata['RptID'] = line[line.find('=') + 1:].strip(' "')
-            elif line.lower().startswith('namedelim'):
-                filehdrdata['NmDelim'] = line[line.find('=') + 1:].strip(' "')
-            elif line.lower().startswith('dec/nodec'):
-                filehdrdata['DecNoDec'] = line[line.find('=') + 1:].strip(' "')
-            elif line.lower().startswith('date_fmat'):
-                filehdrdata['DtFmt'] = line[line.find('=') + 1:].strip(' "')
-            elif line.lower().find('comment') != -1:
-                filehdrdata['HdrCmnt'] = line[line.find('=') + 1:].strip(' "')
-
-    else:
-        rowhdrs = get_row_headers('Hdr', hdrver)
-
-        # Parse file header row
-        filehdr = parse_data_row(filehdr, SRCDELIMITER)
-
-        # Iterate through file header row and populate header dictionary
-        for x in range(len(rowhdrs)):
-            if rowhdrs[x] in list(filehdrdata.keys()) and x < len(
-                    filehdr):  # Checking len because sometimes header comment omitted
-                filehdrdata[rowhdrs[x]] = filehdr[x].strip().replace(OUTPUTDELIMITER, ' ').strip(' "\n')
-
-    # First, change hdrver to int when < 4
-    if hdrver < 4:
-        hdrver = int(hdrver)
-
-    # Get output headers
-    rpthdrdata = {}
-    for hdr in outputhdrs[rpttype]:
-        rpthdrdata[hdr] = ''
-
-    # Get headers for report header row
-    rowhdrs = get_row_headers(rpttype, hdrver)
-
-    # Parse report header row
-    rpthdr = parse_data_row(rpthdr, SRCDELIMITER)
-
-    # Iterate through report header row and populate report header dictionary
-    for x in range(len(rowhdrs)):
-        if rowhdrs[x] in list(rpthdrdata.keys()) and x < len(
-                rpthdr):  # 100235 (F3X, v5.0) missing last 12 cols after treas sign date
-            rpthdrdata[rowhdrs[x]] = rpthdr[x].strip().replace(OUTPUTDELIMITER, ' ').strip(' "\n')
-
-    # Attempt to determine name delimiter if missing
-    if filehdrdata['NmDelim'] == '':
-        if 'TrsFullName' in list(rpthdrdata.keys()):
-            if rpthdrdata['TrsFullName'].find('^') != -1:
-                filehdrdata['NmDelim'] = '^'
-            elif rpthdrdata['TrsFullName'].find(',') != -1:
-                filehdrdata['NmDelim'] = ','
-
-    # Call function to verify data is valid, then load into database
-    sqlresult = 0
-    if rpttype == 'F3':
-        rpthdrdata = check_rpt_hdrs_f3(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
-        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
-    elif rpttype == 'F3L':
-        rpthdrdata = check_rpt_hdrs_f3l(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
-        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
-    elif rpttype == 'F3P':
-        rpthdrdata = check_rpt_hdrs_f3p(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
-        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
-    elif rpttype == 'F3X':
-        rpthdrdata = check_rpt_hdrs_f3x(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
-        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
-    elif rpttype == 'F1':
-        rpthdrdata = check_rpt_hdrs_f1(imageid, rpthdrdata, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
-        sqlresult = load_rpt_hdrs(rpttype, imageid, rpthdrdata, filehdrdata, outputhdrs[rpttype], DBCONNSTR)
-
-    # On error, move file to Review directory
-    if sqlresult == -1:
-        shutil.move(fecfile, fecfile.replace(RPTSVDIR, RPTRVWDIR))
-        continue
-    elif sqlresult == -2:
-        shutil.move(fecfile, fecfile.replace(RPTSVDIR, RPTRVWDIR))
-        continue
-
-    # ITERATE OVER DATA ROWS
-    # ----------------------
-    # Because some headers are multiple lines, create a flag to look for
-    # the report header and ignore all rows before finding a line that
-    # begins with the report type.
-    with open(fecfile, 'r', encoding='ascii') as datafile:
-        # Create header flag and lists to house output data
-        hdrflg = 0
-        otherdata = []
-        scheda = []
-        schedb = []
-        schedc = []
-        schedc1 = []
-        schedc2 = []
-        schedd = []
-        schede = []
-        schedf = []
-        schedh1 = []
-        schedh2 = []
-        schedh3 = []
-        schedh4 = []
-        schedh5 = []
-        schedh6 = []
-        schedi = []
-        schedl = []
-        text = []
-        f1s = []
-
-        # Iterate through the file
-        linenbr = 0
-        for line in datafile:
-            linenbr += 1
-            # Skip blank lines
-            if line.strip() == '':
-                continue
-
-            # Create list to house this line's data
-            data = []
-
-            # Do some basic whitespace cleanup
-            # If OUTPUTDELIMITER is tab, change all tabs and newlines to spaces
-            if OUTPUTDELIMITER == '\t':
-                line = line.expandtabs(1).replace('\r', ' ').strip()
-
-            # Remove all instances of two spaces
-            while '  ' in line:
-                line = line.replace('  ', ' ')
-
-            # Convert line to list
-            data = parse_data_row(line, SRCDELIMITER)
-
-            # If hdrflag == 0, see if this is header line; if not, continue
-            if hdrflg == 0:
-                if data[0] == rpthdrdata['FormTp'].strip(" '"):
-                    hdrflg = 1
-                continue
-
-            # This is a data row. Determine row's form type.
-            # Additional coding is necessary for Text, the three types
-            # of Schedule C forms and the six types of Schedule H forms.
-            formtype = ''
-            if data[0].startswith('SC1'):
-                formtype = 'SC1'
-            elif data[0].startswith('SC2'):
-                formtype = 'SC2'
-            elif data[0].startswith('SC'):
-                formtype = 'SC'
-            elif data[0].startswith('H1'):
-                formtype = 'H1'
-            elif data[0].startswith('H2'):
-                formtype = 'H2'
-            elif data[0].startswith('H3'):
-                formtype = 'H3'
-            elif data[0].startswith('H4'):
-                formtype = 'H4'
-            elif data[0].startswith('H5'):
-                formtype = 'H5'
-            elif data[0].startswith('H6'):
-                formtype = 'H6'
-            elif data[0].lower() == 'text':  # Sometimes not ALLCAPS
-                formtype = 'TEXT'
-            elif data[0].startswith('F1S'):
-                formtype = 'F1S'
-            else:
-                for key in list(outputhdrs.keys()):
-                    if data[0].startswith(key):
-                        formtype = key
-                        continue
-
-            # Write the row to the other data file if row's form type not found
-            # and skip to next line
-            if formtype == '':
-                otherdata.append(str(imageid) + OUTPUTDELIMITER + str(hdrver) + OUTPUTDELIMITER + 'line: ' + str(
-                    linenbr) + OUTPUTDELIMITER + line + '\r')
-                continue
-
-            # Make local copy of output headers
-            linehdrs = outputhdrs[formtype][:]
-
-            # Build output dictionary to house data
-            linedata = {}
-            for hdr in linehdrs:
-                linedata[hdr] = ''
-
-            # Get headers for data row
-            rowhdrs = get_row_headers(formtype, hdrver)
-
-            # Write the row to the other data file if no headers found
-            if rowhdrs == []:
-                otherdata.append(str(imageid) + OUTPUTDELIMITER + str(hdrver) + OUTPUTDELIMITER + 'line: ' + str(
-                    linenbr) + OUTPUTDELIMITER + line + '\r')
-                continue
-
-            # Populate data row dictionary
-            linedata = populate_data_row_dict(data, rowhdrs, linedata)
-
-            # Call function to verify data is valid before loading into database
-            if formtype == 'SA':
-                # Validate data
-                linedata = check_row_data_sch_a(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('ContFullName')
-                linehdrs.remove('DonorCandFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                scheda.append(data)
-            elif formtype == 'SB':
-                # Validate data
-                linedata = check_row_data_sch_b(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('PayeeFullName')
-                linehdrs.remove('BenCandFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedb.append(data)
-            elif formtype == 'SC':
-                # Validate data
-                linedata = check_row_data_sch_c(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('LenderFullName')
-                linehdrs.remove('LenderCandFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedc.append(data)
-            elif formtype == 'SC1':
-                # Validate data
-                linedata = check_row_data_sch_c1(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                 filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('LendRepFullName')
-                linehdrs.remove('TrsFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedc1.append(data)
-            elif formtype == 'SC2':
-                linedata = check_row_data_sch_c2(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                 filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('GuarFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedc2.append(data)
-            elif formtype == 'SD':
-                # No full name fields in data dictionary
-                # Validate data
-                linedata = check_row_data_sch_d(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                filehdrdata['DtFmt'])
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedd.append(data)
-            elif formtype == 'SE':
-                # Validate data
-                linedata = check_row_data_sch_e(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('PayeeFullName')
-                linehdrs.remove('SupOppCandFullName')
-                linehdrs.remove('CompFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schede.append(data)
-            elif formtype == 'SF':
-                # Validate data
-                linedata = check_row_data_sch_f(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('PayeeFullName')
-                linehdrs.remove('PayeeCandFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedf.append(data)
-            elif formtype == 'H1':
-                # No full name fields in data dictionary
-                # Validate data
-                linedata = check_row_data_sch_h1(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                 filehdrdata['DtFmt'])
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedh1.append(data)
-            elif formtype == 'H2':
-                # No full name fields in data dictionary
-                # Validate data
-                linedata = check_row_data_sch_h2(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                 filehdrdata['DtFmt'])
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedh2.append(data)
-            elif formtype == 'H3':
-                # No full name fields in data dictionary
-                # Validate data
-                linedata = check_row_data_sch_h3(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                 filehdrdata['DtFmt'])
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedh3.append(data)
-            elif formtype == 'H4':
-                # Validate data
-                linedata = check_row_data_sch_h4(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                 filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('PayeeFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedh4.append(data)
-            elif formtype == 'H5':
-                # No full name fields in data dictionary
-                # Validate data
-                linedata = check_row_data_sch_h5(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                 filehdrdata['DtFmt'])
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedh5.append(data)
-            elif formtype == 'H6':
-                # Validate data
-                linedata = check_row_data_sch_h6(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                 filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('PayeeFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedh6.append(data)
-            elif formtype == 'SI':
-                # No full name fields in data dictionary
-                # Validate data
-                linedata = check_row_data_sch_i(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                filehdrdata['DtFmt'])
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedi.append(data)
-            elif formtype == 'SL':
-                # No full name fields in data dictionary
-                # Validate data
-                linedata = check_row_data_sch_l(linedata, imageid, linenbr, filehdrdata['NmDelim'],
-                                                filehdrdata['DtFmt'])
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                schedl.append(data)
-            elif formtype == 'TEXT':
-                # No full name fields in data dictionary
-                # Validate data
-                linedata = check_row_data_text(linedata, imageid, linenbr, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, fullrpttype)
-                text.append(data)
-            elif formtype == 'F1S':
-                # Validate data
-                linedata = check_row_data_f1s(linedata, imageid, linenbr, filehdrdata['NmDelim'], filehdrdata['DtFmt'])
-                # Remove full name fields
-                linehdrs.remove('AgtFullName')
-                # Create list for the data row
-                data = build_data_row(linedata, linehdrs, imageid, None)
-                f1s.append(data)
-
-        # Write data to files
-        if len(otherdata) > 0:
-            with open(otherdatafile, 'a') as outputfile:
-                for row in otherdata:
-                    outputfile.write(row)
-
-        if len(scheda) > 0:
-            with open(schedafile, 'a') as outputfile:
-                for row in scheda:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedb) > 0:
-            with open(schedbfile, 'a') as outputfile:
-                for row in schedb:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedc) > 0:
-            with open(schedcfile, 'a') as outputfile:
-                for row in schedc:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedc1) > 0:
-            with open(schedc1file, 'a') as outputfile:
-                for row in schedc1:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedc2) > 0:
-            with open(schedc2file, 'a') as outputfile:
-                for row in schedc2:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedd) > 0:
-            with open(scheddfile, 'a') as outputfile:
-                for row in schedd:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schede) > 0:
-            with open(schedefile, 'a') as outputfile:
-                for row in schede:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedf) > 0:
-            with open(schedffile, 'a') as outputfile:
-                for row in schedf:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedh1) > 0:
-            with open(schedh1file, 'a') as outputfile:
-                for row in schedh1:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedh2) > 0:
-            with open(schedh2file, 'a') as outputfile:
-                for row in schedh2:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedh3) > 0:
-            with open(schedh3file, 'a') as outputfile:
-                for row in schedh3:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedh4) > 0:
-            with open(schedh4file, 'a') as outputfile:
-                for row in schedh4:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedh5) > 0:
-            with open(schedh5file, 'a') as outputfile:
-                for row in schedh5:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedh6) > 0:
-            with open(schedh6file, 'a') as outputfile:
-                for row in schedh6:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedi) > 0:
-            with open(schedifile, 'a') as outputfile:
-                for row in schedi:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(schedl) > 0:
-            with open(schedlfile, 'a') as outputfile:
-                for row in schedl:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(text) > 0:
-            with open(textfile, 'a') as outputfile:
-                for row in text:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-        if len(f1s) > 0:
-            with open(f1sfile, 'a') as outputfile:
-                for row in f1s:
-                    outputfile.write(OUTPUTDELIMITER.join(map(str, row)) + '\r')
-
-    # Move the file to the processed directory
-    shutil.move(fecfile, fecfile.replace(RPTSVDIR, RPTPROCDIR))
-    continue
-
-# Run stored procedure to deactivate overlapping reports
-# not covered by database triggers
-try:
-    sql = 'EXEC dbo.usp_DeactivateOverlappingReports'
-
-    # Create SQL Server connection
-    conn = pyodbc.connect(DBCONNSTR)
-    cursor = conn.cursor()
-
-    # Excecute stored procedure
-    cursor.execute(sql)
-    conn.commit()
-    conn.close()
-except:
-    pass
+        # Excecute stored procedure
+        cursor.execute(sql)
+        conn.commit()
+        conn.close()
+    except:
+        pass
@@ -0,0 +1,125 @@
+import os
+import re
+import subprocess
+import sys
+
+REPODIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPODIR)
+
+import parse_reports
+
+# Runs parse_reports from the current directory, which houses the
+# usersettings.py written by make_report_dirs. When crashafter is set,
+# the process is killed once that many child rows have been parsed, as
+# though the machine went down in the middle of a report. The rows
+# written so far are flushed first, so the partial report is on disk.
+DRIVER = '''
+import gc, os, sys
+sys.path.append({repodir!r})
+sys.argv = ['parse_reports.py'] + {args!r}
+import parse_reports
+if {crashafter!r} is not None:
+    get_row_handler = parse_reports.get_row_handler
+    calls = [0]
+    def crash(*args):
+        calls[0] += 1
+        if calls[0] > {crashafter!r}:
+            for obj in gc.get_objects():
+                if isinstance(obj, parse_reports.OutputWriter):
+                    for handle in obj.handles.values():
+                        handle.flush()
+            os._exit(9)
+        return get_row_handler(*args)
+    parse_reports.get_row_handler = crash
+source = open(parse_reports.__file__).read()
+main = source[source.index("if __name__ == '__main__':"):]
+parse_reports.__name__ = '__main__'
+exec(compile(main, parse_reports.__file__, 'exec'), vars(parse_reports))
+'''
+
+
+def get_file_hdrs(formtype, ver='8.0'):
+    # Returns the columns of a row type from filehdrs
+    for hdr in parse_reports.filehdrs:
+        if hdr[0] == formtype:
+            for vers, columns in hdr[1]:
+                if ver in vers:
+                    return columns
+
+
+def build_row(formtype, lineid, transid, blanks=()):
+    # Builds a line of a report with valid dates and amounts. The columns
+    # in blanks are left empty. Other columns hold placeholders, some of
+    # which the parser writes to the error logs.
+    values = []
+    for column in get_file_hdrs(formtype):
+        if column in blanks:
+            values.append('')
+        elif column.endswith('Dt'):
+            values.append('20120315')
+        elif 'Amt' in column or 'Agg' in column or '_P_' in column or '_T_' in column:
+            values.append('%d.%02d' % (transid, transid % 100))
+        elif column == 'CommID':
+            values.append('C00000001')
+        elif column == 'TransID':
+            values.append('T%d' % transid)
+        else:
+            values.append('x')
+    values[0] = lineid
+    return chr(28).join(values)
+
+
+def make_report_dirs(workdir, reports=6, rows=60):
+    # Creates the directories used by parse_reports in workdir, along
+    # with a usersettings.py pointing to them, and writes a number of
+    # F3X reports to RPTSVDIR
+    dirs = {}
+    for name in ['arcproc', 'arcsv', 'err', 'hold', 'master', 'out', 'proc', 'rvw', 'imp']:
+        dirs[name] = os.path.join(str(workdir), name, '')
+        os.makedirs(dirs[name], exist_ok=True)
+    with open(os.path.join(str(workdir), 'usersettings.py'), 'w') as f:
+        for var, name in [('ARCPROCDIR', 'arcproc'), ('ARCSVDIR', 'arcsv'), ('MASTERDIR', 'master'),
+                          ('RPTERRDIR', 'err'), ('RPTHOLDDIR', 'hold'), ('RPTOUTDIR', 'out'),
+                          ('RPTPROCDIR', 'proc'), ('RPTRVWDIR', 'rvw'), ('RPTSVDIR', 'imp')]:
+            f.write('%s = %r\n' % (var, dirs[name]))
+        f.write("DBCONNSTR = ''\n")
+
+    for x in range(reports):
+        imageid = 100001 + x
+        lines = [build_row('F3X', 'F3XN', 0)]
+        for y in range(rows):
+            formtype, lineid = [('SA', 'SA11AI'), ('SB', 'SB21B'), ('TEXT', 'TEXT')][y % 3]
+            lines.append(build_row(formtype, lineid, imageid * 1000 + y))
+        write_report(dirs['imp'], imageid, lines)
+    return dirs
+
+
+def write_report(rptdir, imageid, lines):
+    # Writes a version 8.0 report with a file header and the lines given
+    hdr = {'RecType': 'HDR', 'EFType': 'FEC', 'Ver': '8.0', 'SftNm': 'TEST', 'SftVer': '1', 'RptNbr': '0'}
+    lines = [chr(28).join(hdr.get(column, '') for column in get_file_hdrs('Hdr'))] + list(lines)
+    with open(rptdir + str(imageid) + '.fec', 'w', newline='') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def run_parse_reports(workdir, args=(), crashafter=None):
+    # Runs parse_reports in workdir and returns the completed process
+    driver = DRIVER.format(repodir=REPODIR, args=list(args), crashafter=crashafter)
+    return subprocess.run([sys.executable, '-c', driver], cwd=str(workdir),
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def read_run_output(dirs):
+    # Returns the contents of the data files and error logs written by a
+    # run, keyed by filename without the run's timestamp, along with the
+    # reports left in each report directory
+    output = {}
+    for name in ['out', 'err']:
+        for filename in sorted(os.listdir(dirs[name])):
+            if filename.startswith('Manifest_') or not filename.endswith(('.txt', '.log')):
+                continue
+            with open(dirs[name] + filename, 'rb') as f:
+                output[name + '/' + re.sub(r'_\d{12}', '', filename)] = f.read()
+    for name in ['imp', 'proc', 'hold', 'rvw']:
+        output[name] = sorted(os.listdir(dirs[name]))
+    return output
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+
+import parse_reports
+from conftest import build_row, make_report_dirs, run_parse_reports, write_report
+
+
+def read_loaded_reports(dbfile):
+    # Returns the ImageIDs of the reports with a header and the ImageIDs
+    # of the reports with child rows in a SQLite header store
+    conn = sqlite3.connect(dbfile)
+    headers = set()
+    for table in parse_reports.hdrtables.values():
+        headers.update(row[0] for row in conn.execute('SELECT ImageID FROM ' + table))
+    children = set()
+    for table in parse_reports.childtables.values():
+        children.update(row[0] for row in conn.execute('SELECT DISTINCT ImageID FROM ' + table))
+    conn.close()
+    return headers, children
+
+
+def test_crash_leaves_no_header_without_children(tmp_path):
+    dirs = make_report_dirs(tmp_path)
+    args = ['--header-store', 'sqlite', '--format', 'sqlite']
+    result = run_parse_reports(tmp_path, args, crashafter=150)
+    assert result.returncode == 9
+
+    # Only the reports moved to RPTPROCDIR were committed, each with
+    # its child rows
+    processed = set(int(x.replace('.fec', '')) for x in os.listdir(dirs['proc']))
+    headers, children = read_loaded_reports(dirs['out'] + 'RptHdrs.db')
+    assert 0 < len(processed) < 6
+    assert headers == processed
+    assert children == processed
+
+    # The report being parsed when the run was killed is loaded whole
+    # by the next run
+    result = run_parse_reports(tmp_path, args)
+    assert result.returncode == 0, result.stderr.decode()
+    headers, children = read_loaded_reports(dirs['out'] + 'RptHdrs.db')
+    assert headers == children == set(range(100001, 100007))
+
+
+def test_load_f1_header_with_missing_values(tmp_path):
+    # check_rpt_hdrs_f1 returns an uppercased nullstring for a missing
+    # AffRelCd, which is looked up as an empty code like other missing
+    # lookup values
+    dirs = make_report_dirs(tmp_path, reports=0)
+    write_report(dirs['imp'], 100001, [build_row('F1', 'F1N', 0, blanks=['AffRelCd', 'AffStAbbr']),
+                                       build_row('F1S', 'F1S', 1)])
+    result = run_parse_reports(tmp_path, ['--header-store', 'sqlite'])
+    assert result.returncode == 0, result.stderr.decode()
+    assert os.listdir(dirs['proc']) == ['100001.fec']
+    conn = sqlite3.connect(dirs['out'] + 'RptHdrs.db')
+    assert conn.execute('SELECT ImageID, AffRelCd, AffStAbbr FROM Form1 JOIN lkpAffRel ON USATID = AffRelID'
+                        ).fetchall() == [(100001, '', None)]
+    conn.close()
+
+
+def test_header_that_cannot_be_loaded_returns_minus_two(tmp_path):
+    store = parse_reports.SQLiteHeaderStore(str(tmp_path / 'RptHdrs.db'))
+    rowdata = dict((hdr, 'NULL') for hdr in parse_reports.outputhdrs['F3X'])
+    rowdata['CashBegin_P_6b'] = 'not a number'
+    filehdr = dict((field, '') for field, column in parse_reports.filehdrcolumns)
+    assert store.add_rpt_hdr('F3X', 100001, rowdata, filehdr, parse_reports.outputhdrs['F3X']) == -2
+    store.rollback()
+    store.close()
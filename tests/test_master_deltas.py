@@ -0,0 +1,77 @@
+import sqlite3
+
+import update_master_files
+
+
+def write_master_file(path, rows):
+    # Writes committee master rows (CMTE_ID, CMTE_NM) padded to the 15
+    # columns of a cm data file
+    with open(str(path), 'w', encoding='latin-1') as f:
+        for row in rows:
+            f.write('|'.join(list(row) + [''] * (15 - len(row))) + '\n')
+
+
+def test_find_master_file_deltas(tmp_path, monkeypatch, capsys):
+    deltadir = tmp_path / 'Delta'
+    deltadir.mkdir()
+    monkeypatch.setattr(update_master_files, 'DELTADIR', str(deltadir) + '/')
+    snapshots = sqlite3.connect(':memory:')
+
+    # Without a snapshot, every row is new and the file is copied as is
+    (tmp_path / 'old').mkdir()
+    oldfile = tmp_path / 'old' / 'cm16.txt'
+    write_master_file(oldfile, [('C00000001', 'FIRST COMMITTEE'),
+                                ('C00000002', 'SECOND COMMITTEE'),
+                                ('C00000003', 'THIRD COMMITTEE')])
+    name = update_master_files.find_master_file_deltas(snapshots, 'cm', str(oldfile))
+    assert name == 'cm16'
+    assert 'cm16.txt: 3 rows inserted, 0 updated and 0 deleted.' in capsys.readouterr().out
+    assert (deltadir / 'cm16.txt').read_bytes() == oldfile.read_bytes()
+    update_master_files.save_snapshots(snapshots, [name])
+
+    # One row is unchanged, one is renamed, one is dropped and one is
+    # added. The row without 15 columns is ignored.
+    (tmp_path / 'new').mkdir()
+    newfile = tmp_path / 'new' / 'cm16.txt'
+    write_master_file(newfile, [('C00000001', 'FIRST COMMITTEE'),
+                                ('C00000002', 'SECOND COMMITTEE PAC'),
+                                ('C00000004', 'FOURTH COMMITTEE')])
+    with open(str(newfile), 'a', encoding='latin-1') as f:
+        f.write('C00000005|SHORT ROW\n')
+    update_master_files.find_master_file_deltas(snapshots, 'cm', str(newfile))
+    assert 'cm16.txt: 1 rows inserted, 1 updated and 1 deleted.' in capsys.readouterr().out
+    changed = [line.split('|')[:2] for line in (deltadir / 'cm16.txt').read_text().splitlines()]
+    assert changed == [['C00000002', 'SECOND COMMITTEE PAC'], ['C00000004', 'FOURTH COMMITTEE']]
+    assert (deltadir / 'cm16_deleted.txt').read_text() == 'C00000003\n'
+
+    # The snapshot isn't replaced until save_snapshots is called
+    assert snapshots.execute('SELECT COUNT(*) FROM cm16').fetchone()[0] == 3
+    update_master_files.save_snapshots(snapshots, [name])
+    keys = [row[0] for row in snapshots.execute('SELECT RowKey FROM cm16 ORDER BY RowKey')]
+    assert keys == ['C00000001', 'C00000002', 'C00000004']
+
+
+def test_stage_master_files_loads_deleted_keys(tmp_path, monkeypatch):
+    masterdir = tmp_path / 'Master'
+    masterdir.mkdir()
+    monkeypatch.setattr(update_master_files, 'MASTERDIR', str(masterdir) + '/')
+    monkeypatch.setattr(update_master_files, 'DELTADIR', str(masterdir / 'Delta') + '/')
+    monkeypatch.setattr(update_master_files, 'SNAPSHOTDBFILE', str(masterdir / 'Snapshots.db'))
+    monkeypatch.setattr(update_master_files, 'create_staging_loader',
+                        lambda backend: update_master_files.SQLiteStagingLoader(str(masterdir / 'Staging.db')))
+
+    write_master_file(masterdir / 'cm16.txt', [('C00000001', 'FIRST COMMITTEE'),
+                                               ('C00000002', 'SECOND COMMITTEE'),
+                                               ('C00000003', 'THIRD COMMITTEE')])
+    update_master_files.stage_master_files(['cm'], 'sqlite', delta=True)
+
+    # The second run loads the changed row into stgCommittees and the
+    # keys of the deleted rows into stgMasterDeletes
+    write_master_file(masterdir / 'cm16.txt', [('C00000002', 'SECOND COMMITTEE PAC')])
+    update_master_files.stage_master_files(['cm'], 'sqlite', delta=True)
+    conn = sqlite3.connect(str(masterdir / 'Staging.db'))
+    assert conn.execute('SELECT CMTE_ID, CMTE_NM, ElecCycle FROM stgCommittees').fetchall() == \
+        [('C00000002', 'SECOND COMMITTEE PAC', 2016)]
+    assert conn.execute('SELECT StgTable, ElecCycle, RowKey FROM stgMasterDeletes ORDER BY RowKey').fetchall() == \
+        [('stgCommittees', 2016, 'C00000001'), ('stgCommittees', 2016, 'C00000003')]
+    conn.close()
@@ -0,0 +1,27 @@
+import os
+
+from conftest import make_report_dirs, read_run_output, run_parse_reports
+
+
+def test_resumed_run_matches_clean_run(tmp_path):
+    clean = make_report_dirs(tmp_path / 'clean')
+    result = run_parse_reports(tmp_path / 'clean')
+    assert result.returncode == 0, result.stderr.decode()
+
+    # Kill the run in the middle of the third report, then resume it
+    crashed = make_report_dirs(tmp_path / 'crashed')
+    result = run_parse_reports(tmp_path / 'crashed', ['--journal'], crashafter=150)
+    assert result.returncode == 9
+    assert 0 < len(os.listdir(crashed['imp'])) < 6
+    result = run_parse_reports(tmp_path / 'crashed', ['--resume'])
+    assert result.returncode == 0, result.stderr.decode()
+
+    assert read_run_output(crashed) == read_run_output(clean)
+    assert len(os.listdir(clean['proc'])) == 6
+
+
+def test_resume_without_journaled_run_fails(tmp_path):
+    make_report_dirs(tmp_path)
+    result = run_parse_reports(tmp_path, ['--resume'])
+    assert result.returncode == 2
+    assert b'no journaled run to resume' in result.stderr
@@ -0,0 +1,32 @@
+import update_master_files
+
+
+def test_load_candidates_and_committees_with_lookup_ids(tmp_path):
+    cnfile = tmp_path / 'cn16.txt'
+    cnfile.write_text('H6TX01001|DOE, JANE|DEM|2016|TX|H|01|C|C|C00000001|1 MAIN ST||AUSTIN|TX|78701\n'
+                      'H6TX02001|ROE, RICHARD||2016|TX|H|02|C|C||2 MAIN ST||DALLAS|TX|75201\n')
+    cmfile = tmp_path / 'cm16.txt'
+    cmfile.write_text('C00000001|DOE FOR CONGRESS|SMITH|1 MAIN ST||AUSTIN|TX|78701|P|H|DEM|Q|||H6TX01001\n'
+                      'C00000002|ACME PAC|JONES|3 MAIN ST||DALLAS|TX|75201|U|Q|XYZ|M|C|ACME|\n')
+
+    loader = update_master_files.SQLiteStagingLoader(str(tmp_path / 'Staging.db'))
+    update_master_files.load_master_file(loader, 'cn', str(cnfile))
+    update_master_files.load_master_file(loader, 'cm', str(cmfile))
+    conn = loader.conn
+
+    # Each reference resolves to the USATID of its code, and the same
+    # code resolves to the same USATID in both tables
+    candidates = conn.execute('SELECT c.CAND_ID, p.FECCode, l.FECCandID, m.FECCommID FROM stgCandidates c '
+                              'JOIN lkpParties p ON p.USATID = c.PartyID '
+                              'JOIN lkpCandidates l ON l.USATID = c.CandID '
+                              'JOIN lkpCommittees m ON m.USATID = c.PrinCommID ORDER BY c.CAND_ID').fetchall()
+    assert candidates == [('H6TX01001', 'DEM', 'H6TX01001', 'C00000001'), ('H6TX02001', '', 'H6TX02001', '')]
+    committees = conn.execute('SELECT c.CMTE_ID, p.FECCode, m.FECCommID, l.FECCandID FROM stgCommittees c '
+                              'JOIN lkpParties p ON p.USATID = c.PartyID '
+                              'JOIN lkpCommittees m ON m.USATID = c.CommID '
+                              'JOIN lkpCandidates l ON l.USATID = c.CandID ORDER BY c.CMTE_ID').fetchall()
+    assert committees == [('C00000001', 'DEM', 'C00000001', 'H6TX01001'), ('C00000002', 'XYZ', 'C00000002', '')]
+
+    # New party codes are added as Undefined
+    assert conn.execute("SELECT Party, Short FROM lkpParties WHERE FECCode = 'XYZ'").fetchone() == ('Undefined', 'O')
+    loader.close()
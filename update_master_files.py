@@ -21,19 +21,36 @@
 
 # Import needed libraries
 from datetime import datetime, timedelta
+import argparse
 import glob
+import hashlib
+import itertools
 import multiprocessing
 import os
+import shutil
+import sqlite3
+import sys
+import time
 import urllib.request, urllib.parse, urllib.error
 import urllib.request, urllib.error, urllib.parse
 import zipfile
 
+from lookup_tables import LookupCache, lkptables
+
+# pyodbc is needed only to load staging tables into SQL Server
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None
+
 # Try to import user settings or set them explicitly
 try:
     import usersettings
 
+    DBCONNSTR = usersettings.DBCONNSTR
     MASTERDIR = usersettings.MASTERDIR
 except:
+    DBCONNSTR = ''
     MASTERDIR = 'C:\\data\\FEC\\Master\\'
 
 # Other user variables
@@ -43,6 +60,256 @@ MASTERFILES = ['ccl', 'cm', 'cn', 'indiv', 'oth', 'pas2', 'oppexp']
 NUMPROC = 10  # Multiprocessing processes to run simultaneously
 STARTCYCLE = 2002  # Oldest election cycle for which you want to download master files
 OMITNONSUNDAYFILES = 1  # Set to 0 to download all files regardless of day of week
+LOADBACKEND = ''  # Set to 'sqlite' or 'sqlserver' to load the data files into staging tables
+LOADBATCHSIZE = 50000  # Rows inserted into a staging table in each batch
+STAGINGDBFILE = MASTERDIR + 'Staging.db'  # SQLite database housing staging tables
+DELTADIR = os.path.join(MASTERDIR, 'Delta', '')  # Directory to house rows changed since the previous master files
+SNAPSHOTDBFILE = MASTERDIR + 'Snapshots.db'  # SQLite database housing row hashes of the previous master files
+REJECTEDLOG = MASTERDIR + 'RejectedRows.log'  # Log of rows the staging tables would not accept
+
+# Staging table for each master file, along with the prefix of the
+# extracted data files and the table's columns in the order they appear
+# in the pipe-delimited data files. Tables flagged with True also have
+# an ElecCycle column, which is set from the year in the filename.
+stagingtables = {
+    'ccl': ('ccl', 'stgCandCommLinks', False,
+            ['CAND_ID', 'CAND_ELECTION_YR', 'FEC_ELECTION_YR', 'CMTE_ID',
+             'CMTE_TP', 'CMTE_DSGN', 'LINKAGE_ID']),
+    'cm': ('cm', 'stgCommittees', True,
+           ['CMTE_ID', 'CMTE_NM', 'TRES_NM', 'CMTE_ST1', 'CMTE_ST2',
+            'CMTE_CITY', 'CMTE_ST', 'CMTE_ZIP', 'CMTE_DSGN', 'CMTE_TP',
+            'CMTE_PTY_AFFILIATION', 'CMTE_FILING_FREQ', 'ORG_TP',
+            'CONNECTED_ORG_NM', 'CAND_ID']),
+    'cn': ('cn', 'stgCandidates', True,
+           ['CAND_ID', 'CAND_NAME', 'PTY_AFF', 'ELEC_YR', 'OFFICE_ST',
+            'OFFICE', 'OFFICE_DIST', 'INC_CHAL_STATUS', 'CAND_STATUS',
+            'PRIN_COMM_ID', 'CAND_ADDR1', 'CAND_ADDR2', 'CAND_CITY',
+            'CAND_ST', 'CAND_ZIP']),
+    'indiv': ('itcont', 'stgIndiv', True,
+              ['CMTE_ID', 'AMNDT_IND', 'RPT_TP', 'TRANSACTION_PGI',
+               'IMAGE_NUM', 'TRANSACTION_TP', 'ENTITY_TP', '_NAME', 'CITY',
+               '_STATE', 'ZIP_CODE', 'EMPLOYER', 'OCCUPATION',
+               'TRANSACTION_DT', 'TRANSACTION_AMT', 'OTHER_ID', 'TRAN_ID',
+               'FILE_NUM', 'MEMO_CD', 'MEMO_TEXT', 'SUB_ID']),
+    'oth': ('itoth', 'stgOth', True,
+            ['CMTE_ID', 'AMNDT_IND', 'RPT_TP', 'TRANSACTION_PGI',
+             'IMAGE_NUM', 'TRANSACTION_TP', 'ENTITY_TP', '_NAME', 'CITY',
+             '_STATE', 'ZIP_CODE', 'EMPLOYER', 'OCCUPATION',
+             'TRANSACTION_DT', 'TRANSACTION_AMT', 'OTHER_ID', 'TRAN_ID',
+             'FILE_NUM', 'MEMO_CD', 'MEMO_TEXT', 'SUB_ID']),
+    'pas2': ('itpas2', 'stgPAS2', True,
+             ['CMTE_ID', 'AMNDT_IND', 'RPT_TP', 'TRANSACTION_PGI',
+              'IMAGE_NUM', 'TRANSACTION_TP', 'ENTITY_TP', '_NAME', 'CITY',
+              '_STATE', 'ZIP_CODE', 'EMPLOYER', 'OCCUPATION',
+              'TRANSACTION_DT', 'TRANSACTION_AMT', 'OTHER_ID', 'CAND_ID',
+              'TRAN_ID', 'FILE_NUM', 'MEMO_CD', 'MEMO_TEXT', 'SUB_ID'])}
+
+# Staging table and columns housing the natural keys of the rows deleted
+# from the master files since the previous run, loaded when --delta is
+# used. Each key is loaded with the staging table of its master file
+# and its election cycle.
+deletetable = ('stgMasterDeletes', ['StgTable', 'ElecCycle', 'RowKey'])
+
+
+# Lookup table references resolved for each staging table as rows are
+# loaded, as in the usp_Scrub* stored procedures. Each entry houses the
+# staging table column housing the reference, the lookup table, the
+# lookup column matched to the value, the data file column housing the
+# value and a function that returns True for the values that are
+# resolved. When the function is None, every value is resolved and
+# missing values are looked up as empty strings; otherwise missing
+# values are not resolved.
+stagingkeys = {
+    'ccl': [('CommID', 'lkpCommittees', 'FECCommID', 'CMTE_ID', None),
+            ('CandID', 'lkpCandidates', 'FECCandID', 'CAND_ID', None)],
+    'cm': [('PartyID', 'lkpParties', 'FECCode', 'CMTE_PTY_AFFILIATION', None),
+           ('CommID', 'lkpCommittees', 'FECCommID', 'CMTE_ID', None),
+           ('CandID', 'lkpCandidates', 'FECCandID', 'CAND_ID', None)],
+    'cn': [('PartyID', 'lkpParties', 'FECCode', 'PTY_AFF', None),
+           ('CandID', 'lkpCandidates', 'FECCandID', 'CAND_ID', None),
+           ('PrinCommID', 'lkpCommittees', 'FECCommID', 'PRIN_COMM_ID', None)],
+    'indiv': [('RptCommID', 'lkpCommittees', 'FECCommID', 'CMTE_ID', None),
+              ('RptPrdID', 'lkpRptPrd', 'RptPrdCd', 'RPT_TP', None),
+              ('ElecID', 'lkpElec', 'ElecCd', 'TRANSACTION_PGI', None),
+              ('TransTpID', 'lkpTransTp', 'TransTp', 'TRANSACTION_TP', None),
+              ('ContRcptEntTpID', 'lkpEntTp', 'EntTp', 'ENTITY_TP', None),
+              ('ContRcptCommID', 'lkpCommittees', 'FECCommID', 'OTHER_ID',
+               lambda val: val.startswith('C')),
+              ('ContRcptCandID', 'lkpCandidates', 'FECCandID', 'OTHER_ID',
+               lambda val: not val.startswith('C'))],
+    'oth': [('RptCommID', 'lkpCommittees', 'FECCommID', 'CMTE_ID', None),
+            ('RptPrdID', 'lkpRptPrd', 'RptPrdCd', 'RPT_TP', None),
+            ('ElecID', 'lkpElec', 'ElecCd', 'TRANSACTION_PGI', None),
+            ('TransTpID', 'lkpTransTp', 'TransTp', 'TRANSACTION_TP', None),
+            ('ContRcptEntTpID', 'lkpEntTp', 'EntTp', 'ENTITY_TP', None),
+            ('ContRcptCommID', 'lkpCommittees', 'FECCommID', 'OTHER_ID',
+             lambda val: val.startswith('C')),
+            ('ContRcptCandID', 'lkpCandidates', 'FECCandID', 'OTHER_ID',
+             lambda val: not val.startswith('C'))],
+    'pas2': [('DonCommID', 'lkpCommittees', 'FECCommID', 'CMTE_ID', None),
+             ('RptPrdID', 'lkpRptPrd', 'RptPrdCd', 'RPT_TP', None),
+             ('ElecID', 'lkpElec', 'ElecCd', 'TRANSACTION_PGI', None),
+             ('TransTpID', 'lkpTransTp', 'TransTp', 'TRANSACTION_TP', None),
+             ('RcptEntTpID', 'lkpEntTp', 'EntTp', 'ENTITY_TP', None),
+             ('RcptCommID', 'lkpCommittees', 'FECCommID', 'OTHER_ID',
+              lambda val: val.startswith('C')),
+             ('RcptCandID', 'lkpCandidates', 'FECCandID', 'CAND_ID',
+              lambda val: val.startswith(('H', 'P', 'S')))]}
+
+# Values of the other required columns of codes added to a lookup table
+# by the lookup cache, as in the usp_Scrub* stored procedures
+lkpdefaults = {'lkpParties': {'Party': 'Undefined', 'Short': 'O'}}
+
+# Columns declared NOT NULL in the staging tables defined in
+# fec_scraper_toolbox_sql_objects.sql. Empty values in these columns
+# are loaded as empty strings rather than NULL. Rows with an empty value
+# in one of the numeric columns listed in requiredcolumns can't be
+# loaded, so they are skipped.
+notnullcolumns = {
+    'ccl': ['CAND_ID', 'LINKAGE_ID'],
+    'cm': ['CMTE_ID', 'CMTE_NM'],
+    'cn': ['CAND_ID', 'CAND_NAME', 'PTY_AFF', 'ELEC_YR', 'OFFICE_ST',
+           'OFFICE', 'OFFICE_DIST', 'INC_CHAL_STATUS', 'CAND_STATUS',
+           'PRIN_COMM_ID', 'CAND_ADDR1', 'CAND_CITY', 'CAND_ST',
+           'CAND_ZIP'],
+    'indiv': ['CMTE_ID'],
+    'oth': ['CMTE_ID'],
+    'pas2': ['CMTE_ID', 'SUB_ID']}
+requiredcolumns = {'ccl': ['LINKAGE_ID'],
+                   'cn': ['ELEC_YR'],
+                   'pas2': ['SUB_ID']}
+
+# Column that uniquely identifies each row of each master file
+naturalkeys = {'ccl': 'LINKAGE_ID',
+               'cm': 'CMTE_ID',
+               'cn': 'CAND_ID',
+               'indiv': 'SUB_ID',
+               'oth': 'SUB_ID',
+               'pas2': 'SUB_ID'}
+
+
+class StagingLoader(object):
+    """
+    Base class for the backends that load master data files into
+    staging tables.  Rows are inserted in batches of batchsize rows and
+    each batch is committed as it's inserted, along with any codes the
+    lookup cache added to the lookup tables.  dberror is the exception
+    raised by the backend when a row can't be inserted.  Each backend
+    also provides truncate, which deletes all rows from a staging table.
+    """
+    dberror = sqlite3.Error
+
+    def __init__(self, batchsize=LOADBATCHSIZE):
+        self.batchsize = batchsize
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.conn.close()
+
+    def execute_rows(self, table, columns, rows):
+        """
+        Inserts a list of rows into a staging table without committing
+        them.
+        """
+        sql = ('INSERT INTO ' + table + ' (' + ', '.join(columns)
+               + ') VALUES (' + ', '.join(['?'] * len(columns)) + ')')
+        self.conn.cursor().executemany(sql, rows)
+
+    def insert_rows(self, table, columns, rows):
+        """
+        Inserts a batch of rows (a list of tuples) into a staging table
+        and commits them.  If the database rejects the batch, it's rolled
+        back and the rows are inserted and committed one at a time, so
+        one bad row doesn't stop the load.  Rows that are rejected again
+        are written to REJECTEDLOG along with the error and skipped.
+        Returns the number of rows inserted.
+        """
+        try:
+            self.execute_rows(table, columns, rows)
+        except self.dberror:
+            self.conn.rollback()
+        else:
+            self.lookups.flush()
+            self.conn.commit()
+            return len(rows)
+
+        self.lookups.flush()
+        self.conn.commit()
+        inserted = 0
+        with open(REJECTEDLOG, 'a', encoding='latin-1') as log:
+            for row in rows:
+                try:
+                    self.execute_rows(table, columns, [row])
+                except self.dberror as err:
+                    self.conn.rollback()
+                    log.write(table + '\t' + str(err).replace('\n', ' ') + '\t'
+                              + '|'.join('' if val is None else str(val)
+                                         for val in row) + '\n')
+                    continue
+                self.conn.commit()
+                inserted += 1
+        return inserted
+
+
+class SQLiteStagingLoader(StagingLoader):
+    """
+    Loads master data files into staging tables in the SQLite database
+    specified by dbfile.  The tables are created if they don't exist,
+    along with the lookup tables referenced by the staging tables.
+    Every column of the data files is stored as text.
+    """
+    def __init__(self, dbfile=STAGINGDBFILE, batchsize=LOADBATCHSIZE):
+        StagingLoader.__init__(self, batchsize)
+        self.conn = sqlite3.connect(dbfile)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=OFF')
+        for mastertype in sorted(stagingtables):
+            prefix, table, eleccycle, columns = stagingtables[mastertype]
+            ddl = [column + ' TEXT' for column in columns]
+            if eleccycle:
+                ddl.append('ElecCycle INTEGER')
+            for key in stagingkeys.get(mastertype, []):
+                ddl.append(key[0] + ' INTEGER')
+                self.conn.execute('CREATE TABLE IF NOT EXISTS ' + key[1]
+                                  + ' (' + lkptables[key[1]] + ')')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS ' + table + ' ('
+                              + ', '.join(ddl) + ')')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS ' + deletetable[0]
+                          + ' (StgTable TEXT, ElecCycle INTEGER, RowKey TEXT)')
+        self.conn.commit()
+        self.lookups = LookupCache(self.conn)
+
+    def truncate(self, table):
+        self.conn.execute('DELETE FROM ' + table)
+        self.conn.commit()
+
+
+class SQLServerStagingLoader(StagingLoader):
+    """
+    Loads master data files into the staging tables defined in
+    fec_scraper_toolbox_sql_objects.sql using the connection string
+    specified by DBCONNSTR.  Each batch is sent to the server as a
+    single array of parameters.  New codes are inserted into the lookup
+    tables with the USATID assigned by the lookup cache.
+    """
+    def __init__(self, connstr=DBCONNSTR, batchsize=LOADBATCHSIZE):
+        StagingLoader.__init__(self, batchsize)
+        self.dberror = pyodbc.Error
+        self.conn = pyodbc.connect(connstr)
+        self.lookups = LookupCache(self.conn, identityinsert=True)
+
+    def execute_rows(self, table, columns, rows):
+        sql = ('INSERT INTO dbo.' + table + ' (' + ', '.join(columns)
+               + ') VALUES (' + ', '.join(['?'] * len(columns)) + ')')
+        cursor = self.conn.cursor()
+        cursor.fast_executemany = True
+        cursor.executemany(sql, rows)
+
+    def truncate(self, table):
+        self.conn.execute('TRUNCATE TABLE dbo.' + table)
+        self.conn.commit()
 
 
 def archive_master_files():
@@ -67,6 +334,16 @@ def archive_master_files():
         os.rename(datafile, datafile.replace(MASTERDIR, savedir))
 
 
+def create_staging_loader(backend, batchsize=LOADBATCHSIZE):
+    """
+    Returns the staging loader for the specified backend: 'sqlite' or
+    'sqlserver'.
+    """
+    if backend == 'sqlserver':
+        return SQLServerStagingLoader(DBCONNSTR, batchsize)
+    return SQLiteStagingLoader(STAGINGDBFILE, batchsize)
+
+
 def create_timestamp():
     filetime = datetime.datetime.now()
     return filetime.strftime('%Y%m%d')
@@ -101,7 +378,7 @@ def download_file(src, dest):
     y = 0
     try:
         # Add a header to the request.
-        request = urllib.request.Request(url, headers={
+        request = urllib.request.Request(src, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.153 Safari/537.36 SE 2.X MetaSr 1.0'})
         srclen = float(urllib.request.urlopen(request).info().get('Content-Length'))
     except:
@@ -110,7 +387,7 @@ def download_file(src, dest):
         try:
             # Add a header
             urllib.request.URLopener.version = 'Mozilla/5.0 (Windows NT 6.1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.153 Safari/537.36 SE 2.X MetaSr 1.0'
-            urllib.request.urlretrieve(url, filename)
+            urllib.request.urlretrieve(src, dest)
             destlen = os.path.getsize(dest)
 
             # Repeat download up to five times if files not same size
@@ -126,6 +403,313 @@ def download_file(src, dest):
         print((src + ' could not be downloaded.'))
 
 
+def find_master_file_deltas(snapshots, mastertype, datafile):
+    """
+    Compares a data file with the snapshot of the same file saved by
+    the previous run and writes the rows that were inserted or updated
+    to a file with the same name in DELTADIR.  The natural keys of
+    deleted rows are written to a _deleted file in DELTADIR.
+
+    The snapshot is a table in the SQLite database snapshots that
+    houses the natural key and a hash of each row.  The hashes of the
+    new file are saved to a _new table, which replaces the snapshot
+    only when save_snapshots is called, so the deltas are found again
+    if they are not loaded.  Returns the name of the snapshot table.
+    """
+    prefix, table, eleccycle, columns = stagingtables[mastertype]
+    numcols = len(columns)
+    keycol = columns.index(naturalkeys[mastertype])
+    filename = os.path.basename(datafile)
+    name = os.path.splitext(filename)[0]
+    ddl = ' (RowKey TEXT PRIMARY KEY, RowHash INTEGER NOT NULL) WITHOUT ROWID'
+    snapshots.execute('CREATE TABLE IF NOT EXISTS ' + name + ddl)
+    snapshots.execute('DROP TABLE IF EXISTS ' + name + '_new')
+    snapshots.execute('CREATE TABLE ' + name + '_new' + ddl)
+
+    # Save the key and hash of each row of the new file
+    with open(datafile, 'r', encoding='latin-1') as source:
+        rows = hash_master_file(source, numcols, keycol)
+        while True:
+            batch = list(itertools.islice(rows, LOADBATCHSIZE))
+            if len(batch) == 0:
+                break
+            snapshots.executemany('INSERT OR REPLACE INTO ' + name
+                                  + '_new VALUES (?, ?)', batch)
+    snapshots.commit()
+
+    # Compare the new hashes with the snapshot
+    inserted = snapshots.execute(
+        'SELECT COUNT(*) FROM ' + name + '_new n WHERE NOT EXISTS '
+        '(SELECT 1 FROM ' + name + ' o WHERE o.RowKey = n.RowKey)').fetchone()[0]
+    deleted = [row[0] for row in snapshots.execute(
+        'SELECT RowKey FROM ' + name + ' o WHERE NOT EXISTS '
+        '(SELECT 1 FROM ' + name + '_new n WHERE n.RowKey = o.RowKey)')]
+    previous = snapshots.execute('SELECT COUNT(*) FROM ' + name).fetchone()[0]
+
+    # Write the inserted and updated rows. When there is no snapshot,
+    # every row is new, so the file is copied as is.
+    if previous == 0:
+        shutil.copyfile(datafile, DELTADIR + filename)
+        updated = 0
+    else:
+        changed = set(row[0] for row in snapshots.execute(
+            'SELECT n.RowKey FROM ' + name + '_new n LEFT JOIN ' + name
+            + ' o ON o.RowKey = n.RowKey WHERE o.RowHash IS NULL '
+            'OR o.RowHash <> n.RowHash'))
+        updated = len(changed) - inserted
+        with open(datafile, 'r', encoding='latin-1') as source, \
+                open(DELTADIR + filename, 'w', encoding='latin-1') as output:
+            for line in source:
+                row = line.rstrip('\r\n').split('|')
+                if len(row) == numcols and row[keycol] in changed:
+                    output.write(line)
+
+    with open(DELTADIR + name + '_deleted.txt', 'w',
+              encoding='latin-1') as output:
+        for key in deleted:
+            output.write(key + '\n')
+
+    print(('{0}: {1:,} rows inserted, {2:,} updated and {3:,} '
+           'deleted.').format(filename, inserted, updated, len(deleted)))
+    return name
+
+
+def get_election_cycle(datafile):
+    """
+    Returns the four-digit election cycle for an extracted data file
+    based on the two-digit year at the end of its filename.
+    """
+    year = int(os.path.splitext(datafile)[0][-2:])
+    if year > (datetime.now().year + 1) % 100:
+        return 1900 + year
+    return 2000 + year
+
+
+def hash_master_file(source, numcols, keycol):
+    """
+    Yields the natural key and a 64-bit hash of each row of an open
+    pipe-delimited data file.  Rows that don't have numcols columns are
+    skipped.
+    """
+    for line in source:
+        line = line.rstrip('\r\n')
+        row = line.split('|')
+        if len(row) != numcols:
+            continue
+        digest = hashlib.blake2b(line.encode('latin-1'), digest_size=8).digest()
+        yield row[keycol], int.from_bytes(digest, 'big', signed=True)
+
+
+def load_deleted_keys(loader, mastertypes, sourcedir=DELTADIR):
+    """
+    Empties the staging table specified by deletetable and loads the
+    natural keys in the _deleted files written to sourcedir by
+    find_master_file_deltas for each master file type in mastertypes,
+    so the rows deleted from the master files can be deleted from the
+    tables built from the staging tables.  Returns the number of keys
+    loaded.
+    """
+    table, columns = deletetable
+    loader.truncate(table)
+    keycount = 0
+    for mastertype in mastertypes:
+        if mastertype not in naturalkeys:
+            continue
+        prefix, stgtable = stagingtables[mastertype][:2]
+        pattern = os.path.join(sourcedir, prefix + '[0-9][0-9]_deleted.txt')
+        for keyfile in sorted(glob.glob(pattern)):
+            eleccycle = get_election_cycle(
+                os.path.basename(keyfile).replace('_deleted', ''))
+            with open(keyfile, 'r', encoding='latin-1') as source:
+                while True:
+                    batch = [(stgtable, eleccycle, line.rstrip('\r\n'))
+                             for line in itertools.islice(source,
+                                                          loader.batchsize)]
+                    if len(batch) == 0:
+                        break
+                    keycount += loader.insert_rows(table, columns, batch)
+    print('Loaded {0:,} deleted rows into {1}.'.format(keycount, table))
+    return keycount
+
+
+def load_master_file(loader, mastertype, datafile):
+    """
+    Streams a single pipe-delimited data file into the staging table
+    for its master file type, batchsize rows at a time, and reports the
+    number of rows loaded per second.  Empty values are loaded as NULL,
+    except in the columns listed in notnullcolumns, where they are
+    loaded as empty strings.  Rows that don't have the expected number
+    of columns or are missing a value listed in requiredcolumns are
+    counted and skipped, and so are rows the staging table rejects.
+    The lookup table references in stagingkeys are resolved
+    by the loader's lookup cache, so the staging table is loaded with
+    the USATID of each code.
+    """
+    prefix, table, eleccycle, columns = stagingtables[mastertype]
+    numcols = len(columns)
+    notnull = set(columns.index(x)
+                  for x in notnullcolumns.get(mastertype, []))
+    required = [columns.index(x) for x in requiredcolumns.get(mastertype, [])]
+    keys = [(key[1], key[2], columns.index(key[3]), key[4])
+            for key in stagingkeys.get(mastertype, [])]
+    extra = ()
+    if eleccycle:
+        columns = columns + ['ElecCycle']
+        extra = (get_election_cycle(datafile),)
+    columns = columns + [key[0] for key in stagingkeys.get(mastertype, [])]
+
+    starttime = time.time()
+    rowcount = 0
+    badrows = 0
+    rejected = 0
+    with open(datafile, 'r', encoding='latin-1') as source:
+        rows = read_master_file(source, numcols, notnull, required)
+        while True:
+            chunk = list(itertools.islice(rows, loader.batchsize))
+            if len(chunk) == 0:
+                break
+            batch = [row + extra + resolve_lookup_ids(loader.lookups, keys, row)
+                     for row in chunk if row is not None]
+            badrows += len(chunk) - len(batch)
+            inserted = 0
+            if len(batch) > 0:
+                inserted = loader.insert_rows(table, columns, batch)
+            rejected += len(batch) - inserted
+            # Report progress every million rows
+            if (rowcount + inserted) // 1000000 > rowcount // 1000000:
+                elapsed = max(time.time() - starttime, 0.001)
+                print(('{0:,} rows loaded from {1} ({2:,.0f} '
+                       'rows/sec)...').format(rowcount + inserted,
+                                              os.path.basename(datafile),
+                                              (rowcount + inserted)
+                                              / elapsed))
+            rowcount += inserted
+
+    elapsed = max(time.time() - starttime, 0.001)
+    print(('Loaded {0:,} rows from {1} into {2} in {3:.1f} seconds '
+           '({4:,.0f} rows/sec).').format(rowcount, os.path.basename(datafile),
+                                          table, elapsed, rowcount / elapsed))
+    if badrows > 0:
+        print(('Skipped {0:,} rows in {1} that did not have {2} columns '
+               'or were missing a required value.').format(
+                   badrows, os.path.basename(datafile), numcols))
+    if rejected > 0:
+        print(('Skipped {0:,} rows in {1} that {2} rejected; see '
+               '{3}.').format(rejected, os.path.basename(datafile), table,
+                              REJECTEDLOG))
+    return rowcount
+
+
+def load_staging_tables(loader, mastertypes, sourcedir=MASTERDIR):
+    """
+    Empties the staging table for each master file type in mastertypes
+    and loads every data file of that type in sourcedir, which defaults
+    to the directory specified by MASTERDIR.  Master file types that
+    don't have a staging table, such as oppexp, are skipped.
+    """
+    for mastertype in mastertypes:
+        if mastertype not in stagingtables:
+            continue
+        prefix, table, eleccycle, columns = stagingtables[mastertype]
+        loader.truncate(table)
+        pattern = os.path.join(sourcedir, prefix + '[0-9][0-9].txt')
+        for datafile in sorted(glob.glob(pattern)):
+            load_master_file(loader, mastertype, datafile)
+
+
+def read_master_file(source, numcols, notnull=(), required=()):
+    """
+    Yields each row of an open pipe-delimited data file as a tuple,
+    converting empty values to None except in the columns whose indexes
+    are in notnull.  Yields None in place of rows that don't have
+    numcols columns or have an empty value in a column whose index is in
+    required.
+    """
+    for line in source:
+        row = line.rstrip('\r\n').split('|')
+        if len(row) != numcols:
+            yield None
+            continue
+        if any(row[x] == '' for x in required):
+            yield None
+            continue
+        yield tuple(val if val != '' or x in notnull else None
+                    for x, val in enumerate(row))
+
+
+def resolve_lookup_ids(lookups, keys, row):
+    """
+    Returns a tuple housing the USATID of each value of row referenced
+    by keys, a list of (lookup table, lookup column, column index,
+    function) tuples built from stagingkeys.  Values that aren't
+    resolved are returned as None.  New codes are added with the values
+    in lkpdefaults.
+    """
+    ids = []
+    for table, column, index, resolve in keys:
+        val = row[index]
+        if resolve is not None and (val is None or not resolve(val)):
+            ids.append(None)
+        else:
+            ids.append(lookups.get_id(table, column, val,
+                                      lkpdefaults.get(table)))
+    return tuple(ids)
+
+
+def save_snapshots(snapshots, names):
+    """
+    Replaces each snapshot table in names with the _new table written
+    by find_master_file_deltas.
+    """
+    for name in names:
+        snapshots.execute('DROP TABLE ' + name)
+        snapshots.execute('ALTER TABLE ' + name + '_new RENAME TO ' + name)
+    snapshots.commit()
+
+
+def stage_master_files(mastertypes, backend=None, delta=False):
+    """
+    Loads the data files in MASTERDIR for each master file type in
+    mastertypes into the staging tables of backend ('sqlite' or
+    'sqlserver').
+
+    When delta is True, the module first calls find_master_file_deltas
+    for each data file so only rows that were inserted or updated since
+    the previous run are loaded.  The natural keys of deleted rows are
+    loaded into the staging table specified by deletetable by
+    load_deleted_keys.  The snapshots are saved only after the rows are
+    loaded, so if loading fails, the same changes are found again on
+    the next run.
+    """
+    sourcedir = MASTERDIR
+    if delta:
+        sourcedir = DELTADIR
+        if not os.path.isdir(DELTADIR):
+            os.makedirs(DELTADIR)
+        delete_files(DELTADIR, 'txt')
+        snapshots = sqlite3.connect(SNAPSHOTDBFILE)
+        names = []
+        for mastertype in mastertypes:
+            if mastertype not in naturalkeys:
+                continue
+            prefix = stagingtables[mastertype][0]
+            pattern = os.path.join(MASTERDIR, prefix + '[0-9][0-9].txt')
+            for datafile in sorted(glob.glob(pattern)):
+                names.append(find_master_file_deltas(snapshots, mastertype,
+                                                     datafile))
+
+    if backend is not None:
+        loader = create_staging_loader(backend)
+        load_staging_tables(loader, mastertypes, sourcedir)
+        if delta:
+            load_deleted_keys(loader, mastertypes, sourcedir)
+        loader.close()
+
+    if delta:
+        save_snapshots(snapshots, names)
+        snapshots.close()
+
+
 def unzip_master_file(masterfile):
     """
     Extracts the data file from a single weekly master file archive.
@@ -148,6 +732,24 @@ def unzip_master_file(masterfile):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Download FEC master files and load them into staging tables.')
+    parser.add_argument('--load', dest='backend', choices=['sqlite', 'sqlserver'], default=LOADBACKEND or None,
+                        help='load the data files into the staging tables of this backend')
+    parser.add_argument('--load-only', action='store_true',
+                        help='load the data files already extracted to MASTERDIR without downloading anything')
+    parser.add_argument('--delta', action='store_true',
+                        help='write only the rows changed since the previous run to DELTADIR and load only those rows')
+    args = parser.parse_args()
+    if args.load_only and args.backend is None and not args.delta:
+        parser.error('--load-only requires --load, LOADBACKEND or --delta.')
+    if args.backend == 'sqlserver' and pyodbc is None:
+        parser.error('pyodbc is required to load staging tables into SQL Server.')
+
+    if args.load_only:
+        print('Staging master files...')
+        stage_master_files(MASTERFILES, args.backend, args.delta)
+        print('Done!\n')
+        sys.exit()
 
     # Delete text files extracted from an earlier archive
     print('Deleting old data...')
@@ -204,6 +806,13 @@ if __name__ == '__main__':
     pool.join()
     print('Done!\n')
 
+    # Find the changed rows and load the data files into the staging
+    # tables
+    if args.backend is not None or args.delta:
+        print('Staging master files...')
+        stage_master_files(MASTERFILES, args.backend, args.delta)
+        print('Done!\n')
+
     # Archive files when ARCHIVEFILES == 1
     # Otherwise delete files
     if ARCHIVEFILES == 1:
@@ -8,3 +8,4 @@ RPTOUTDIR = ''  # Directory to house data files generated by parse_reports
 RPTPROCDIR = ''  # Directory to house electronically filed reports that have been processed
 RPTRVWDIR = ''  # Directory to house electronically filed reports that could not be imported and need to be reviewed
 RPTSVDIR = ''  # Directory to house electronically filed reports that have been downloaded but not processed
+SYNCDBFILE = ''  # SQLite database tracking downloaded reports (defaults to syncstate.db in the parent of RPTSVDIR)